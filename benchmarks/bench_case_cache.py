@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+用例持久化缓存基准测试：冷加载（openpyxl 解析 + 校验 + 写缓存）vs 热加载（读取 sqlite 中的 pickle）
+
+热加载使用新的 EnhancedDataLoader（内存缓存为空），模拟新的 worker 进程或下一次执行
+
+用法: python benchmarks/bench_case_cache.py [工作表数] [每个工作表的用例数]
+"""
+import tempfile
+import time
+from pathlib import Path
+import openpyxl
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from common.case_cache import PersistentCaseCache
+from common.enhanced_data_loader import EnhancedDataLoader
+
+HEADERS = ['case_id', 'title', 'method', 'url', 'headers', 'data', 'assertions', 'other']
+
+
+def build_workbook(file_path: Path, sheets: int, rows: int) -> None:
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for sheet_index in range(sheets):
+        ws = wb.create_sheet(f'sheet{sheet_index}')
+        ws.append(HEADERS)
+        for i in range(rows):
+            ws.append([i + 1, f'用例{i + 1}', 'post', f'${{host}}/api/items/{i}', '{"Content-Type": "application/json"}',
+                       f'{{"id": {i}, "name": "${{name}}"}}', '["contains_id", "jsonpath_$.code=0"]', ''])
+    wb.save(file_path)
+
+
+def timed_load(cache: PersistentCaseCache, file_path: Path) -> tuple:
+    loader = EnhancedDataLoader()
+    loader.case_cache = cache
+    start = time.perf_counter()
+    cases = loader.load_test_cases(str(file_path))
+    return time.perf_counter() - start, len(cases)
+
+
+def main():
+    sheets = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / 'cases.xlsx'
+        build_workbook(file_path, sheets, rows)
+        cache = PersistentCaseCache(cache_file=str(Path(temp_dir) / 'case_cache.sqlite'), enabled=True)
+        cold, count = timed_load(cache, file_path)
+        warm = min(timed_load(cache, file_path)[0] for _ in range(5))
+        # 修改工作簿后缓存自动失效
+        wb = openpyxl.load_workbook(file_path)
+        wb.worksheets[0].append([rows + 1, '新增用例', 'get', '${host}/api/new', '', '', '', ''])
+        wb.save(file_path)
+        changed, changed_count = timed_load(cache, file_path)
+
+    print("=" * 60)
+    print(f"📊 用例持久化缓存 ({sheets} 个工作表 x {rows} 条用例, 共 {count} 条)")
+    print("=" * 60)
+    print(f"  冷加载 (解析 + 校验 + 写缓存): {cold * 1000:.1f} ms")
+    print(f"  热加载 (读取缓存):             {warm * 1000:.1f} ms  ({cold / warm:.1f}x)")
+    print(f"  修改工作簿后重新解析:          {changed * 1000:.1f} ms  ({changed_count} 条)")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+用例内存占用基准测试：dict(zip(headers, row)) vs CaseRecord（__slots__）
+
+两种方式使用同一批单元格值，只比较容器本身的开销；同时比较构建耗时、字段访问耗时和 pickle 大小
+
+用法: python benchmarks/bench_case_record.py [用例数]
+"""
+import pickle
+import time
+import tracemalloc
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from common.case_record import record_builder
+
+HEADERS = ('case_id', 'title', 'method', 'url', 'headers', 'data', 'assertions', 'other')
+
+
+def build_rows(count: int) -> list:
+    return [(i + 1, f'用例{i + 1}', 'post', f'${{host}}/api/items/{i}', '{"Content-Type": "application/json"}',
+             f'{{"id": {i}, "name": "${{name}}"}}', '["contains_id", "jsonpath_$.code=0"]', None)
+            for i in range(count)]
+
+
+def build_dicts(rows: list) -> list:
+    cases = []
+    for row in rows:
+        case = dict(zip(HEADERS, row))
+        case['sheet'] = 'sheet1'
+        cases.append(case)
+    return cases
+
+
+def build_records(rows: list) -> list:
+    build = record_builder(HEADERS, sheet='sheet1')
+    return [build(row) for row in rows]
+
+
+def measure(builder, rows: list) -> tuple:
+    """返回 (用例列表, 增加的内存字节, 构建耗时)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    cases = builder(rows)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return cases, size, elapsed
+
+
+def access_time(cases: list) -> float:
+    start = time.perf_counter()
+    for case in cases:
+        case['url'], case.get('data'), case.get('assertions')
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rows = build_rows(count)
+    dicts, dict_bytes, dict_seconds = measure(build_dicts, rows)
+    records, record_bytes, record_seconds = measure(build_records, rows)
+    assert all(dict(record) == case for record, case in zip(records, dicts))
+
+    print("=" * 60)
+    print(f"📊 用例容器内存占用 ({count} 条用例)")
+    print("=" * 60)
+    print(f"  dict:       {dict_bytes / 1024 / 1024:7.2f} MB  ({dict_bytes / count:.0f} 字节/条)  构建 {dict_seconds * 1000:.0f} ms")
+    print(f"  CaseRecord: {record_bytes / 1024 / 1024:7.2f} MB  ({record_bytes / count:.0f} 字节/条)  构建 {record_seconds * 1000:.0f} ms")
+    print(f"  节省: {(1 - record_bytes / dict_bytes) * 100:.0f}%")
+    print(f"  字段访问 (3 次/条): dict {access_time(dicts) * 1000:.1f} ms, CaseRecord {access_time(records) * 1000:.1f} ms")
+    print(f"  pickle 大小: dict {len(pickle.dumps(dicts)) / 1024:.0f} KB, "
+          f"CaseRecord {len(pickle.dumps(records)) / 1024:.0f} KB")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
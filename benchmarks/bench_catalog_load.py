@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+多工作簿加载基准测试：逐个解析 vs EnhancedDataLoader.load_catalog 进程池并行解析
+
+不使用缓存，两种方式都完整解析、校验全部工作簿；输出加载吞吐量（条/秒）
+
+用法: python benchmarks/bench_catalog_load.py [工作簿数] [每个工作簿的用例数] [进程数]
+"""
+import tempfile
+import time
+from pathlib import Path
+import openpyxl
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from common.enhanced_data_loader import EnhancedDataLoader
+
+HEADERS = ['case_id', 'title', 'method', 'url', 'headers', 'data', 'assertions', 'other']
+
+
+def build_workbook(file_path: Path, rows: int) -> None:
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for sheet_index in range(4):
+        ws = wb.create_sheet(f'sheet{sheet_index}')
+        ws.append(HEADERS)
+        for i in range(rows // 4):
+            ws.append([i + 1, f'用例{i + 1}', 'post', f'${{host}}/api/items/{i}', '{"Content-Type": "application/json"}',
+                       f'{{"id": {i}, "name": "${{name}}"}}', '["contains_id", "jsonpath_$.code=0"]', ''])
+    wb.save(file_path)
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = [Path(temp_dir) / f'cases_{i}.xlsx' for i in range(files)]
+        for path in paths:
+            build_workbook(path, rows)
+        size = sum(path.stat().st_size for path in paths)
+
+        loader = EnhancedDataLoader()
+        start = time.perf_counter()
+        serial_cases = sum(len(loader.load_test_cases(str(path), use_cache=False)) for path in paths)
+        serial = time.perf_counter() - start
+
+        catalog = EnhancedDataLoader().load_catalog(paths, max_workers=workers, use_cache=False)
+        stats = catalog.get_stats()
+
+    print("=" * 60)
+    print(f"📊 多工作簿加载 ({files} 个工作簿, 共 {serial_cases} 条用例, {size / 1024 / 1024:.1f} MB)")
+    print("=" * 60)
+    print(f"  逐个解析:            {serial:.2f}s  ({serial_cases / serial:.0f} 条/秒)")
+    print(f"  并行解析 ({workers} 进程): {stats['seconds']:.2f}s  ({stats['cases_per_second']:.0f} 条/秒, "
+          f"{serial / stats['seconds']:.1f}x)")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
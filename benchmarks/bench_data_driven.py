@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+数据驱动展开基准测试：一次性生成全部展开后的用例 vs CaseExpander 逐条展开
+
+同一条参数化用例引用一个 N 行的 CSV 数据表，比较两种方式的内存峰值和耗时（逐条展开时每条用例用完即丢弃）
+
+用法: python benchmarks/bench_data_driven.py [数据表行数]
+"""
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from common.case_record import CaseRecord
+from common.data_driven import CaseExpander
+
+CASE = CaseRecord({'case_id': 1, 'title': '注册', 'method': 'post', 'url': '${host}/api/users/${uid}',
+                   'data': '{"name": "${name}", "phone": "${phone}", "token": "${token}"}',
+                   'assertions': '["jsonpath_$.data.name=${name}"]', 'sheet': 'sheet1', 'params': 'csv:users.csv'})
+
+
+def build_csv(file_path: Path, rows: int) -> None:
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('uid,name,phone\n')
+        for i in range(rows):
+            f.write(f'{i},用户{i},138{i:08d}\n')
+
+
+def measure(consume, case_file: Path) -> tuple:
+    """返回 (展开的用例数, 内存峰值字节, 耗时)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = consume(CaseExpander(case_file).expand([CASE]))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, peak, elapsed
+
+
+def materialized(cases) -> int:
+    return len(list(cases))
+
+
+def streamed(cases) -> int:
+    count = 0
+    for _ in cases:
+        count += 1
+    return count
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as temp_dir:
+        case_file = Path(temp_dir) / 'cases.xlsx'
+        build_csv(Path(temp_dir) / 'users.csv', rows)
+        all_count, all_peak, all_seconds = measure(materialized, case_file)
+        stream_count, stream_peak, stream_seconds = measure(streamed, case_file)
+    assert all_count == stream_count == rows
+
+    print("=" * 60)
+    print(f"📊 数据驱动展开 (1 条用例 x {rows} 行数据表)")
+    print("=" * 60)
+    print(f"  一次性生成: 内存峰值 {all_peak / 1024 / 1024:7.1f} MB  耗时 {all_seconds:.2f}s")
+    print(f"  逐条展开:   内存峰值 {stream_peak / 1024 / 1024:7.1f} MB  耗时 {stream_seconds:.2f}s "
+          f"({rows / stream_seconds:.0f} 条/秒)")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+关键字分发基准测试：每步查 commkey 配置 + getattr vs KeywordRegistry 字典分发
+
+两种方式执行同一个关键字（获取当前用例文件名称），比较每次分发的开销（含关键字本身）
+
+用法: python benchmarks/bench_keyword_dispatch.py [调用次数]
+"""
+import time
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from config.config_loader import get_env_var_value
+from kemel.methodFactory import KeywordRegistry
+
+KEYWORD = '获取当前用例文件名称'
+
+
+def lookup_factory(target, **kwargs):
+    """原 MethodFactory.method_factory：每次查配置、getattr 后调用"""
+    try:
+        method = get_env_var_value('commkey', kwargs['method'].lower())
+        func = getattr(target, method, None)
+        _isOk, result = func(**kwargs)
+        return _isOk, result
+    except Exception as e:
+        return False, str(e)
+
+
+def config_lookup(target, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        lookup_factory(target, method=KEYWORD)
+    return time.perf_counter() - start
+
+
+def registry_dispatch(registry: KeywordRegistry, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        registry.dispatch(method=KEYWORD)
+    return time.perf_counter() - start
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    registry = KeywordRegistry()
+    lookup = config_lookup(registry.target, calls)
+    dispatch = registry_dispatch(registry, calls)
+
+    print("=" * 60)
+    print(f"📊 关键字分发 ({calls} 次)")
+    print("=" * 60)
+    print(f"  查配置 + getattr:  {lookup / calls * 1e6:.2f} µs/次")
+    print(f"  注册表分发:        {dispatch / calls * 1e6:.2f} µs/次 (含调用计数和计时)")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
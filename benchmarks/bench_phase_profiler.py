@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+阶段耗时记录开销基准测试：每条用例按接口用例的阶段数计时 8 次，比较不记录 / 关闭 / 开启三种情况下每条用例增加的耗时
+
+用法: python benchmarks/bench_phase_profiler.py [用例数]
+"""
+import time
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from common import phase_profiler
+from common.phase_profiler import PHASES, activate, new_profile, phase, record_case
+
+CASE = {'case_id': 1, 'sheet': 'sheet1', 'method': 'post', 'url': '${host}/api/users/${uid}'}
+
+
+def baseline(cases: int) -> float:
+    start = time.perf_counter()
+    for _ in range(cases):
+        for _ in PHASES + ('replace_data',):
+            pass
+    return time.perf_counter() - start
+
+
+def instrumented(cases: int) -> float:
+    """与 CaseRunner.run_case 相同的调用方式"""
+    start = time.perf_counter()
+    for _ in range(cases):
+        profile = new_profile()
+        with activate(profile):
+            for name in PHASES + ('replace_data',):
+                with phase(name):
+                    pass
+        record_case(CASE, profile, 0.001)
+    return time.perf_counter() - start
+
+
+def main():
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    base = baseline(cases)
+    phase_profiler.enable(False)
+    disabled = instrumented(cases)
+    phase_profiler.enable(True)
+    enabled = instrumented(cases)
+    samples = phase_profiler.take_samples()
+    start = time.perf_counter()
+    phase_profiler.build_report(samples)
+    report_seconds = time.perf_counter() - start
+
+    print("=" * 60)
+    print(f"📊 阶段耗时记录开销 ({cases} 条用例, 每条 {len(PHASES) + 1} 个阶段)")
+    print("=" * 60)
+    print(f"  关闭: {(disabled - base) / cases * 1e6:6.2f} µs/条")
+    print(f"  开启: {(enabled - base) / cases * 1e6:6.2f} µs/条")
+    print(f"  汇总报告: {report_seconds:.2f}s")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
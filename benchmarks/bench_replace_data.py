@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+replace_data 微基准：原逐个 re.search / re.sub 的循环实现 vs 编译模板实现
+请求体分别包含 1、10、100 个占位符
+
+用法: python benchmarks/bench_replace_data.py [重复次数]
+"""
+import json
+import re
+import timeit
+import requests
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from config.config_loader import get_env_var_value, get_env_now
+from common.publicFunction import Paramete, replace_data
+from common.template_engine import get_template_cache_stats
+
+
+def legacy_replace_data(data):
+    """改造前的实现，仅用于对比（去掉了基准中用不到的上下文私有变量查找）"""
+    keys = None
+    try:
+        ru = r'\${(.*?)}'
+        while re.search(ru, data):
+            res = re.search(ru, data)
+            keys = res.group(1)
+            value = get_env_var_value(get_env_now(), keys)
+            if value is None:
+                value = getattr(Paramete, keys)
+                value = value.text if isinstance(value, requests.Response) else str(value)
+            data = re.sub(re.escape(res.group(0)), value, data, 1)
+            data = data.replace('\\', '')
+            data = data.replace('\n', '\\n')
+    except Exception:
+        print(f'❌ 替换变量失败:未找到系统变量或环境变量【{keys}】')
+    return data
+
+
+def build_body(placeholders: int) -> str:
+    """构造一个包含指定数量占位符、其余为普通字段的 JSON 请求体"""
+    body = {f'field_{i}': f'value_{i}' for i in range(200)}
+    for i in range(placeholders):
+        setattr(Paramete, f'bench_var_{i}', f'id_{i}')
+        body[f'ref_{i}'] = f'${{bench_var_{i}}}'
+    return json.dumps(body, ensure_ascii=False)
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print("=" * 60)
+    print(f"📊 replace_data 微基准 (每组 {number} 次)")
+    print("=" * 60)
+    print(f"  {'占位符':>6s} {'原实现(ms)':>12s} {'模板(ms)':>12s} {'加速':>8s}")
+    for placeholders in (1, 10, 100):
+        body = build_body(placeholders)
+        assert replace_data(body) == legacy_replace_data(body)
+        legacy = timeit.timeit(lambda: legacy_replace_data(body), number=number) / number * 1000
+        compiled = timeit.timeit(lambda: replace_data(body), number=number) / number * 1000
+        print(f"  {placeholders:>6d} {legacy:>12.4f} {compiled:>12.4f} {legacy / compiled:>7.1f}x")
+    stats = get_template_cache_stats()
+    print(f"  模板缓存: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+worker 启动开销基准测试：每个文件启动一次 pytest 子进程 vs 预热 worker 进程池
+
+冷启动：每个文件都要付出解释器启动、pytest 收集、配置解析、执行模块与第三方库导入的开销
+预热池：只在启动时付出一次，之后每个任务只有一次管道往返
+
+用法: python benchmarks/bench_worker_startup.py [文件数] [并发数]
+"""
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from common.worker_pool import WarmWorkerPool
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# 模拟按文件执行时 pytest 子进程需要导入的内容，不包含用例本身的执行
+COLD_TEST_FILE = '''
+import sys
+sys.path.insert(0, {project_dir!r})
+from setup_paths import init_paths
+init_paths()
+import faker, jsonschema, jsonpath_ng, openpyxl, pandas
+from common.case_runner import CaseRunner
+from common.enhanced_data_loader import EnhancedDataLoader
+
+
+def test_startup():
+    CaseRunner()
+    EnhancedDataLoader()
+'''
+
+
+def bench_cold(files: int, workers: int, test_file: Path) -> float:
+    """每个文件一个 pytest 子进程，按并发数分批执行"""
+    start = time.perf_counter()
+    for offset in range(0, files, workers):
+        processes = [
+            subprocess.Popen([sys.executable, '-m', 'pytest', str(test_file), '-q', '-p', 'no:cacheprovider'],
+                             cwd=str(PROJECT_DIR), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            for _ in range(min(workers, files - offset))
+        ]
+        for process in processes:
+            process.wait()
+    return time.perf_counter() - start
+
+
+def bench_warm(files: int, workers: int, results_dir: str):
+    """预热进程池：启动一次，之后每个文件只是一次空任务的管道往返"""
+    start = time.perf_counter()
+    pool = WarmWorkerPool(workers, results_dir)
+    pool.start()
+    pool.wait_ready()
+    ready = time.perf_counter() - start
+    try:
+        dispatch_start = time.perf_counter()
+        pool.run_batches([[] for _ in range(files)])
+        dispatch = time.perf_counter() - dispatch_start
+    finally:
+        pool.close()
+    return ready, dispatch
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    with tempfile.TemporaryDirectory() as temp_dir:
+        test_file = Path(temp_dir) / 'test_startup.py'
+        test_file.write_text(COLD_TEST_FILE.format(project_dir=str(PROJECT_DIR)), encoding='utf-8')
+        cold = bench_cold(files, workers, test_file)
+        ready, dispatch = bench_warm(files, workers, str(Path(temp_dir) / 'results'))
+
+    warm = ready + dispatch
+    print("=" * 60)
+    print(f"📊 worker 启动开销 ({files} 个文件, 并发 {workers})")
+    print("=" * 60)
+    print(f"  冷启动 (每文件一个 pytest 子进程): {cold:.2f}s  ({cold / files * workers:.3f}s/文件)")
+    print(f"  预热池 启动+预热: {ready:.2f}s")
+    print(f"  预热池 分发 {files} 个任务: {dispatch:.3f}s  ({dispatch / files * 1000:.1f}ms/文件)")
+    print(f"  预热池 合计: {warm:.2f}s  (节省 {cold - warm:.2f}s, {cold / warm:.1f}x)")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
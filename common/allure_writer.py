@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Allure 结果写入器 - 不经过 pytest，直接把用例执行结果写成 allure-results
+长驻 worker 进程内执行用例时使用，deal_with_res 中的 allure.attach 会附加到当前用例
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Any
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+import allure_commons
+from allure_commons.lifecycle import AllureLifecycle
+from allure_commons.logger import AllureFileLogger
+from allure_commons.model2 import Status, StatusDetails, Label
+from allure_commons.utils import uuid4, md5
+
+
+class AllureCaseReporter(object):
+    """把用例结果写入指定的 allure-results 目录"""
+
+    def __init__(self, result_dir: str):
+        """
+        :param result_dir: allure-results 目录
+        """
+        self.result_dir = str(result_dir)
+        os.makedirs(self.result_dir, exist_ok=True)
+        self.lifecycle = AllureLifecycle()
+        self._file_logger = AllureFileLogger(self.result_dir)
+        allure_commons.plugin_manager.register(self._file_logger)
+        allure_commons.plugin_manager.register(self)
+
+    @allure_commons.hookimpl
+    def attach_data(self, body, name, attachment_type, extension):
+        """allure.attach 的实现，附件写入当前用例"""
+        self.lifecycle.attach_data(uuid4(), body, name=name, attachment_type=attachment_type, extension=extension)
+
+    @contextmanager
+    def case(self, case: Dict[str, Any], suite: str = None, duration: float = None):
+        """
+        在上下文内执行一条用例，退出时写入结果
+        上下文返回一个字典，执行完成后写入 success / message
+        :param duration: 已执行完成的用例（如异步执行引擎的结果）的耗时（秒），结束时间取退出上下文的时间
+        """
+        outcome = {'success': False, 'message': ''}
+        title = str(case.get('title') or '')
+        full_name = f"{suite}::{case.get('sheet')}::{case.get('case_id')}"
+        with self.lifecycle.schedule_test_case() as test_result:
+            test_result.name = f"{case.get('case_id')}_{title}"
+            test_result.fullName = full_name
+            test_result.historyId = md5(full_name)
+            test_result.labels.append(Label(name='feature', value=str(case.get('sheet'))))
+            test_result.labels.append(Label(name='story', value=title))
+            if suite:
+                test_result.labels.append(Label(name='suite', value=suite))
+            test_result.start = int(time.time() * 1000)
+            try:
+                yield outcome
+            except Exception as e:
+                outcome['success'] = False
+                outcome['message'] = f"{type(e).__name__}: {e}"
+                test_result.status = Status.BROKEN
+            else:
+                test_result.status = Status.PASSED if outcome['success'] else Status.FAILED
+            finally:
+                test_result.stop = int(time.time() * 1000)
+                if duration is not None:
+                    test_result.start = test_result.stop - int(duration * 1000)
+                if test_result.status != Status.PASSED:
+                    test_result.statusDetails = StatusDetails(message=str(outcome['message']))
+        self.lifecycle.write_test_case()
+
+    def close(self) -> None:
+        """注销插件，之后的 allure.attach 不再写入本目录"""
+        allure_commons.plugin_manager.unregister(self)
+        allure_commons.plugin_manager.unregister(self._file_logger)
+
+
+if __name__ == '__main__':
+    import allure
+    reporter = AllureCaseReporter('allure_writer_demo')
+    with reporter.case({'case_id': 1, 'sheet': 'demo', 'title': '示例用例'}, suite='demo.xlsx') as outcome:
+        allure.attach('hello', '附件')
+        outcome['success'] = True
+    reporter.close()
+    print(f"✅ 已写入: {os.listdir('allure_writer_demo')}")
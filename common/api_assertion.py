@@ -6,14 +6,15 @@ import json
 import re
 from typing import Any, Dict
 import requests
-from jsonpath_ng import parse
 from jsonschema import validate, ValidationError
+from jsonschema.exceptions import best_match
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from setup_paths import init_paths
 init_paths()
 from common.log import Log
+from common.jsonpath_cache import find_values
 
 logger = Log.getMylog()
 
@@ -145,9 +146,7 @@ class APIAssertion:
         """
         try:
             data = response.json()
-            jsonpath_expr = parse(json_path)
-            #使用 jsonpath_expr在 data中查找所有匹配的节点，并将它们的 value 属性提取到一个列表 matches 中
-            matches = [match.value for match in jsonpath_expr.find(data)]
+            matches = find_values(json_path, data)
             
             if not matches:
                 _isOk = False
@@ -187,9 +186,7 @@ class APIAssertion:
         """
         try:
             data = response.json()
-            jsonpath_expr = parse(json_path)
-            #使用 jsonpath_expr在 data中查找所有匹配的节点，并将它们的 value 属性提取到一个列表 matches 中
-            matches = [match.value for match in jsonpath_expr.find(data)]
+            matches = find_values(json_path, data)
             
             if not matches:
                 _isOk = False
@@ -226,8 +223,7 @@ class APIAssertion:
         """
         try:
             data = response.json()
-            jsonpath_expr = parse(json_path)
-            matches = [match.value for match in jsonpath_expr.find(data)]
+            matches = find_values(json_path, data)
             if not matches:
                 _isOk = False
                 _reason = f"JSONPath断言失败: 路径 '{json_path}' 未找到匹配项"
@@ -256,8 +252,7 @@ class APIAssertion:
         """
         try:
             data = response.json()
-            jsonpath_expr = parse(json_path)
-            matches = [match.value for match in jsonpath_expr.find(data)]
+            matches = find_values(json_path, data)
             if not matches:
                 _isOk = False
                 _reason = f"JSONPath断言失败: 路径 '{json_path}' 未找到匹配项"
@@ -286,8 +281,7 @@ class APIAssertion:
         """
         try:
             data = response.json()
-            jsonpath_expr = parse(json_path)
-            matches = [match.value for match in jsonpath_expr.find(data)]
+            matches = find_values(json_path, data)
             if not matches:
                 _isOk = False
                 _reason = f"JSONPath断言失败: 路径 '{json_path}' 未找到匹配项"
@@ -311,14 +305,20 @@ class APIAssertion:
         
         Args:
             response: 响应对象
-            schema: JSON Schema
+            schema: JSON Schema，或已编译的校验器（common.schema_registry 缓存的 Validator 实例）
             
         Returns:
             tuple: (是否成功, 断言结果信息)
         """
         try:
             data = response.json()
-            validate(instance=data, schema=schema)
+            if isinstance(schema, dict):
+                validate(instance=data, schema=schema)
+            else:
+                # 校验器已检查过 schema，只做实例校验，错误选择规则与 validate 一致
+                error = best_match(schema.iter_errors(data))
+                if error is not None:
+                    raise error
             _isOk = True
             _reason = "JSON Schema断言通过: 响应数据符合预期结构"
         except json.JSONDecodeError as e:
@@ -418,18 +418,19 @@ class APIAssertion:
         
         Args:
             response: 响应对象
-            pattern: 正则表达式模式
+            pattern: 正则表达式模式（字符串或已编译的正则表达式）
             
         Returns:
             tuple: (是否成功, 断言结果信息)
         """
+        pattern_text = getattr(pattern, 'pattern', pattern)
         try:
             if re.search(pattern, response.text):
                 _isOk = True
-                _reason = f"文本匹配断言通过: 响应匹配正则表达式 '{pattern}'"
+                _reason = f"文本匹配断言通过: 响应匹配正则表达式 '{pattern_text}'"
             else:
                 _isOk = False
-                _reason = f"文本匹配断言失败: 响应不匹配正则表达式 '{pattern}'"
+                _reason = f"文本匹配断言失败: 响应不匹配正则表达式 '{pattern_text}'"
         except Exception as e:
             _isOk = False
             _reason = f"文本匹配断言失败: {str(e)}"
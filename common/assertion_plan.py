@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+断言计划编译 - 把用例 assertions 列（JSON 数组）在加载时编译为断言对象列表
+规则前缀、操作数拆分、JSONPath / 正则表达式在编译时完成，语法错误在加载阶段抛出 DataValidationError
+执行时只对含 ${变量} 的操作数做变量替换，然后依次调用 APIAssertion 中的断言方法
+
+支持的规则（按以下顺序匹配前缀）：
+- contains_字段                 响应体 json 包含字段
+- value_字段=期望值             响应体 json 字段值等于
+- time_毫秒                     响应时间小于
+- jsonpath_路径=值 / &值 / >值 / <值 / <>值   JSONPath 等于 / 包含 / 大于 / 小于 / 不等于
+- schema_文件                   JSON Schema 校验
+- header_名称=值                响应头包含（header_text_ 也按此规则匹配，与原先一致）
+- headerValue_名称=值           响应头值等于
+- text_matches_正则             响应文本匹配正则表达式
+- text_contains_文本            响应文本包含
+- cookies_contain_名称          Cookie 存在
+- cookie_value_名称=值          Cookie 值等于
+- response_size_min=N&max=M     响应大小范围
+- structure_文件                响应体 json 结构校验
+"""
+import json
+import re
+from functools import lru_cache
+from typing import Any, Callable, List, Tuple
+from jsonschema import SchemaError
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from common.api_assertion import APIAssertion
+from common.enhanced_data_loader import DataValidationError
+from common.jsonpath_cache import compile_jsonpath
+from common.publicFunction import replace_data
+from common.schema_registry import get_schema_registry
+
+
+class Assertion(object):
+    """
+    编译后的单条断言
+    check 为 APIAssertion 中的断言方法，args 为预先拆分好的操作数
+    rendered 中的下标对应的操作数含 ${变量}，每次执行时先做变量替换
+    """
+
+    __slots__ = ('source', 'kind', 'check', 'args', 'rendered')
+
+    def __init__(self, source: str, kind: str, check: Callable, args: tuple, rendered: tuple = ()):
+        self.source = source
+        self.kind = kind
+        self.check = check
+        self.args = args
+        self.rendered = rendered
+
+    def execute(self, response) -> Tuple[bool, str]:
+        args = self.args
+        if self.rendered:
+            args = list(args)
+            for index in self.rendered:
+                args[index] = replace_data(args[index])
+        return self.check(response, *args)
+
+    def __repr__(self):
+        return f'<Assertion {self.kind} {self.source!r}>'
+
+
+class JsonValueAssertion(Assertion):
+    """value_ 规则的操作数含 ${变量} 时，原先是先替换变量再按 = 拆分，只能在执行时拆分"""
+
+    __slots__ = ()
+
+    def execute(self, response) -> Tuple[bool, str]:
+        parts = replace_data(self.args[0]).split('=', 1)
+        if len(parts) != 2:
+            return False, f'断言格式错误：{self.source}'
+        return self.check(response, *parts)
+
+
+class AssertionPlan(object):
+    """一个用例的全部断言"""
+
+    __slots__ = ('source', 'assertions')
+
+    def __init__(self, source: str, assertions: List[Assertion]):
+        self.source = source
+        self.assertions = assertions
+
+    def execute(self, response) -> Tuple[bool, str]:
+        """
+        依次执行全部断言（失败后继续执行后续断言）
+        :return: (是否全部通过, 汇总信息)
+        """
+        reason_list = []
+        passed_count = 0
+        for i, assertion in enumerate(self.assertions, 1):
+            _isOk, _reason = assertion.execute(response)
+            if _isOk:
+                passed_count += 1
+            status = "✓ 通过" if _isOk else "✗ 失败"
+            reason_list.append(f"---断言{i}: {assertion.source} -> {status}: {_reason}")
+        total_assertions = len(self.assertions)
+        failed_count = total_assertions - passed_count
+        summary = f"断言执行完成: 总计{total_assertions}个, 通过{passed_count}个, 失败{failed_count}个"
+        return failed_count == 0, f"{summary}\n" + "\n".join(reason_list)
+
+    def __len__(self):
+        return len(self.assertions)
+
+
+def _dynamic(args: tuple, *dynamic: int) -> tuple:
+    """返回 args 中需要在执行时替换变量的操作数下标（不含 ${ 的操作数 replace_data 不会改变）"""
+    return tuple(index for index in dynamic if '${' in args[index])
+
+
+def _split(source: str, part: str, separator: str, message: str) -> List[str]:
+    if separator not in part:
+        raise DataValidationError(f'{message}：{source}')
+    return part.split(separator, 1)
+
+
+def _compile_contains(source: str, part: str) -> Assertion:
+    args = (part,)
+    return Assertion(source, 'contains', APIAssertion.assert_json_contains, args, _dynamic(args, 0))
+
+
+def _compile_value(source: str, part: str) -> Assertion:
+    if '${' in part:
+        return JsonValueAssertion(source, 'value', APIAssertion.assert_json_value, (part,))
+    return Assertion(source, 'value', APIAssertion.assert_json_value,
+                     tuple(_split(source, part, '=', '断言格式错误')))
+
+
+def _compile_time(source: str, part: str) -> Assertion:
+    try:
+        max_time = int(part)
+    except ValueError:
+        raise DataValidationError(f'响应时间断言格式错误，应为整数毫秒：{source}')
+    return Assertion(source, 'time', APIAssertion.assert_response_time, (max_time,))
+
+
+# JSONPath 运算符，按原先的判断顺序排列：先 = 再 &，> 与 < 只出现一个时为大于 / 小于，两者都有时为 <>
+_JSONPATH_OPERATORS = (
+    ('=', APIAssertion.assert_json_path),
+    ('&', APIAssertion.assert_json_path_contains),
+    ('>', APIAssertion.assert_json_path_greater),
+    ('<', APIAssertion.assert_json_path_less),
+    ('<>', APIAssertion.assert_json_path_not_equal),
+)
+
+
+def _compile_jsonpath(source: str, part: str) -> Assertion:
+    for operator, check in _JSONPATH_OPERATORS:
+        if operator not in part:
+            continue
+        if operator in ('>', '<') and ('<' if operator == '>' else '>') in part:
+            continue
+        json_path, expected_value = part.split(operator, 1)
+        try:
+            compile_jsonpath(json_path)
+        except Exception as e:
+            raise DataValidationError(f'JSONPath表达式错误：{json_path}（{e}）')
+        args = (json_path, expected_value)
+        return Assertion(source, 'jsonpath' + operator, check, args, _dynamic(args, 1))
+    raise DataValidationError(f'JSONPath断言格式错误，缺少运算符或期望值：{source}')
+
+
+def _compile_schema(source: str, part: str) -> Assertion:
+    return Assertion(source, 'schema', _check_schema_file, (part,))
+
+
+def _compile_structure(source: str, part: str) -> Assertion:
+    return Assertion(source, 'structure', _check_structure_file, (part,))
+
+
+def _check_schema_file(response, schema_file: str):
+    try:
+        validator = get_schema_registry().validator(schema_file)
+    except SchemaError as e:
+        return False, f"JSON Schema断言失败: {str(e)}"
+    return APIAssertion.assert_json_schema(response, validator)
+
+
+def _check_structure_file(response, schema_file: str):
+    return APIAssertion.assert_json_structure(response, get_schema_registry().load(schema_file))
+
+
+def _compile_header(source: str, part: str) -> Assertion:
+    args = tuple(_split(source, part, '=', '头部断言格式错误，缺少期望值'))
+    return Assertion(source, 'header', APIAssertion.assert_header_contains, args, _dynamic(args, 1))
+
+
+def _compile_header_value(source: str, part: str) -> Assertion:
+    args = tuple(_split(source, part, '=', '头部值断言格式错误，缺少期望值'))
+    return Assertion(source, 'headerValue', APIAssertion.assert_header_value, args, _dynamic(args, 1))
+
+
+def _compile_text_matches(source: str, part: str) -> Assertion:
+    try:
+        pattern = re.compile(part)
+    except re.error as e:
+        raise DataValidationError(f'正则表达式错误：{part}（{e}）')
+    return Assertion(source, 'text_matches', APIAssertion.assert_text_matches, (pattern,))
+
+
+def _compile_text_contains(source: str, part: str) -> Assertion:
+    return Assertion(source, 'text_contains', APIAssertion.assert_text_contains, (part,))
+
+
+def _compile_cookies_contain(source: str, part: str) -> Assertion:
+    return Assertion(source, 'cookies_contain', APIAssertion.assert_cookies_contain, (part,))
+
+
+def _compile_cookie_value(source: str, part: str) -> Assertion:
+    args = tuple(_split(source, part, '=', 'Cookie值断言格式错误，缺少期望值'))
+    return Assertion(source, 'cookie_value', APIAssertion.assert_cookie_value, args, _dynamic(args, 1))
+
+
+def _compile_response_size(source: str, part: str) -> Assertion:
+    min_part, max_part = _split(source, part, '&', '响应大小断言格式错误，缺少期望值')
+    try:
+        min_size = int(min_part.split('=')[1])
+        max_size = int(max_part.split('=')[1])
+    except (IndexError, ValueError):
+        raise DataValidationError(f'响应大小断言格式错误，应为 response_size_min=N&max=M：{source}')
+    return Assertion(source, 'response_size', APIAssertion.assert_response_size, (min_size, max_size))
+
+
+# 规则前缀 -> 编译函数，按顺序匹配（header_ 在 header_text_ 之前，header_text_ 实际按 header_ 规则处理）
+_COMPILERS = (
+    ('contains_', _compile_contains),
+    ('value_', _compile_value),
+    ('time_', _compile_time),
+    ('jsonpath_', _compile_jsonpath),
+    ('schema_', _compile_schema),
+    ('header_', _compile_header),
+    ('headerValue_', _compile_header_value),
+    ('header_text_', _compile_text_contains),
+    ('text_matches_', _compile_text_matches),
+    ('text_contains_', _compile_text_contains),
+    ('cookies_contain_', _compile_cookies_contain),
+    ('cookie_value_', _compile_cookie_value),
+    ('response_size_', _compile_response_size),
+    ('structure_', _compile_structure),
+)
+
+
+def compile_assertion(assertion: Any) -> Assertion:
+    """编译单条断言规则，规则未定义或格式错误时抛出 DataValidationError"""
+    if not isinstance(assertion, str):
+        raise DataValidationError(f'断言规则必须是字符串：{assertion!r}')
+    for prefix, compiler in _COMPILERS:
+        if assertion.startswith(prefix):
+            # 与原先一致，去掉规则中全部的前缀字符串
+            return compiler(assertion, assertion.replace(prefix, ''))
+    raise DataValidationError('未定义的断言规则：【{}】'.format(assertion))
+
+
+@lru_cache(maxsize=4096)
+def _compile_plan(source: str) -> AssertionPlan:
+    try:
+        assertions = json.loads(source)
+    except ValueError:
+        raise DataValidationError(f"断言格式错误：{source}")
+    if not isinstance(assertions, list):
+        raise DataValidationError(f"断言格式错误，应为 JSON 数组：{source}")
+    return AssertionPlan(source, [compile_assertion(assertion) for assertion in assertions])
+
+
+def compile_assertions(source: Any) -> AssertionPlan:
+    """
+    编译用例 assertions 列（按源字符串缓存，加载阶段编译过的用例执行时直接命中缓存）
+    :raises DataValidationError: 断言列不是 JSON 数组、规则未定义或格式错误
+    """
+    if not isinstance(source, str):
+        raise DataValidationError(f"断言格式错误：{source}")
+    return _compile_plan(source)
+
+
+if __name__ == '__main__':
+    plan = compile_assertions('["contains_id", "value_code=0", "jsonpath_$.data.age>18", "text_matches_^[{]"]')
+    for item in plan.assertions:
+        print(item, item.args)
+    try:
+        compile_assertions('["jsonpath_$.data.age", "unknown_rule"]')
+    except DataValidationError as e:
+        print(f"❌ {e}")
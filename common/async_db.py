@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+异步数据库访问 - 执行SQL / 批量执行SQL / 数据库断言 的非阻塞版本，供异步执行引擎使用
+等待数据库返回时不占用事件循环，数据库校验可以与进行中的 HTTP 请求重叠
+
+驱动（base.yaml 的 async_db.driver）：
+- aiomysql: 异步 MySQL 驱动（可选依赖，未安装时异步执行引擎仍在线程池中执行同步关键字）
+- sqlite:   本地 sqlite 文件代替 MySQL（测试用），SQL 在 asyncio.to_thread 中执行
+
+关键字名（commkey 配置）、参数和结果格式与同步版本相同；连接池独立，连接池绑定事件循环，随每次异步执行创建和关闭
+"""
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from common.initPath import BASEDIR
+from config.config_loader import get_env_value
+from common.operatorDB import OpeartorDB, build_batch_sqls, record_db_call
+from common.case_dependency import keyword_function_name
+from common.case_runner import build_keyword_kwargs
+from kemel.commKeyword import (parse_execut_sql, finish_execut_sql, parse_sql_batch, finish_sql_batch,
+                               parse_database_assertion, database_assertion_sqls, finish_database_assertion)
+
+# 有异步版本的数据库关键字（CommKeyword 方法名）
+ASYNC_DB_KEYWORDS = ('execut_sql', 'execut_sql_batch', 'assert_database')
+
+
+def _async_db_config() -> Dict[str, Any]:
+    """读取 base.yaml 中的 async_db 配置"""
+    return get_env_value('async_db') or {}
+
+
+def _fetch_size() -> int:
+    return int((get_env_value('db_pool') or {}).get('fetch_size') or 1000)
+
+
+class AiomysqlBackend(object):
+    """aiomysql 连接池（服务端游标分批读取结果）"""
+
+    def __init__(self, connect_args: Dict[str, Any], max_size: int):
+        """
+        :param connect_args: 连接参数（OpeartorDB.connect_args，不含多语句标志）
+        :param max_size: 每个连接池最多打开的连接数
+        """
+        import aiomysql
+        from pymysql.constants import CLIENT
+        self._aiomysql = aiomysql
+        self._multi_statements_flag = CLIENT.MULTI_STATEMENTS
+        self.connect_args = dict(connect_args)
+        self.connect_args['db'] = self.connect_args.pop('database')
+        self.max_size = max_size
+        self._pools = {}  # 是否开启多语句 -> 连接池
+
+    async def execute(self, sqls: List[str], multi_statements: bool = True) -> List[Dict[str, Any]]:
+        """
+        在同一个连接上依次执行 SQL，返回每条语句按列存放的结果
+        :param multi_statements: 是否使用开启多语句的连接池（多语句 SQL 只能在该连接池上执行）
+        """
+        pool = self._pools.get(multi_statements)
+        if pool is None:
+            connect_args = dict(self.connect_args)
+            if multi_statements:
+                connect_args['client_flag'] = self._multi_statements_flag
+            # 借出时丢弃已断开的连接；出错时仍在事务中的连接归还时由连接池关闭，未提交的事务由数据库回滚
+            pool = self._pools[multi_statements] = await self._aiomysql.create_pool(
+                minsize=0, maxsize=self.max_size, **connect_args)
+        results = []
+        async with pool.acquire() as conn:
+            async with conn.cursor(self._aiomysql.SSCursor) as cursor:
+                for sql in sqls:
+                    await cursor.execute(sql)
+                    while True:
+                        results.append(await self._read_result(cursor))
+                        if not await cursor.nextset():
+                            break
+        return results
+
+    @staticmethod
+    async def _read_result(cursor) -> Dict[str, Any]:
+        """分批读取当前结果集，转换为按列存放的结果（与 OpeartorDB._read_result 相同）"""
+        if cursor.description is None:
+            return {'columns': [], 'rowcount': max(cursor.rowcount, 0), 'data': {}}
+        columns = [column[0] for column in cursor.description]
+        values = [[] for _ in columns]
+        count = 0
+        fetch_size = _fetch_size()
+        while True:
+            rows = await cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for column_values, batch in zip(values, zip(*rows)):
+                column_values.extend(batch)
+            count += len(rows)
+        return {'columns': columns, 'rowcount': count, 'data': dict(zip(columns, values))}
+
+    async def close(self) -> None:
+        pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+            await pool.wait_closed()
+
+
+def split_statements(sql: str) -> List[str]:
+    """按 sqlite 的语法把多语句 SQL 拆分为单条语句（字符串中的 ; 不拆分）"""
+    statements = []
+    buffer = ''
+    for part in sql.split(';'):
+        buffer += part + ';'
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip(' ;\r\n\t'):
+                statements.append(buffer.strip().rstrip(';'))
+            buffer = ''
+    if buffer.strip(' ;\r\n\t'):
+        statements.append(buffer.strip().rstrip(';'))
+    return statements
+
+
+class SqliteBackend(object):
+    """sqlite 文件代替 MySQL（测试用），SQL 在线程中执行，同一时间只执行一批"""
+
+    def __init__(self, sqlite_file: str):
+        self.sqlite_file = sqlite_file
+        self._conn = None
+        self._lock = threading.Lock()
+
+    async def execute(self, sqls: List[str], multi_statements: bool = True) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._execute, sqls, multi_statements)
+
+    def _execute(self, sqls: List[str], multi_statements: bool) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._conn is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.sqlite_file)), exist_ok=True)
+                # 自动提交，与 MySQL 连接池一致；START TRANSACTION 转为 BEGIN
+                self._conn = sqlite3.connect(self.sqlite_file, isolation_level=None, check_same_thread=False)
+            results = []
+            cursor = self._conn.cursor()
+            try:
+                for sql in sqls:
+                    # 不开启多语句时整条执行，与 MySQL 一样拒绝多语句
+                    for statement in (split_statements(sql) if multi_statements else [sql]):
+                        if statement.upper() == 'START TRANSACTION':
+                            statement = 'BEGIN'
+                        cursor.execute(statement)
+                        results.append(OpeartorDB._read_result(cursor, _fetch_size()))
+            except Exception:
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+                raise
+            finally:
+                cursor.close()
+            return results
+
+    async def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class AsyncOpeartorDB(object):
+    """OpeartorDB 的异步版本"""
+
+    def __init__(self, driver: str = None, sqlite_file: str = None, max_size: int = None):
+        """
+        :param driver: aiomysql / sqlite，默认读取 base.yaml 的 async_db.driver
+        :param sqlite_file: sqlite 驱动使用的数据库文件（相对路径基于项目根目录）
+        :param max_size: 连接池最大连接数，默认读取 base.yaml 的 db_pool.max_size
+        :raises ImportError: 使用 aiomysql 驱动但未安装 aiomysql
+        """
+        config = _async_db_config()
+        self.driver = driver or config.get('driver') or 'aiomysql'
+        if self.driver == 'sqlite':
+            sqlite_file = sqlite_file or config.get('sqlite_file') or 'TestReport/fake_db.sqlite'
+            self.backend = SqliteBackend(os.path.join(BASEDIR, sqlite_file))
+        else:
+            max_size = int(max_size or (get_env_value('db_pool') or {}).get('max_size') or 4)
+            self.backend = AiomysqlBackend(OpeartorDB().connect_args(), max_size)
+
+    async def excetSql(self, sql, table_name=None) -> Tuple[bool, Any]:
+        """执行一条 SQL，查询时返回第一行（与 OpeartorDB.excetSql 相同，连接不开启多语句）"""
+        isOK, result = await self.excetBatch([sql], transaction=False, multi_statements=False)
+        if isOK is False:
+            return isOK, result
+        first = result[0]
+        if not first['columns']:
+            return True, ''
+        if not first['rowcount']:
+            return True, '查询结果为空'
+        return True, {column: first['data'][column][0] for column in first['columns']}
+
+    async def excetBatch(self, statements, transaction=True, multi_statements=True) -> Tuple[bool, Any]:
+        """多条 SQL 一次执行，返回每条语句按列存放的结果（与 OpeartorDB.excetBatch 相同）"""
+        sqls = build_batch_sqls(statements, transaction, multi_statements)
+        if not sqls:
+            return False, 'SQL语句为空'
+        try:
+            results = await self.backend.execute(sqls, multi_statements)
+        except Exception as e:
+            return False, 'SQL执行失败,原因：[' + str(e) + ']'
+        finally:
+            record_db_call(len(sqls))
+        if transaction:
+            # 去掉 START TRANSACTION / COMMIT 的结果
+            results = results[1:-1]
+        return True, results
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+class AsyncDBKeywords(object):
+    """数据库关键字的异步版本，参数解析和结果处理与 CommKeyword 共用"""
+
+    def __init__(self, db: AsyncOpeartorDB = None):
+        self.db = db or AsyncOpeartorDB()
+
+    @classmethod
+    def create(cls) -> Optional['AsyncDBKeywords']:
+        """按配置创建，驱动不可用（未安装 aiomysql）时返回 None"""
+        try:
+            return cls()
+        except ImportError as e:
+            print(f"⚠️  异步数据库驱动不可用（{e}），数据库关键字在线程池中执行")
+            return None
+
+    @staticmethod
+    def handles(case: Dict[str, Any]) -> bool:
+        """是否为有异步版本的数据库关键字用例"""
+        try:
+            return keyword_function_name(case) in ASYNC_DB_KEYWORDS
+        except Exception:
+            return False
+
+    async def run(self, case: Dict[str, Any]) -> Tuple[bool, Any]:
+        """执行数据库关键字用例"""
+        try:
+            func = getattr(self, keyword_function_name(case))
+            return await func(**build_keyword_kwargs(case))
+        except Exception as e:
+            return False, 'keyword:执行失败，估计不存在，异常：' + str(e)
+
+    async def execut_sql(self, **kwargs):
+        isOK, parsed = parse_execut_sql(kwargs)
+        if isOK is False:
+            return isOK, parsed
+        sql, table_name, var, par = parsed
+        isOK, result = await self.db.excetSql(sql, table_name)
+        return finish_execut_sql(sql, var, par, isOK, result)
+
+    async def execut_sql_batch(self, **kwargs):
+        isOK, parsed = parse_sql_batch(kwargs)
+        if isOK is False:
+            return isOK, parsed
+        statements, var = parsed
+        isOK, result = await self.db.excetBatch(statements)
+        return finish_sql_batch(var, isOK, result)
+
+    async def assert_database(self, **kwargs):
+        isOK, checks = parse_database_assertion(kwargs)
+        if isOK is False:
+            return isOK, checks
+        sqls = database_assertion_sqls(checks)
+        isOK, result = await self.db.excetBatch(sqls, transaction=False, multi_statements=False)
+        return finish_database_assertion(checks, sqls, isOK, result)
+
+    async def close(self) -> None:
+        await self.db.close()
+
+
+if __name__ == '__main__':
+    async def demo():
+        keywords = AsyncDBKeywords(AsyncOpeartorDB(driver='sqlite', sqlite_file='TestReport/demo_db.sqlite'))
+        print(await keywords.execut_sql_batch(param_1='["create table if not exists users(id int, name text)", '
+                                                      '"delete from users", "insert into users values(1, \'张三\')"]'))
+        print(await keywords.assert_database(param_5='["select name from users", "users", "name", "结果等于", "张三"]'))
+        await keywords.close()
+
+    asyncio.run(demo())
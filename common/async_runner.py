@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+异步用例执行引擎 - 同一工作簿内相互独立的用例并发执行
+
+调度规则：
+1. 接口用例与紧随其后、引用 ${response} 的关键字用例组成一个执行单元
+2. 按 ${变量} 依赖图调度：单元在其全部前置单元完成后立即执行，相互独立的依赖链并行
+3. 设置变量、等待、执行SQL 等关键字是顺序屏障：等待之前的单元全部完成后再执行
+4. 同一主机的并发请求数受 per_host_limit 限制
+5. 执行SQL / 批量执行SQL / 数据库断言 使用异步数据库驱动（见 async_db），等待数据库时不阻塞其他单元
+
+限制：依赖图需要全部用例，引用数据表的用例会先全部展开到内存中；
+展开后的用例数超过 max_cases 时不使用本引擎，改为逐条串行执行（边展开边执行）
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+from urllib.parse import urlparse
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from config.config_loader import get_env_value
+from common.case_runner import CaseRunner
+from common.case_dependency import CaseUnit, DependencyGraph, build_units
+from common.publicFunction import replace_data, get_variable_resolver
+from common.variable_store import get_variable_store
+from common.jsonpath_cache import get_jsonpath_cache_stats
+from common.operatorDB import get_db_stats
+from common.async_db import AsyncDBKeywords
+from kemel.methodFactory import get_keyword_stats
+from common import phase_profiler
+from common.phase_profiler import new_profile, record_case
+
+
+class AsyncCaseRunner:
+    """异步用例执行引擎"""
+
+    def __init__(self, per_host_limit: int = None, max_concurrency: int = None,
+                 case_runner: CaseRunner = None, async_db: bool = None):
+        """
+        :param per_host_limit: 单个主机的最大并发请求数
+        :param max_concurrency: 全局最大并发请求数（线程池大小）
+        :param case_runner: 单条用例执行器
+        :param async_db: 数据库关键字是否使用异步驱动，默认读取 base.yaml 的 async_db.enabled
+        """
+        config = get_env_value('async_runner') or {}
+        self.per_host_limit = per_host_limit or int(config.get('per_host_limit') or 8)
+        self.max_concurrency = max_concurrency or int(config.get('max_concurrency') or 32)
+        self.max_cases = int(config.get('max_cases') or 20000)
+        self.case_runner = case_runner or CaseRunner()
+        self.async_db = async_db if async_db is not None else bool((get_env_value('async_db') or {}).get('enabled', True))
+        self._db_keywords = None
+        self._host_semaphores = {}
+        self._executor = None
+        self.last_graph = None
+        self.unit_durations = {}
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def _send(self, case: Dict[str, Any], profile=None):
+        """异步 HTTP 客户端：在连接池共享的线程池中发送请求，不阻塞事件循环"""
+        host = urlparse(replace_data(str(case.get('url')))).netloc
+        loop = asyncio.get_running_loop()
+        async with self._host_semaphore(host):
+            return await loop.run_in_executor(self._executor, self.case_runner.send, case, profile)
+
+    def _run_sync(self, case: Dict[str, Any]) -> Dict[str, Any]:
+        return self.case_runner.run_case(case)
+
+    async def _run_unit(self, unit: CaseUnit, dependencies: List[asyncio.Task]) -> List[Dict[str, Any]]:
+        """执行一个单元：先等待依赖，再发送请求，最后在事件循环线程内完成响应处理"""
+        if dependencies:
+            await asyncio.gather(*dependencies)
+        unit_start = time.time()
+        try:
+            return await self._execute_unit(unit)
+        finally:
+            self.unit_durations[unit.index] = time.time() - unit_start
+
+    async def _execute_unit(self, unit: CaseUnit) -> List[Dict[str, Any]]:
+        results = []
+        first = unit.cases[0]
+        if not unit.is_http:
+            if self._db_keywords is not None and self._db_keywords.handles(first) \
+                    and not self.case_runner.should_skip(first):
+                start_time = time.time()
+                profile = new_profile()
+                is_ok, message = await self._db_keywords.run(first)
+                record_case(first, profile, time.time() - start_time)
+                results.append(CaseRunner.build_result(first, is_ok, message, time.time() - start_time))
+            elif unit.barrier or AsyncDBKeywords.handles(first):
+                # 等待、执行SQL、数据库断言 可能长时间阻塞，放到线程池执行
+                loop = asyncio.get_running_loop()
+                results.append(await loop.run_in_executor(self._executor, self._run_sync, first))
+            else:
+                results.append(self._run_sync(first))
+            return results
+
+        start_time = time.time()
+        if self.case_runner.should_skip(first) or first.get('compile_error'):
+            return [self.case_runner.run_case(case) for case in unit.cases]
+        # 请求和响应处理在不同线程，阶段耗时记录随用例传递
+        profile = new_profile()
+        is_ok, response = await self._send(first, profile)
+        if not is_ok:
+            record_case(first, profile, time.time() - start_time)
+            results.append(CaseRunner.build_result(first, False, response, time.time() - start_time))
+            results.extend(CaseRunner.build_result(case, False, '前置接口请求失败', 0) for case in unit.cases[1:])
+            return results
+
+        # 以下处理不含 await，单元在自己的场景作用域内执行，${response} 不会被并发请求覆盖
+        with get_variable_store().scenario({'response': response.text.strip()}):
+            is_ok, message = self.case_runner.handle_response(first, response, profile)
+            record_case(first, profile, time.time() - start_time)
+            results.append(CaseRunner.build_result(first, is_ok, message, time.time() - start_time))
+            for case in unit.cases[1:]:
+                results.append(self.case_runner.run_case(case))
+        return results
+
+    async def run_async(self, cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        并发执行用例
+        :param cases: 用例列表
+        :return: 按原始顺序排列的执行结果
+        """
+        graph = DependencyGraph(build_units(list(cases)))
+        self.last_graph = graph
+        self.unit_durations = {}
+        self._host_semaphores = {}
+        # 异步数据库连接池绑定当前事件循环，每次执行单独创建
+        self._db_keywords = AsyncDBKeywords.create() if self.async_db else None
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                self._executor = executor
+                tasks = []
+                for unit in graph.units:
+                    dependencies = [tasks[index] for index in graph.predecessors(unit.index)]
+                    tasks.append(asyncio.ensure_future(self._run_unit(unit, dependencies)))
+                unit_results = await asyncio.gather(*tasks)
+                self._executor = None
+        finally:
+            if self._db_keywords is not None:
+                await self._db_keywords.close()
+                self._db_keywords = None
+        return [result for results in unit_results for result in results]
+
+    def run(self, cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """同步入口"""
+        return asyncio.run(self.run_async(cases))
+
+    def accepts(self, expander, cases: List[Dict[str, Any]]) -> bool:
+        """
+        展开后的用例数是否在 max_cases 以内（按数据表行数计算，不展开）
+        超过时打印警告，调用方改为逐条串行执行
+        :param expander: CaseExpander
+        :param cases: 展开前的用例
+        """
+        total = sum(expander.count(case) for case in cases)
+        if total <= self.max_cases:
+            return True
+        print(f"⚠️  展开后共 {total} 条用例，超过 async_runner.max_cases ({self.max_cases})："
+              f"异步执行需要先展开全部用例，改为逐条串行执行")
+        return False
+
+
+def print_summary(results: List[Dict[str, Any]], duration: float) -> None:
+    """打印执行摘要"""
+    executed = [r for r in results if not r['skipped']]
+    failed = [r for r in executed if not r['success']]
+    print("\n" + "=" * 60)
+    print("📊 异步执行摘要")
+    print("=" * 60)
+    print(f"  📦 用例数: {len(executed)}")
+    print(f"  ✅ 成功: {len(executed) - len(failed)}")
+    print(f"  ❌ 失败: {len(failed)}")
+    print(f"  ⏱️  总耗时: {duration:.2f}s")
+    hits = get_variable_resolver().get_stats()
+    print(f"  🔎 变量查找: 场景 {hits['hits']['scenario']} / 系统 {hits['hits']['env']} / "
+          f"worker {hits['hits']['worker']} / 全局 {hits['hits']['global']} / 未找到 {hits['misses']}")
+    jsonpath_stats = get_jsonpath_cache_stats()
+    print(f"  🧮 JSONPath 编译缓存: 命中率 {jsonpath_stats['hit_rate']:.1%} "
+          f"({jsonpath_stats['hits']}/{jsonpath_stats['hits'] + jsonpath_stats['misses']}, {jsonpath_stats['size']} 条)")
+    db_stats = get_db_stats()
+    if db_stats['calls']:
+        print(f"  🗄️  数据库: {db_stats['calls']} 次 / 往返 {db_stats['round_trips']} 次 "
+              f"(平均 {db_stats['round_trips_per_call']:.1f} 次)")
+    keyword_stats = get_keyword_stats()
+    if keyword_stats:
+        top = ', '.join(f"{keyword} {stats['calls']} 次/平均 {stats['avg_ms']:.1f}ms"
+                        for keyword, stats in list(keyword_stats.items())[:3])
+        print(f"  🔑 关键字耗时 (前 3): {top}")
+    for result in failed:
+        print(f"     ❌ [{result['sheet']}] 用例{result['case_id']} {result['title']}: {result['message'][:200]}")
+    print("=" * 60)
+
+
+def write_allure_results(reporter, cases: List[Dict[str, Any]], results: List[Dict[str, Any]],
+                         suite: str = None) -> List[Dict[str, Any]]:
+    """
+    把执行结果逐条写入 allure-results（注释掉的用例不写入，与同步 worker 一致）
+    用例并发执行，请求 / 响应附件不写入报告，失败原因见结果信息
+    :param reporter: AllureCaseReporter
+    :param cases: 用例列表
+    :param results: run 返回的执行结果，与 cases 一一对应
+    :return: 写入的结果
+    """
+    written = []
+    for case, result in zip(cases, results):
+        if result['skipped']:
+            continue
+        with reporter.case(case, suite=suite, duration=result['duration']) as outcome:
+            outcome['success'] = result['success']
+            outcome['message'] = result['message']
+        written.append(result)
+    return written
+
+
+def run_serial(case_runner: CaseRunner, cases: Iterable[Dict[str, Any]], suite: str = None,
+               result_dir: str = None) -> int:
+    """
+    逐条串行执行（边展开边执行），只保留失败用例，内存占用不随数据行数增长
+    :param case_runner: 单条用例执行器
+    :param cases: 用例（可以是生成器）
+    :param result_dir: allure-results 目录，为空时不写入
+    :return: 进程退出码
+    """
+    reporter = None
+    if result_dir:
+        from common.allure_writer import AllureCaseReporter
+        reporter = AllureCaseReporter(result_dir)
+    start_time = time.time()
+    executed = 0
+    failed = []
+    try:
+        for case in cases:
+            if case_runner.should_skip(case):
+                continue
+            if reporter is not None:
+                with reporter.case(case, suite=suite) as outcome:
+                    result = case_runner.run_case(case)
+                    outcome['success'] = result['success']
+                    outcome['message'] = result['message']
+            else:
+                result = case_runner.run_case(case)
+            executed += 1
+            if not result['success']:
+                failed.append(result)
+    finally:
+        if reporter is not None:
+            reporter.close()
+    print("\n" + "=" * 60)
+    print("📊 串行执行摘要")
+    print("=" * 60)
+    print(f"  📦 用例数: {executed}")
+    print(f"  ✅ 成功: {executed - len(failed)}")
+    print(f"  ❌ 失败: {len(failed)}")
+    print(f"  ⏱️  总耗时: {time.time() - start_time:.2f}s")
+    for result in failed:
+        print(f"     ❌ [{result['sheet']}] 用例{result['case_id']} {result['title']}: {result['message'][:200]}")
+    print("=" * 60)
+    if phase_profiler.is_enabled():
+        if result_dir:
+            phase_profiler.write_samples(result_dir)
+        else:
+            report = phase_profiler.write_report(phase_profiler.take_samples(), phase_profiler.report_path())
+            phase_profiler.print_report(report)
+    return 1 if failed else 0
+
+
+def main(file_path: Optional[str] = None) -> int:
+    """
+    执行单个工作簿（并发执行引擎的 worker 入口）
+    :param file_path: 用例文件，默认读取环境变量 TEST_DATA_FILE
+    :return: 进程退出码
+    """
+    from common.enhanced_data_loader import EnhancedDataLoader
+    from common.data_driven import CaseExpander
+    file_path = file_path or os.getenv('TEST_DATA_FILE')
+    loader = EnhancedDataLoader()
+    file_path = loader._resolve_file_path(file_path)
+    cases = loader.load_test_cases(file_path)
+    expander = CaseExpander(file_path)
+    runner = AsyncCaseRunner()
+    if not runner.accepts(expander, cases):
+        return run_serial(runner.case_runner, expander.expand(cases), suite=Path(file_path).name,
+                          result_dir=os.getenv('ALLURE_RESULTS_DIR'))
+    # 依赖图需要全部用例，引用数据表的用例在这里展开
+    cases = list(expander.expand(cases))
+    start_time = time.time()
+    results = runner.run(cases)
+    runner.last_graph.print_report(runner.unit_durations)
+    print_summary(results, time.time() - start_time)
+    if os.getenv('ALLURE_RESULTS_DIR'):
+        # 由并发执行引擎启动：结果写入 worker 的 allure-results 目录，合并报告时汇总
+        from common.allure_writer import AllureCaseReporter
+        reporter = AllureCaseReporter(os.getenv('ALLURE_RESULTS_DIR'))
+        try:
+            write_allure_results(reporter, cases, results, suite=Path(file_path).name)
+        finally:
+            reporter.close()
+    if phase_profiler.is_enabled():
+        if os.getenv('ALLURE_RESULTS_DIR'):
+            # 由并发执行引擎启动：样本写入结果目录，合并报告时汇总
+            phase_profiler.write_samples(os.getenv('ALLURE_RESULTS_DIR'))
+        else:
+            report = phase_profiler.write_report(phase_profiler.take_samples(), phase_profiler.report_path())
+            phase_profiler.print_report(report)
+    return 0 if all(r['success'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1] if len(sys.argv) > 1 else None))
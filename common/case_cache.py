@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+用例持久化缓存 - 把校验后的用例列表以 pickle 存入 sqlite，跨进程、跨次执行复用
+缓存键为 (文件内容哈希, 加载器版本, 工作表)，工作簿内容变化、解析逻辑升级或注释标识修改后自动失效
+并发执行时所有 worker 共用同一个缓存文件（WAL 模式，读写互不阻塞）
+"""
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from common.initPath import BASEDIR
+from config.config_loader import get_env_value
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cases (
+    file_hash TEXT NOT NULL,
+    loader_version TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    created REAL NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (file_hash, loader_version, sheet)
+)
+'''
+
+
+class PersistentCaseCache(object):
+    """基于 sqlite 的用例缓存"""
+
+    def __init__(self, cache_file: str = None, enabled: bool = None):
+        """
+        :param cache_file: 缓存文件路径，相对路径基于项目根目录，默认读取 base.yaml 的 case_cache.cache_file
+        :param enabled: 是否启用，默认读取 base.yaml 的 case_cache.enabled
+        """
+        config = get_env_value('case_cache') or {}
+        self.enabled = config.get('enabled', True) if enabled is None else enabled
+        self.cache_file = os.path.join(BASEDIR, cache_file or config.get('cache_file') or 'TestReport/.case_cache.sqlite')
+        self._hashes = {}  # 文件路径 -> ((mtime, size), 内容哈希)，同一进程内文件未变化时不重复计算
+        self._lock = threading.Lock()
+        self._initialized = False
+        self.hits = 0
+        self.misses = 0
+        self.load_seconds = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.cache_file, timeout=30)
+        if not self._initialized:
+            with self._lock:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(_SCHEMA)
+                conn.commit()
+                self._initialized = True
+        return conn
+
+    def file_hash(self, file_path: str) -> str:
+        """文件内容哈希（sha1）"""
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(file_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        digest = hashlib.sha1()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        self._hashes[file_path] = (signature, digest.hexdigest())
+        return digest.hexdigest()
+
+    def get(self, file_path: str, loader_version: str, sheet: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        读取缓存
+        :return: 用例列表，未命中或缓存不可用时返回 None
+        """
+        if not self.enabled:
+            return None
+        start_time = time.time()
+        try:
+            file_hash = self.file_hash(file_path)
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT data FROM cases WHERE file_hash=? AND loader_version=? AND sheet=?',
+                                   (file_hash, loader_version, sheet or '*')).fetchone()
+            finally:
+                conn.close()
+            if row is None:
+                self.misses += 1
+                return None
+            cases = pickle.loads(row[0])
+        except (OSError, sqlite3.Error, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.load_seconds += time.time() - start_time
+        return cases
+
+    def set(self, file_path: str, loader_version: str, cases: List[Dict[str, Any]], sheet: Optional[str] = None) -> None:
+        """写入缓存，同时删除该文件同一工作表的旧版本"""
+        if not self.enabled:
+            return
+        try:
+            file_hash = self.file_hash(file_path)
+            data = pickle.dumps(cases, protocol=pickle.HIGHEST_PROTOCOL)
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute('DELETE FROM cases WHERE file_path=? AND sheet=? AND file_hash<>?',
+                                 (os.path.abspath(file_path), sheet or '*', file_hash))
+                    conn.execute('INSERT OR REPLACE INTO cases VALUES (?, ?, ?, ?, ?, ?)',
+                                 (file_hash, loader_version, sheet or '*', os.path.abspath(file_path), time.time(), data))
+            finally:
+                conn.close()
+        except (OSError, sqlite3.Error, pickle.PicklingError) as e:
+            print(f"⚠️ 写入用例缓存失败: {e}")
+
+    def clear(self) -> None:
+        """清空缓存文件"""
+        if os.path.exists(self.cache_file):
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute('DELETE FROM cases')
+            finally:
+                conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        return {
+            'enabled': self.enabled,
+            'cache_file': self.cache_file,
+            'hits': self.hits,
+            'misses': self.misses,
+            'load_seconds': self.load_seconds,
+        }
+
+
+_cache = None
+
+
+def get_case_cache() -> PersistentCaseCache:
+    """获取进程内共享的持久化用例缓存"""
+    global _cache
+    if _cache is None:
+        _cache = PersistentCaseCache()
+    return _cache
+
+
+if __name__ == '__main__':
+    cache = PersistentCaseCache(cache_file='TestReport/.case_cache_demo.sqlite')
+    cache.set(__file__, 'demo', [{'case_id': 1, 'title': 'demo'}])
+    print(cache.get(__file__, 'demo'), cache.get_stats())
+    os.remove(cache.cache_file)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+用例目录 - 多个工作簿加载、校验后的全部用例，按 (工作簿, 工作表) 建立索引
+由 EnhancedDataLoader.load_catalog 并行加载生成，供调度器拆分任务使用
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+
+class CaseCatalog(object):
+    """用例目录"""
+
+    def __init__(self):
+        self.files = []           # 工作簿路径（按加载顺序）
+        self._cases = {}          # 工作簿路径 -> 用例列表
+        self._sheets = {}         # 工作簿路径 -> {工作表: 用例列表}（保持工作簿中的顺序）
+        self.errors = {}          # 工作簿路径 -> 加载失败原因
+        self.cached_files = 0     # 从持久化缓存加载的工作簿数
+        self.parsed_files = 0     # 重新解析的工作簿数
+        self.seconds = 0.0        # 加载墙钟耗时
+
+    def add(self, file_path, cases: List[Any], cached: bool = False) -> None:
+        """添加一个工作簿的用例"""
+        key = str(file_path)
+        if key not in self._cases and key not in self.errors:
+            self.files.append(key)
+        self._cases[key] = cases
+        sheets = {}
+        for case in cases:
+            sheets.setdefault(case.get('sheet'), []).append(case)
+        self._sheets[key] = sheets
+        if cached:
+            self.cached_files += 1
+        else:
+            self.parsed_files += 1
+
+    def add_error(self, file_path, error: str) -> None:
+        """记录加载失败的工作簿"""
+        key = str(file_path)
+        if key not in self._cases and key not in self.errors:
+            self.files.append(key)
+        self.errors[key] = error
+
+    def __contains__(self, file_path) -> bool:
+        return str(file_path) in self._cases
+
+    def cases_for(self, file_path, sheets: Optional[Sequence[str]] = None) -> List[Any]:
+        """
+        工作簿的用例
+        :param sheets: 只取这些工作表（按给出的顺序），默认全部
+        :raises KeyError: 工作簿不在目录中（未加载或加载失败）
+        """
+        key = str(file_path)
+        if not sheets:
+            return self._cases[key]
+        by_sheet = self._sheets[key]
+        return [case for sheet in sheets for case in by_sheet.get(sheet, ())]
+
+    def sheets(self, file_path) -> List[str]:
+        """工作簿中有用例的工作表（保持原始顺序）"""
+        return list(self._sheets[str(file_path)])
+
+    @property
+    def case_count(self) -> int:
+        return sum(len(cases) for cases in self._cases.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """加载统计"""
+        return {
+            'files': len(self.files),
+            'cases': self.case_count,
+            'failed_files': len(self.errors),
+            'cached_files': self.cached_files,
+            'parsed_files': self.parsed_files,
+            'seconds': self.seconds,
+            'cases_per_second': self.case_count / self.seconds if self.seconds else 0.0,
+        }
+
+    def print_summary(self) -> None:
+        stats = self.get_stats()
+        print(f"📚 用例目录: {stats['files']} 个工作簿 / {stats['cases']} 条用例，"
+              f"加载耗时 {stats['seconds']:.2f}s ({stats['cases_per_second']:.0f} 条/秒，"
+              f"解析 {stats['parsed_files']} 个，缓存命中 {stats['cached_files']} 个)")
+        for file_path, error in self.errors.items():
+            print(f"   ⚠️  {Path(file_path).name} 加载失败: {error}")
+
+
+if __name__ == '__main__':
+    from common.enhanced_data_loader import EnhancedDataLoader
+    catalog = EnhancedDataLoader().load_catalog(sys.argv[1:])
+    catalog.print_summary()
+    for file_path in catalog.files:
+        if file_path in catalog:
+            print(f"  {Path(file_path).name}: {', '.join(catalog.sheets(file_path))}")
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+用例依赖分析 - 根据 ${变量} 的产生者与消费者构建依赖图（DAG）
+
+依赖边类型：
+- data:    写后读，消费者等待产生该变量的单元
+- order:   读后写 / 写后写，覆盖变量前等待仍在读写它的单元
+- barrier: 设置变量、等待、执行SQL 等顺序屏障
+"""
+import re
+from typing import Dict, Any, List, Optional, Set, Tuple
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from config.config_loader import get_env_value
+
+# 发送 HTTP 请求的用例类型
+HTTP_METHODS = ('get', 'post', 'put', 'delete')
+
+# 可能引用 ${变量} 的列
+VARIABLE_COLUMNS = ('url', 'headers', 'data', 'assertions', 'other')
+
+VARIABLE_PATTERN = re.compile(r'\${(.*?)}')
+
+# commkey 配置：关键字名（小写）-> CommKeyword 方法名，首次使用时构建
+_keyword_methods = None
+
+
+def is_http_case(case: Dict[str, Any]) -> bool:
+    """是否为接口请求用例"""
+    return str(case.get('method') or '').lower() in HTTP_METHODS
+
+
+def keyword_method_map() -> Dict[str, str]:
+    """commkey 配置的关键字名（不区分大小写，统一为小写）到 CommKeyword 方法名的映射"""
+    global _keyword_methods
+    if _keyword_methods is None:
+        _keyword_methods = {str(keyword).lower(): method for keyword, method in (get_env_value('commkey') or {}).items()}
+    return _keyword_methods
+
+
+def keyword_function_name(case: Dict[str, Any]) -> str:
+    """获取关键字用例对应的 CommKeyword 方法名，未配置时返回 None"""
+    return keyword_method_map().get(str(case.get('method') or '').lower())
+
+
+def referenced_variables(case: Dict[str, Any]) -> Set[str]:
+    """
+    静态分析用例引用的 ${变量}
+    :return: 变量名集合
+    """
+    names = set()
+    for column in VARIABLE_COLUMNS:
+        value = case.get(column)
+        if isinstance(value, str) and '${' in value:
+            names.update(VARIABLE_PATTERN.findall(value))
+    return names
+
+
+def produced_variables(case: Dict[str, Any]) -> Set[str]:
+    """
+    静态分析用例执行后写入变量池的变量
+    :return: 变量名集合
+    """
+    names = set()
+    if is_http_case(case):
+        names.add('response')
+        other = case.get('other')
+        # 格式: obj|变量名:json键
+        if isinstance(other, str) and other.startswith('obj|') and ':' in other:
+            names.add(other.split('|', 1)[1].split(':', 1)[0])
+        return names
+
+    func = keyword_function_name(case)
+    if func in ('set_variable', 'get_json_value_as_key', 'replace', 'random_str', 'fetch_all_ids'):
+        result = case.get('title')
+        if result:
+            names.update(VARIABLE_PATTERN.findall(str(result)) or [str(result)])
+    elif func in ('execut_sql', 'execut_sql_batch'):
+        if case.get('headers'):
+            names.add(str(case['headers']))
+    elif func == 'new_random_str':
+        if case.get('data'):
+            names.add(str(case['data']))
+    return names
+
+
+# 需要保持顺序的关键字（屏障）
+BARRIER_KEYWORDS = ('设置变量', '等待', '执行SQL', '批量执行SQL')
+
+
+class CaseUnit:
+    """执行单元：一条接口用例及其后续消费 ${response} 的关键字用例，或一条独立的关键字用例"""
+
+    def __init__(self, index: int, case: Dict[str, Any]):
+        self.index = index
+        self.cases = [case]
+        self.consumes = referenced_variables(case)
+        self.produces = produced_variables(case)
+        self.barrier = str(case.get('method') or '') in BARRIER_KEYWORDS
+        self.is_http = is_http_case(case)
+
+    def attach(self, case: Dict[str, Any]) -> None:
+        """追加一条消费本单元响应的关键字用例"""
+        self.cases.append(case)
+        self.consumes |= referenced_variables(case) - self.produces
+        self.produces |= produced_variables(case)
+
+    @property
+    def external_consumes(self) -> Set[str]:
+        """依赖单元外部产生的变量（${response} 由单元自身提供）"""
+        return self.consumes - {'response'}
+
+    @property
+    def external_produces(self) -> Set[str]:
+        """单元对外产生的变量"""
+        return self.produces - {'response'}
+
+    @property
+    def label(self) -> str:
+        first = self.cases[0]
+        return f"[{first.get('sheet')}] 用例{first.get('case_id')} {first.get('title')}"
+
+
+def build_units(cases: List[Dict[str, Any]]) -> List[CaseUnit]:
+    """
+    将用例列表划分为执行单元
+    :param cases: 用例列表（保持原始顺序）
+    :return: 执行单元列表
+    """
+    units = []
+    last_http_unit = None
+    for case in cases:
+        if (not is_http_case(case) and last_http_unit is not None
+                and str(case.get('method') or '') not in BARRIER_KEYWORDS
+                and 'response' in referenced_variables(case)):
+            last_http_unit.attach(case)
+            continue
+        unit = CaseUnit(len(units), case)
+        units.append(unit)
+        if unit.is_http:
+            last_http_unit = unit
+        elif unit.barrier:
+            last_http_unit = None
+    return units
+
+
+class DependencyGraph:
+    """执行单元依赖图，节点为单元序号，边由前置单元指向后续单元"""
+
+    def __init__(self, units: List[CaseUnit]):
+        self.units = units
+        self._predecessors = {unit.index: set() for unit in units}
+        self._successors = {unit.index: set() for unit in units}
+        self.edge_kinds = {}
+        self._build()
+
+    @classmethod
+    def from_cases(cls, cases: List[Dict[str, Any]]) -> 'DependencyGraph':
+        """从用例列表构建依赖图"""
+        return cls(build_units(list(cases)))
+
+    def _add_edge(self, source: int, target: int, kind: str) -> None:
+        if source == target or source in self._predecessors[target]:
+            return
+        self._predecessors[target].add(source)
+        self._successors[source].add(target)
+        self.edge_kinds[(source, target)] = kind
+
+    def _build(self) -> None:
+        producers = {}  # 变量名 -> 最后产生该变量的单元
+        readers = {}  # 变量名 -> 上次写入后读取该变量的单元
+        last_barrier = None
+        since_barrier = []
+        for unit in self.units:
+            if unit.barrier:
+                for index in since_barrier or ([last_barrier] if last_barrier is not None else []):
+                    self._add_edge(index, unit.index, 'barrier')
+                last_barrier = unit.index
+                since_barrier = []
+            else:
+                if last_barrier is not None:
+                    self._add_edge(last_barrier, unit.index, 'barrier')
+                for name in unit.external_consumes:
+                    if name in producers:
+                        self._add_edge(producers[name], unit.index, 'data')
+                for name in unit.external_produces:
+                    for index in readers.get(name, ()):
+                        self._add_edge(index, unit.index, 'order')
+                    if name in producers:
+                        self._add_edge(producers[name], unit.index, 'order')
+                since_barrier.append(unit.index)
+            for name in unit.external_consumes:
+                readers.setdefault(name, set()).add(unit.index)
+            for name in unit.external_produces:
+                producers[name] = unit.index
+                readers[name] = set()
+
+    def predecessors(self, index: int) -> Set[int]:
+        """单元的直接前置单元"""
+        return self._predecessors[index]
+
+    def successors(self, index: int) -> Set[int]:
+        """单元的直接后续单元"""
+        return self._successors[index]
+
+    def critical_path(self, weights: Optional[Dict[int, float]] = None) -> Tuple[float, List[int]]:
+        """
+        计算关键路径（最长依赖链）
+        :param weights: 单元权重（如执行耗时），默认每个单元为 1
+        :return: (关键路径长度, 单元序号列表)
+        """
+        if not self.units:
+            return 0, []
+        finish = {}
+        parent = {}
+        # 单元序号即原始顺序，边总是从小序号指向大序号，因此天然是拓扑序
+        for unit in self.units:
+            weight = weights.get(unit.index, 0) if weights is not None else 1
+            best = None
+            for pred in self._predecessors[unit.index]:
+                if best is None or finish[pred] > finish[best]:
+                    best = pred
+            finish[unit.index] = (finish[best] if best is not None else 0) + weight
+            parent[unit.index] = best
+        end = max(finish, key=finish.get)
+        path = [end]
+        while parent[path[-1]] is not None:
+            path.append(parent[path[-1]])
+        return finish[end], list(reversed(path))
+
+    def max_parallelism(self) -> int:
+        """按层（到起点的最长距离）分组后最宽的一层，即理论最大并发单元数"""
+        level = {}
+        width = {}
+        for unit in self.units:
+            preds = self._predecessors[unit.index]
+            level[unit.index] = max((level[p] + 1 for p in preds), default=0)
+            width[level[unit.index]] = width.get(level[unit.index], 0) + 1
+        return max(width.values(), default=0)
+
+    def summary(self, weights: Optional[Dict[int, float]] = None) -> Dict[str, Any]:
+        """
+        依赖图统计
+        :param weights: 单元实际耗时（秒），提供时额外给出按耗时计算的关键路径
+        """
+        length, path = self.critical_path()
+        result = {
+            'cases': sum(len(unit.cases) for unit in self.units),
+            'units': len(self.units),
+            'edges': len(self.edge_kinds),
+            'barriers': sum(1 for unit in self.units if unit.barrier),
+            'critical_path_units': length,
+            'critical_path': [self.units[i].label for i in path],
+            'max_parallelism': self.max_parallelism(),
+        }
+        if weights:
+            duration, duration_path = self.critical_path(weights)
+            result['serial_duration'] = sum(weights.values())
+            result['critical_path_duration'] = duration
+            result['critical_path_by_duration'] = [self.units[i].label for i in duration_path]
+        return result
+
+    def print_report(self, weights: Optional[Dict[int, float]] = None) -> None:
+        """打印依赖分析报告"""
+        summary = self.summary(weights)
+        print("\n" + "=" * 60)
+        print("🔗 用例依赖分析")
+        print("=" * 60)
+        print(f"  📦 用例数: {summary['cases']}  执行单元: {summary['units']}  依赖边: {summary['edges']}")
+        print(f"  🚧 顺序屏障: {summary['barriers']}")
+        print(f"  📏 关键路径长度: {summary['critical_path_units']} 个单元 (共 {summary['units']} 个)")
+        print(f"  🚀 理论最大并发单元数: {summary['max_parallelism']}")
+        if weights:
+            print(f"  ⏱️  串行耗时合计: {summary['serial_duration']:.2f}s")
+            print(f"  ⏱️  关键路径耗时: {summary['critical_path_duration']:.2f}s")
+        print("=" * 60)
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+紧凑的用例记录 - 固定列存放在 __slots__ 中，不再每行重复保存一份列名字典
+提供与 dict 一致的映射接口（case['url']、case.get('data')、**case、dict(case)），可直接传给 MethodFactory
+固定列以外的列（表头中的自定义列）存放在 _extra 字典中
+"""
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+CASE_COLUMNS = ('case_id', 'title', 'method', 'url', 'headers', 'data', 'assertions', 'other', 'sheet')
+
+
+class _Missing(object):
+    """未设置的固定列（区别于单元格为空时的 None），pickle 后仍是同一个对象"""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return '_MISSING'
+
+    def __repr__(self):
+        return '<missing>'
+
+
+_MISSING = _Missing()
+
+
+class CaseRecord(MutableMapping):
+    """用例记录，键的顺序为固定列（CASE_COLUMNS 顺序）在前，其余列按写入顺序在后"""
+
+    __slots__ = CASE_COLUMNS + ('_extra',)
+
+    def __init__(self, mapping: Optional[Dict[str, Any]] = None, **kwargs):
+        for column in CASE_COLUMNS:
+            setattr(self, column, _MISSING)
+        self._extra = None
+        if mapping:
+            self.update(mapping)
+        if kwargs:
+            self.update(kwargs)
+
+    def __getitem__(self, key):
+        if key in _COLUMN_SET:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key, default=None):
+        if key in _COLUMN_SET:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __setitem__(self, key, value):
+        if key in _COLUMN_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _COLUMN_SET:
+            if getattr(self, key) is _MISSING:
+                raise KeyError(key)
+            setattr(self, key, _MISSING)
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        if key in _COLUMN_SET:
+            return getattr(self, key) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for column in CASE_COLUMNS:
+            if getattr(self, column) is not _MISSING:
+                yield column
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self):
+        count = sum(1 for column in CASE_COLUMNS if getattr(self, column) is not _MISSING)
+        return count + (len(self._extra) if self._extra else 0)
+
+    def __eq__(self, other):
+        if isinstance(other, (CaseRecord, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f'CaseRecord({dict(self.items())!r})'
+
+    def copy(self) -> 'CaseRecord':
+        """浅复制（直接复制各列的值，数据驱动展开时每行复制一次）"""
+        record = CaseRecord.__new__(CaseRecord)
+        for column in CASE_COLUMNS:
+            setattr(record, column, getattr(self, column))
+        record._extra = dict(self._extra) if self._extra else None
+        return record
+
+    def __getstate__(self):
+        return tuple(getattr(self, column) for column in CASE_COLUMNS), self._extra
+
+    def __setstate__(self, state):
+        values, extra = state
+        for column, value in zip(CASE_COLUMNS, values):
+            setattr(self, column, value)
+        self._extra = extra
+
+
+_COLUMN_SET = frozenset(CASE_COLUMNS)
+
+
+def record_builder(headers: Sequence[Any], **fixed) -> Callable[[Sequence[Any]], CaseRecord]:
+    """
+    按表头生成行转换函数，结果与 dict(zip(headers, row)) 的键值一致
+    列的归属（固定列 / 自定义列）只在这里判断一次
+    :param headers: 表头
+    :param fixed: 每条记录都设置的值（如 sheet=工作表名）
+    :return: row -> CaseRecord
+    """
+    slots = []
+    extras = []
+    for index, header in enumerate(headers):
+        if header in _COLUMN_SET:
+            slots.append((index, CaseRecord.__dict__[header].__set__))
+        else:
+            extras.append((index, header))
+    fixed_slots = [(CaseRecord.__dict__[key].__set__, value) for key, value in fixed.items() if key in _COLUMN_SET]
+    fixed_extras = {key: value for key, value in fixed.items() if key not in _COLUMN_SET}
+    width = len(headers)
+
+    def build(row: Sequence[Any]) -> CaseRecord:
+        record = CaseRecord.__new__(CaseRecord)
+        for column in CASE_COLUMNS:
+            setattr(record, column, _MISSING)
+        record._extra = None
+        # 与 zip 一致：行比表头短时缺少的列视为不存在
+        size = min(width, len(row))
+        for index, setter in slots:
+            if index < size:
+                setter(record, row[index])
+        if extras:
+            extra = {header: row[index] for index, header in extras if index < size}
+            record._extra = extra or None
+        for setter, value in fixed_slots:
+            setter(record, value)
+        if fixed_extras:
+            if record._extra is None:
+                record._extra = {}
+            record._extra.update(fixed_extras)
+        return record
+
+    return build
+
+
+if __name__ == '__main__':
+    build = record_builder(['case_id', 'title', 'method', 'url', '备注'], sheet='demo')
+    record = build((1, '登录', 'post', '${host}/login', '冒烟'))
+    print(record, len(record), record.get('data', '<无>'), dict(**record) == dict(record))
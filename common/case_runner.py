@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+用例执行器 - 在进程内执行单条 Excel 用例
+负责：发送请求 / 执行关键字、状态码处理、断言、变量提取与报告附件
+"""
+import time
+from typing import Dict, Any, Iterable, List, Tuple
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from config.config_loader import get_env_var_value
+from common.http_status_handler import HTTPStatusHandler
+from common.deal_with_response import deal_with_res
+from kemel.methodFactory import MethodFactory
+from common.case_dependency import is_http_case
+from common.parsed_response import ParsedResponse
+from common.phase_profiler import phase, activate, new_profile, record_case
+
+# 关键字用例的参数列映射：关键字参数名 -> Excel 列名
+KEYWORD_PARAM_COLUMNS = {
+    'result': 'title',
+    'param_1': 'url',
+    'param_2': 'headers',
+    'param_3': 'data',
+    'param_5': 'other',
+}
+
+
+def build_keyword_kwargs(case: Dict[str, Any]) -> Dict[str, Any]:
+    """将关键字用例行转换为 CommKeyword 方法的参数"""
+    kwargs = dict(case)
+    for param, column in KEYWORD_PARAM_COLUMNS.items():
+        kwargs[param] = case.get(column)
+    return kwargs
+
+
+class CaseRunner(object):
+    """单条用例执行器"""
+
+    def __init__(self, method_factory: MethodFactory = None):
+        """
+        :param method_factory: 关键字工厂，默认新建
+        """
+        self.factory = method_factory or MethodFactory()
+        self.status_handler = HTTPStatusHandler()
+        self.note = get_env_var_value('identifier', 'note')
+
+    def should_skip(self, case: Dict[str, Any]) -> bool:
+        """注释掉的用例（case_id 以注释符开头）不执行"""
+        case_id = case.get('case_id')
+        return case_id is not None and str(case_id).startswith(self.note)
+
+    def send(self, case: Dict[str, Any], profile=None) -> Tuple[bool, Any]:
+        """
+        发送接口请求
+        :param profile: 阶段耗时记录（在其他线程发送请求时传入，见 phase_profiler）
+        :return: (是否成功, 响应对象或失败原因)
+        """
+        with activate(profile):
+            return self.factory.method_factory(**case)
+
+    def handle_response(self, case: Dict[str, Any], response, profile=None) -> Tuple[bool, str]:
+        """
+        状态码处理、断言、变量提取，并写入报告附件
+        :param profile: 阶段耗时记录（在其他线程处理响应时传入，见 phase_profiler）
+        :return: (是否通过, 日志信息)
+        """
+        with activate(profile):
+            response = ParsedResponse.wrap(response)
+            timer = response.elapsed.total_seconds() * 1000
+            result = self.status_handler.handle_status_code(response, case, timer, self.factory.method_factory)
+            is_ok, log_msg = result[0], result[1]
+            reason = result[2] if len(result) > 2 and result[2] else log_msg
+            with phase('allure_attach'):
+                deal_with_res(case.get('data'), response, reason)
+        return is_ok, log_msg
+
+    def run_keyword(self, case: Dict[str, Any]) -> Tuple[bool, Any]:
+        """执行关键字用例"""
+        return self.factory.method_factory(**build_keyword_kwargs(case))
+
+    def run_case(self, case: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        执行单条用例
+        :return: 执行结果字典
+        """
+        start_time = time.time()
+        if self.should_skip(case):
+            return self.build_result(case, True, '用例已注释，跳过执行', 0, skipped=True)
+        if case.get('compile_error'):
+            # 断言或数据表在加载时编译失败，不发送请求
+            return self.build_result(case, False, case['compile_error'], 0)
+        profile = new_profile()
+        with activate(profile):
+            if is_http_case(case):
+                is_ok, response = self.send(case)
+                if is_ok:
+                    is_ok, message = self.handle_response(case, response)
+                else:
+                    message = response
+            else:
+                is_ok, message = self.run_keyword(case)
+        duration = time.time() - start_time
+        record_case(case, profile, duration)
+        return self.build_result(case, is_ok, message, duration)
+
+    def run_cases(self, cases: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """按顺序执行多条用例"""
+        return [self.run_case(case) for case in cases]
+
+    @staticmethod
+    def build_result(case: Dict[str, Any], success, message, duration: float, skipped: bool = False) -> Dict[str, Any]:
+        """构建执行结果字典"""
+        return {
+            'case_id': case.get('case_id'),
+            'sheet': case.get('sheet'),
+            'title': case.get('title'),
+            'method': case.get('method'),
+            # 部分关键字（如 伪数据）第一个返回值为生成的值，非 False 即视为成功
+            'success': success is not False and success is not None,
+            'skipped': skipped,
+            'message': str(message),
+            'duration': duration,
+        }
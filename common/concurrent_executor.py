@@ -16,6 +16,10 @@ import json
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from setup_paths import init_paths
 init_paths()
+from config.config_loader import get_env_var_value
+from common.work_scheduler import WorkStealingScheduler, DurationHistory, plan_tasks
+from common.worker_pool import WarmWorkerPool
+from common import phase_profiler
 
 
 class FileSelector:
@@ -198,6 +202,13 @@ class ConcurrentExecutor:
         self.max_workers = max_workers or os.cpu_count()
         self.current_dir = current_dir or os.getcwd()
         self.results_base_dir = Path(current_dir) / 'TestReport' / 'temp_results'
+        # 用例执行方式: pytest / async（两种调度方式都生效）
+        self.case_runner = get_env_var_value('concurrent', 'case_runner') or 'pytest'
+        # 调度方式: work_stealing(按工作表拆分，长驻 worker 领取任务) / file(每个文件一个子进程)
+        self.scheduler = get_env_var_value('concurrent', 'scheduler') or 'work_stealing'
+        self.timeout = float(get_env_var_value('concurrent', 'timeout') or 600)
+        # 预热 worker 进程池，多次执行之间复用，close() 时关闭
+        self.worker_pool = None
         
         # 确保临时结果目录存在
         self.results_base_dir.mkdir(parents=True, exist_ok=True)
@@ -222,16 +233,20 @@ class ConcurrentExecutor:
         # 🔧 设置 Python 输出编码为 UTF-8，避免 GBK 编码错误（特别是 emoji 字符）
         env['PYTHONIOENCODING'] = 'utf-8'
         
-        # 构建 pytest 命令
-        test_file = Path(self.current_dir) / 'test_case' / 'test_case.py'
-        cmd = [
-            sys.executable, '-m', 'pytest',
-            str(test_file),
-            '-s', '-q',
-            '--clean-alluredir',
-            f'--alluredir={result_dir}',
-            '--tb=short',  # 短格式的错误信息
-        ]
+        if self.case_runner == 'async':
+            # 异步执行引擎：文件内相互独立的用例并发执行
+            cmd = [sys.executable, str(Path(__file__).parent / 'async_runner.py'), str(file_path)]
+        else:
+            # 构建 pytest 命令
+            test_file = Path(self.current_dir) / 'test_case' / 'test_case.py'
+            cmd = [
+                sys.executable, '-m', 'pytest',
+                str(test_file),
+                '-s', '-q',
+                '--clean-alluredir',
+                f'--alluredir={result_dir}',
+                '--tb=short',  # 短格式的错误信息
+            ]
         
         print(f"\n🚀 开始执行: {file_path.name} (Worker {worker_id})")
         
@@ -308,8 +323,13 @@ class ConcurrentExecutor:
         print(f"   📊 文件数: {len(file_list)}")
         print(f"   ⚙️  并发数: {self.max_workers}")
         print(f"   📁 结果目录: {self.results_base_dir}")
+        print(f"   🧭 调度方式: {self.scheduler}")
+        print(f"   🏃 执行方式: {self.case_runner}")
         print(f"{'='*60}\n")
         
+        if self.scheduler == 'work_stealing':
+            return self.execute_work_stealing(file_list)
+        
         results = []
         
         # 准备任务列表：(文件路径, worker_id)
@@ -359,6 +379,72 @@ class ConcurrentExecutor:
         print(f"{'='*60}\n")
         
         return results
+    
+    def execute_work_stealing(self, file_list: List[Path]) -> List[Dict[str, Any]]:
+        """
+        按工作表拆分任务，由长驻 worker 以工作窃取方式执行
+        :param file_list: 要执行的文件列表
+        :return: 按文件汇总的执行结果列表（与文件级并发的结果格式一致）
+        """
+        history = DurationHistory(base_dir=self.current_dir)
+        from common.enhanced_data_loader import EnhancedDataLoader
+        # 多个工作簿并行解析、校验，解析结果写入持久化缓存，worker 领取任务时直接读取
+        catalog = EnhancedDataLoader().load_catalog(file_list, max_workers=self.max_workers)
+        catalog.print_summary()
+        tasks = plan_tasks(file_list, history, catalog)
+        print(f"🧩 拆分为 {len(tasks)} 个任务，预估总耗时 {sum(t.estimate for t in tasks):.1f}s")
+        
+        completed = [0]
+        
+        def on_result(task, outcome):
+            completed[0] += 1
+            status = "✅ 通过" if outcome['success'] else "❌ 失败"
+            print(f"\n[{completed[0]}/{len(tasks)}] {status} | {task.task_id:<45s} | "
+                  f"Worker {outcome['worker_id']} | 耗时: {outcome['duration']:.2f}s")
+            if not outcome['success'] and outcome.get('error'):
+                print(f"         ⚠️  错误: {outcome['error']}")
+        
+        if self.worker_pool is None:
+            self.worker_pool = WarmWorkerPool(min(self.max_workers, len(tasks)) or 1, self.results_base_dir,
+                                              case_runner=self.case_runner)
+        scheduler = WorkStealingScheduler(self.max_workers, self.results_base_dir, timeout=self.timeout,
+                                          pool=self.worker_pool)
+        start_time = time.time()
+        task_results = scheduler.run(tasks, on_result=on_result)
+        wall_time = time.time() - start_time
+        
+        for task, outcome in zip(tasks, task_results):
+            history.update(task.file_path, outcome.get('sheet_durations') or {})
+        history.save()
+        
+        # 按文件汇总，ReportAggregator 和执行摘要仍以文件为单位
+        results = []
+        for file_index, file_path in enumerate(file_list):
+            file_outcomes = [r for t, r in zip(tasks, task_results) if t.file_index == file_index]
+            errors = [r['error'] for r in file_outcomes if r.get('error')]
+            results.append({
+                'file': file_path.name,
+                'file_path': str(file_path),
+                'result_dir': self.results_base_dir / f'file_{file_index}',
+                'duration': sum(r['duration'] for r in file_outcomes),
+                'success': bool(file_outcomes) and all(r['success'] for r in file_outcomes),
+                'error': '; '.join(errors) or (None if file_outcomes else '没有可执行的任务'),
+            })
+        
+        print(f"\n{'='*60}")
+        print(f"✅ 并发执行完成 (墙钟耗时 {wall_time:.2f}s，窃取任务 {scheduler.steals} 次)")
+        if self.worker_pool.startup:
+            startup = self.worker_pool.startup.values()
+            print(f"🔥 worker 预热耗时: 平均 {sum(startup) / len(startup):.2f}s（每个 worker 仅一次）")
+        print(f"{'='*60}\n")
+        
+        return results
+    
+    def close(self) -> None:
+        """关闭预热 worker 进程池"""
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+            self.worker_pool = None
 
 
 class ReportAggregator:
@@ -389,10 +475,14 @@ class ReportAggregator:
             
             # 复制所有结果文件
             total_files = 0
+            sample_files = []
             for result_dir in self.results_dirs:
                 if result_dir.exists():
                     for file in result_dir.glob('*'):
-                        if file.is_file():
+                        if file.is_file() and file.name.startswith(phase_profiler.SAMPLE_PREFIX):
+                            # 阶段耗时样本不交给 allure，汇总为单独的报告
+                            sample_files.append(file)
+                        elif file.is_file():
                             # 确保文件名唯一（避免覆盖）
                             dest_file = self.merged_results_dir / file.name
                             counter = 1
@@ -406,6 +496,11 @@ class ReportAggregator:
                             total_files += 1
             
             print(f"   ✅ 已合并 {total_files} 个结果文件")
+            if sample_files:
+                profile_path = phase_profiler.report_path(self.merged_results_dir)
+                report = phase_profiler.write_report(phase_profiler.read_samples(sample_files), profile_path)
+                print(f"   ⏱️  阶段耗时报告: {profile_path}")
+                phase_profiler.print_report(report)
             return True
             
         except Exception as e:
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+数据驱动用例展开 - 用例的 params 列引用一张数据表，执行时按数据表的每一行展开为一条具体用例
+
+数据表写法（params 列，列名见 base.yaml 的 data_driven.column）：
+- sheet:工作表              同一工作簿中的工作表（建议以注释符开头，如 #用户数据，避免被当作用例加载）
+- sheet:文件.xlsx!工作表    其他工作簿中的工作表
+- csv:文件.csv              CSV 文件，第一行为列名
+- 伪数据:行数:列=类型,...   faker 生成的数据，类型与 伪数据 关键字相同，如 伪数据:1000:name=姓名,phone=手机号
+                            随机数可以写位数 n=随机数(6)；末尾追加 :种子 时每次生成相同的数据
+相对路径先在用例文件所在目录中查找，再到 data 目录中查找
+
+展开规则：
+- 数据表的列是行内变量：用例中的 ${列名} 替换为该行的值，其他 ${变量} 保持原样，执行时再替换
+- 展开后的 case_id 为 原case_id_行号（行号从 1 开始），不再带 params 列
+- 数据表逐行读取、用例逐条产出，不预先生成全部用例，10 万行的数据表内存占用也不会增长
+"""
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import openpyxl
+import pandas as pd
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from common.initPath import DATADIR
+from config.config_loader import get_env_value, get_env_var_value
+from common.enhanced_data_loader import DataValidationError
+from common.case_dependency import VARIABLE_COLUMNS
+from common.template_engine import compile_template
+
+# 展开时替换行内变量的列（关键字用例的结果变量名在 title 列）
+RENDER_COLUMNS = ('title',) + VARIABLE_COLUMNS
+
+# 伪数据类型 -> 生成函数 (faker, 参数) -> 值，与 伪数据 关键字共用
+FAKE_VALUE_TYPES = {
+    '姓名': lambda f, arg: f.name(),
+    '手机号': lambda f, arg: f.phone_number(),
+    '邮箱': lambda f, arg: f.email(),
+    '身份证号': lambda f, arg: f.ssn(),
+    '公司': lambda f, arg: f.company(),
+    '随机数': lambda f, arg: f.random_number(arg),
+    '地址': lambda f, arg: f.address(),
+    '用户名': lambda f, arg: f.user_name(),
+    'ip段': lambda f, arg: f.ipv4(),
+}
+
+# 伪数据列定义：列名=类型 或 列名=类型(参数)
+_FAKE_FIELD = re.compile(r'^\s*([^=\s]+)\s*=\s*([^()\s]+)\s*(?:\(\s*(\d+)\s*\))?\s*$')
+
+
+def param_column() -> str:
+    """引用数据表的列名"""
+    return (get_env_value('data_driven') or {}).get('column') or 'params'
+
+
+def fake_value(faker, value_type: str, arg: Any = None) -> Any:
+    """按 伪数据 类型生成一个值，未知类型返回 None"""
+    generate = FAKE_VALUE_TYPES.get(value_type)
+    return generate(faker, arg) if generate else None
+
+
+def parse_param_spec(spec: str) -> Tuple[str, tuple]:
+    """
+    解析数据表写法（只检查写法，不打开文件）
+    :return: ('sheet', (文件或None, 工作表)) / ('csv', (文件,)) / ('伪数据', (行数, ((列名, 类型, 参数), ...), 种子))
+    :raises DataValidationError: 写法错误
+    """
+    kind, sep, rest = str(spec).strip().partition(':')
+    kind = kind.strip().lower()
+    rest = rest.strip()
+    if not sep or not rest:
+        raise DataValidationError(f"数据表写法错误: {spec}（应为 sheet:工作表 / csv:文件 / 伪数据:行数:列=类型）")
+    if kind == 'sheet':
+        path, _, sheet = rest.rpartition('!')
+        if not sheet:
+            raise DataValidationError(f"数据表写法错误: {spec}（缺少工作表名）")
+        return 'sheet', (path.strip() or None, sheet.strip())
+    if kind == 'csv':
+        return 'csv', (rest,)
+    if kind == '伪数据':
+        parts = rest.split(':')
+        if len(parts) not in (2, 3) or not parts[0].strip().isdigit():
+            raise DataValidationError(f"数据表写法错误: {spec}（应为 伪数据:行数:列=类型,列=类型[:种子]）")
+        fields = []
+        for item in parts[1].split(','):
+            match = _FAKE_FIELD.match(item)
+            if not match or match.group(2) not in FAKE_VALUE_TYPES:
+                raise DataValidationError(f"伪数据列定义错误: {item.strip()}（类型可选: {' / '.join(FAKE_VALUE_TYPES)}）")
+            fields.append((match.group(1), match.group(2), int(match.group(3)) if match.group(3) else None))
+        seed = None
+        if len(parts) == 3:
+            if not parts[2].strip().isdigit():
+                raise DataValidationError(f"数据表写法错误: {spec}（种子应为整数）")
+            seed = int(parts[2])
+        return '伪数据', (int(parts[0]), tuple(fields), seed)
+    raise DataValidationError(f"不支持的数据表类型: {kind}（可选 sheet / csv / 伪数据）")
+
+
+def resolve_data_path(path: str, case_file: Optional[str] = None) -> str:
+    """数据文件路径：绝对路径 > 用例文件所在目录 > data 目录"""
+    candidates = [Path(path)] if os.path.isabs(path) else []
+    if not candidates:
+        if case_file:
+            candidates.append(Path(case_file).parent / path)
+        candidates.append(Path(DATADIR) / path)
+    for candidate in candidates:
+        if candidate.is_file():
+            return str(candidate)
+    raise DataValidationError(f"数据文件不存在: {path}")
+
+
+class DataSource(object):
+    """数据表：逐行产出 {列名: 值}"""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        self._columns = None
+
+    @property
+    def columns(self) -> List[str]:
+        """列名（即行内变量名）"""
+        if self._columns is None:
+            self._columns = self._read_columns()
+        return self._columns
+
+    def _read_columns(self) -> List[str]:
+        raise NotImplementedError
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        """行数（用于调度时估算耗时，可以是近似值）"""
+        raise NotImplementedError
+
+
+class SheetSource(DataSource):
+    """Excel 工作表（只读模式逐行读取）"""
+
+    def __init__(self, spec: str, file_path: str, sheet: str):
+        super().__init__(spec)
+        self.file_path = file_path
+        self.sheet = sheet
+
+    def _open(self):
+        try:
+            wb = openpyxl.load_workbook(self.file_path, read_only=True)
+        except Exception as e:
+            raise DataValidationError(f"数据表 {self.spec} 加载失败: {e}")
+        if self.sheet not in wb.sheetnames:
+            wb.close()
+            raise DataValidationError(f"数据表 {self.spec} 加载失败: 工作表 '{self.sheet}' 不存在")
+        return wb
+
+    def _read_columns(self) -> List[str]:
+        wb = self._open()
+        try:
+            headers = next(wb[self.sheet].iter_rows(values_only=True), None) or ()
+        finally:
+            wb.close()
+        return [str(header) for header in headers if header is not None]
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        wb = self._open()
+        try:
+            rows = wb[self.sheet].iter_rows(values_only=True)
+            headers = next(rows, None)
+            if headers is None:
+                return
+            columns = [(index, str(header)) for index, header in enumerate(headers) if header is not None]
+            for row in rows:
+                # 跳过空行
+                if all(value is None for value in row):
+                    continue
+                yield {name: row[index] if index < len(row) else None for index, name in columns}
+        finally:
+            wb.close()
+
+    def count(self) -> int:
+        wb = self._open()
+        try:
+            max_row = wb[self.sheet].max_row
+            if max_row is None:
+                # 工作表没有记录尺寸时逐行计数
+                return sum(1 for _ in wb[self.sheet].iter_rows(min_row=2, values_only=True))
+            return max(0, max_row - 1)
+        finally:
+            wb.close()
+
+
+class CsvSource(DataSource):
+    """CSV 文件（分块读取，所有列按字符串读取，空单元格为 None）"""
+
+    def __init__(self, spec: str, file_path: str):
+        super().__init__(spec)
+        self.file_path = file_path
+
+    def _read_columns(self) -> List[str]:
+        try:
+            return [str(column) for column in pd.read_csv(self.file_path, dtype=str, nrows=0).columns]
+        except Exception as e:
+            raise DataValidationError(f"数据表 {self.spec} 加载失败: {e}")
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        chunksize = int((get_env_value('data_loader') or {}).get('csv_chunksize') or 10000)
+        try:
+            reader = pd.read_csv(self.file_path, dtype=str, keep_default_na=False, na_values=[''],
+                                 chunksize=chunksize)
+        except Exception as e:
+            raise DataValidationError(f"数据表 {self.spec} 加载失败: {e}")
+        with reader:
+            for chunk in reader:
+                columns = [str(column) for column in chunk.columns]
+                chunk = chunk.astype(object).where(chunk.notna(), None)
+                for row in chunk.itertuples(index=False, name=None):
+                    yield dict(zip(columns, row))
+
+    def count(self) -> int:
+        # 按换行符计数，单元格内含换行时为近似值
+        lines = 0
+        last = b'\n'
+        with open(self.file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                lines += block.count(b'\n')
+                last = block[-1:]
+        if last != b'\n':
+            lines += 1
+        return max(0, lines - 1)
+
+
+class FakerSource(DataSource):
+    """faker 生成的数据（按需逐行生成）"""
+
+    def __init__(self, spec: str, rows: int, fields: Tuple[tuple, ...], seed: Optional[int] = None):
+        super().__init__(spec)
+        self.rows = rows
+        self.fields = fields
+        self.seed = seed
+
+    def _read_columns(self) -> List[str]:
+        return [name for name, _, _ in self.fields]
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        try:
+            from faker import Faker
+        except ImportError:
+            raise DataValidationError("faker 模块未安装")
+        faker = Faker(locale='zh_CN')
+        if self.seed is not None:
+            faker.seed_instance(self.seed)
+        for _ in range(self.rows):
+            yield {name: fake_value(faker, value_type, arg) for name, value_type, arg in self.fields}
+
+    def count(self) -> int:
+        return self.rows
+
+
+def open_source(spec: str, case_file: Optional[str] = None) -> DataSource:
+    """
+    按写法创建数据表（不读取数据）
+    :param case_file: 用例文件，sheet:工作表 引用的工作簿，以及相对路径的查找目录
+    """
+    kind, args = parse_param_spec(spec)
+    if kind == 'sheet':
+        path, sheet = args
+        if path:
+            return SheetSource(spec, resolve_data_path(path, case_file), sheet)
+        if not case_file:
+            raise DataValidationError(f"数据表 {spec} 未指定工作簿")
+        return SheetSource(spec, str(case_file), sheet)
+    if kind == 'csv':
+        return CsvSource(spec, resolve_data_path(args[0], case_file))
+    return FakerSource(spec, *args)
+
+
+class CaseExpander(object):
+    """按 params 列展开用例，每个用例文件一个实例（同一数据表只创建一次）"""
+
+    def __init__(self, case_file: Optional[str] = None, column: Optional[str] = None):
+        """
+        :param case_file: 用例文件路径
+        :param column: 引用数据表的列名，默认读取 base.yaml 的 data_driven.column
+        """
+        self.case_file = str(case_file) if case_file else None
+        self.column = column or param_column()
+        self.note = get_env_var_value('identifier', 'note')
+        self._sources = {}
+        self.parameterized_cases = 0  # 引用了数据表的用例数
+        self.generated_cases = 0      # 展开后生成的用例数
+
+    def source(self, case: Dict[str, Any]) -> Optional[DataSource]:
+        """用例引用的数据表，没有引用、用例已注释或编译失败时为 None"""
+        spec = case.get(self.column)
+        if spec is None or not str(spec).strip():
+            return None
+        if str(case.get('case_id')).startswith(self.note) or case.get('compile_error'):
+            return None
+        spec = str(spec).strip()
+        if spec not in self._sources:
+            self._sources[spec] = open_source(spec, self.case_file)
+        return self._sources[spec]
+
+    def expand(self, cases: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        逐条展开用例，没有引用数据表的用例原样产出
+        数据表文件或工作表不存在、读取出错时产出一条带 compile_error 的用例（执行时判定失败），不影响其他用例
+        """
+        for case in cases:
+            try:
+                source = self.source(case)
+            except DataValidationError as e:
+                yield self._failed(case, e)
+                continue
+            if source is None:
+                yield case
+            else:
+                self.parameterized_cases += 1
+                yield from self.expand_case(case, source)
+
+    def expand_case(self, case: Dict[str, Any], source: DataSource) -> Iterator[Dict[str, Any]]:
+        """按数据表的每一行产出一条用例"""
+        templates = {column: compile_template(case[column]) for column in RENDER_COLUMNS
+                     if isinstance(case.get(column), str) and '${' in case[column]}
+        case_id = case.get('case_id')
+        index = 0
+        try:
+            for index, row in enumerate(source.iter_rows(), 1):
+                values = {name: '' if value is None else value for name, value in row.items()}
+                expanded = case.copy()
+                del expanded[self.column]
+                expanded['case_id'] = f'{case_id}_{index}'
+                for column, template in templates.items():
+                    expanded[column] = template.render_partial(values)
+                self.generated_cases += 1
+                yield expanded
+        except DataValidationError as e:
+            # 读取到一半出错时，失败用例的编号接在已产出的行之后
+            yield self._failed(case, e, index + 1 if index else None)
+
+    def _failed(self, case: Dict[str, Any], error: Exception, row: Optional[int] = None) -> Dict[str, Any]:
+        """数据表无法读取时代替展开结果的失败用例"""
+        failed = case.copy()
+        if self.column in failed:
+            del failed[self.column]
+        if row is not None:
+            failed['case_id'] = f"{case.get('case_id')}_{row}"
+        failed['compile_error'] = f"数据表加载失败: {error}"
+        return failed
+
+    def count(self, case: Dict[str, Any]) -> int:
+        """用例展开后的条数（数据表无法读取时按 1 条估算）"""
+        try:
+            source = self.source(case)
+            return 1 if source is None else source.count()
+        except (DataValidationError, OSError):
+            return 1
+
+    def row_variables(self, case: Dict[str, Any]) -> Set[str]:
+        """用例的行内变量名（展开时替换，不依赖其他用例；数据表无法读取时为空）"""
+        try:
+            source = self.source(case)
+            return set() if source is None else set(source.columns)
+        except DataValidationError:
+            return set()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'parameterized_cases': self.parameterized_cases,
+            'generated_cases': self.generated_cases,
+            'sources': len(self._sources),
+        }
+
+
+if __name__ == '__main__':
+    expander = CaseExpander()
+    template_case = {'case_id': 1, 'title': '注册', 'method': 'post', 'url': '${host}/api/register',
+                     'data': '{"name": "${name}", "phone": "${phone}"}', 'params': '伪数据:3:name=姓名,phone=手机号:1'}
+    for expanded_case in expander.expand([template_case]):
+        print(expanded_case['case_id'], expanded_case['url'], expanded_case['data'])
+    print(expander.get_stats())
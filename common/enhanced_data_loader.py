@@ -5,9 +5,13 @@
 """
 import json
 import yaml
-import hashlib
+import multiprocessing
+import threading
 import time
-from typing import Dict, List, Any, Optional, Union
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Union, Iterator, Sequence
 from pathlib import Path
 import openpyxl
 import pandas as pd
@@ -20,7 +24,16 @@ from setup_paths import init_paths
 init_paths()
 
 from common.initPath import DATADIR
-from config.config_loader import get_env_now, get_env_var_value
+from config.config_loader import get_env_now, get_env_var_value, get_env_value
+from common.case_cache import get_case_cache
+from common.case_record import record_builder
+from common.case_catalog import CaseCatalog
+
+# 加载器版本，解析或校验逻辑变化时递增，使持久化用例缓存失效
+LOADER_VERSION = '5'
+
+# CSV 中按字符串读取的编号列（如 00001 不被转成数字 1），其余列由 pandas 推断类型（等待 的秒数等保持数字）
+CSV_STRING_COLUMNS = ('case_id', 'sheet')
 
 
 class DataValidationError(Exception):
@@ -34,63 +47,134 @@ class DataSourceNotSupportedError(Exception):
 
 
 class DataCache:
-    """数据缓存管理器"""
+    """
+    数据缓存管理器（LRU）
+    - 按 (文件路径, 工作表) 缓存，文件修改时间或大小变化时自动失效
+    - 条目数或估算内存超过上限时淘汰最久未使用的条目
+    - 可选的生存时间（TTL），默认不过期
+    """
     
-    def __init__(self, cache_ttl: int = 300):
+    def __init__(self, cache_ttl: Optional[int] = None, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
         """
         初始化缓存管理器
         
         Args:
-            cache_ttl: 缓存生存时间（秒），默认5分钟
+            cache_ttl: 缓存生存时间（秒），None 表示不过期，默认读取 base.yaml 的 data_cache.ttl
+            max_entries: 最大条目数，默认读取 base.yaml 的 data_cache.max_entries
+            max_bytes: 最大估算内存（字节），默认读取 base.yaml 的 data_cache.max_bytes
         """
-        self.cache_ttl = cache_ttl
-        self._cache = {}
-        self._cache_timestamps = {}
+        config = get_env_value('data_cache') or {}
+        self.cache_ttl = cache_ttl if cache_ttl is not None else config.get('ttl')
+        self.max_entries = int(max_entries or config.get('max_entries') or 64)
+        self.max_bytes = int(max_bytes or config.get('max_bytes') or 256 * 1024 * 1024)
+        self._cache = OrderedDict()  # 缓存键 -> (数据, 文件签名, 写入时间, 估算大小)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
     
-    def _generate_cache_key(self, file_path: str, sheet_name: Optional[str] = None) -> str:
+    @staticmethod
+    def _generate_cache_key(file_path: str, sheet_name: Optional[str] = None) -> tuple:
         """生成缓存键"""
-        key_parts = [file_path]
-        if sheet_name:
-            key_parts.append(sheet_name)
-        return hashlib.md5('_'.join(key_parts).encode()).hexdigest()
+        return os.path.abspath(file_path), sheet_name
+    
+    @staticmethod
+    def _file_signature(file_path: str) -> Optional[tuple]:
+        """文件签名 (修改时间, 大小)，文件不存在时为 None"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    @staticmethod
+    def _estimate_size(data: List[Dict[str, Any]]) -> int:
+        """估算用例列表占用的内存（列表、用例字典及字段值，不含共用的列名）"""
+        size = sys.getsizeof(data)
+        for case in data:
+            size += sys.getsizeof(case)
+            if isinstance(case, Mapping):
+                size += sum(sys.getsizeof(value) for value in case.values())
+        return size
     
     def get(self, file_path: str, sheet_name: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
-        """获取缓存数据"""
+        """获取缓存数据，文件已变化或已过期时删除该条目"""
         cache_key = self._generate_cache_key(file_path, sheet_name)
-        
-        if cache_key in self._cache:
-            # 检查缓存是否过期
-            if time.time() - self._cache_timestamps[cache_key] < self.cache_ttl:
-                return self._cache[cache_key]
-            else:
-                # 清除过期缓存
-                del self._cache[cache_key]
-                del self._cache_timestamps[cache_key]
-        
-        return None
+        signature = self._file_signature(file_path)
+        with self._lock:
+            entry = self._cache.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            data, entry_signature, timestamp, _ = entry
+            expired = self.cache_ttl is not None and time.time() - timestamp >= self.cache_ttl
+            if expired or signature is None or signature != entry_signature:
+                self._remove(cache_key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._cache.move_to_end(cache_key)
+            self.hits += 1
+            return data
     
     def set(self, file_path: str, data: List[Dict[str, Any]], sheet_name: Optional[str] = None) -> None:
-        """设置缓存数据"""
+        """设置缓存数据，超出上限时淘汰最久未使用的条目"""
         cache_key = self._generate_cache_key(file_path, sheet_name)
-        self._cache[cache_key] = data
-        self._cache_timestamps[cache_key] = time.time()
+        signature = self._file_signature(file_path)
+        if signature is None:
+            return
+        size = self._estimate_size(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if cache_key in self._cache:
+                self._remove(cache_key)
+            self._cache[cache_key] = (data, signature, time.time(), size)
+            self.total_bytes += size
+            while len(self._cache) > self.max_entries or self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self._cache)))
+                self.evictions += 1
+    
+    def _remove(self, cache_key: tuple) -> None:
+        entry = self._cache.pop(cache_key)
+        self.total_bytes -= entry[3]
     
     def clear(self) -> None:
         """清除所有缓存"""
-        self._cache.clear()
-        self._cache_timestamps.clear()
+        with self._lock:
+            self._cache.clear()
+            self.total_bytes = 0
     
     def clear_expired(self) -> None:
-        """清除过期缓存"""
+        """清除过期或文件已变化的缓存"""
         current_time = time.time()
-        expired_keys = [
-            key for key, timestamp in self._cache_timestamps.items()
-            if current_time - timestamp >= self.cache_ttl
-        ]
-        
-        for key in expired_keys:
-            del self._cache[key]
-            del self._cache_timestamps[key]
+        with self._lock:
+            expired_keys = [
+                key for key, (_, signature, timestamp, _) in self._cache.items()
+                if (self.cache_ttl is not None and current_time - timestamp >= self.cache_ttl)
+                or self._file_signature(key[0]) != signature
+            ]
+            for key in expired_keys:
+                self._remove(key)
+                self.invalidations += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._cache),
+            'bytes': self.total_bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
 
 
 class DataValidator:
@@ -130,6 +214,39 @@ class DataValidator:
         
         return True
     
+    @staticmethod
+    def validate_assertions(case: Dict[str, Any]) -> bool:
+        """
+        编译用例的断言列（编译结果缓存，执行时直接复用），规则未定义或格式错误时抛出 DataValidationError
+        
+        Args:
+            case: 测试用例数据
+            
+        Returns:
+            bool: 验证是否通过
+        """
+        if case.get('assertions'):
+            from common.assertion_plan import compile_assertions
+            compile_assertions(case['assertions'])
+        return True
+    
+    @staticmethod
+    def validate_params(case: Dict[str, Any]) -> bool:
+        """
+        检查用例引用的数据表（数据驱动）的写法，不打开数据文件，写法错误时抛出 DataValidationError
+        
+        Args:
+            case: 测试用例数据
+            
+        Returns:
+            bool: 验证是否通过
+        """
+        from common.data_driven import param_column, parse_param_spec
+        spec = case.get(param_column())
+        if spec is not None and str(spec).strip():
+            parse_param_spec(spec)
+        return True
+    
     @staticmethod
     def validate_url(url: str) -> bool:
         """验证URL格式"""
@@ -152,16 +269,19 @@ class DataValidator:
 class EnhancedDataLoader:
     """增强的数据加载器"""
     
-    def __init__(self, cache_ttl: int = 300):
+    def __init__(self, cache_ttl: Optional[int] = None):
         """
         初始化数据加载器
         
         Args:
-            cache_ttl: 缓存生存时间（秒）
+            cache_ttl: 缓存生存时间（秒），None 表示不过期（文件变化时自动失效），其余缓存参数见 base.yaml 的 data_cache
         """
         self.cache = DataCache(cache_ttl)
+        self.case_cache = get_case_cache()
         self.validator = DataValidator()
         self.note = get_env_var_value('identifier', 'note')
+        # 缓存版本：注释标识决定哪些用例 / 工作表被过滤，修改后缓存随之失效
+        self.cache_version = f"{LOADER_VERSION}:{self.note}"
         self.logger = logging.getLogger(__name__)
         self._custom_file_path = None  # 用于并发执行时动态设置文件路径
         
@@ -199,16 +319,7 @@ class EnhancedDataLoader:
         Returns:
             List[Dict[str, Any]]: 测试用例列表
         """
-        # 优先级: file_path参数 > 自定义文件路径 > 配置文件路径
-        if file_path is None:
-            if self._custom_file_path:
-                # 使用自定义文件路径（并发执行模式）
-                file_path = self._custom_file_path
-            else:
-                # 使用配置文件路径（标准模式）
-                filename = get_env_var_value('case', 'testcase')
-                file_path = os.path.join(DATADIR, get_env_var_value(get_env_now(),'case_file'), filename)
-            # print(file_path)  # 注释掉调试输出
+        file_path = self._resolve_file_path(file_path)
         
         # 检查缓存
         if use_cache:
@@ -216,6 +327,9 @@ class EnhancedDataLoader:
             if cached_data:
                 self.logger.info(f"从缓存加载数据: {file_path}")
                 return cached_data
+            cached_data = self._load_persistent(file_path, sheet_name)
+            if cached_data is not None:
+                return cached_data
         
         # 获取文件扩展名
         file_ext = Path(file_path).suffix.lower()
@@ -235,10 +349,13 @@ class EnhancedDataLoader:
                     validated_cases.append(case)
                 except DataValidationError as e:
                     self.logger.warning(f"跳过无效用例 {case.get('case_id', 'unknown')}: {e}")
+                    continue
+                self._check_compile(case)
             
             # 缓存数据
             if use_cache:
                 self.cache.set(file_path, validated_cases, sheet_name)
+                self.case_cache.set(file_path, self.cache_version, validated_cases, sheet_name)
             
             self.logger.info(f"成功加载 {len(validated_cases)} 个测试用例")
             return validated_cases
@@ -247,53 +364,227 @@ class EnhancedDataLoader:
             self.logger.error(f"加载测试用例失败: {e}")
             raise
     
+    def iter_test_cases(self, file_path: Optional[str] = None,
+                        sheet_name: Union[str, Sequence[str], None] = None,
+                        use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        逐条加载测试用例（生成器）
+        Excel 文件边读取边产出用例，调用方可以在读取到第一条用例时就开始执行；只打开需要的工作表
+        CSV 文件分块读取；其他格式整体加载后逐条产出；完整读取后写入缓存，与 load_test_cases 共用
+        不使用缓存时不保留已产出的用例，可以处理大于内存的 CSV 文件
+        
+        Args:
+            file_path: 文件路径，如果为None则使用配置文件中的路径或自定义路径
+            sheet_name: Excel工作表名称或名称列表（按列表顺序读取），仅对Excel文件有效
+            use_cache: 是否使用缓存
+            
+        Yields:
+            Dict[str, Any]: 测试用例，无效用例跳过；断言编译失败的用例带 compile_error 字段
+        """
+        file_path = self._resolve_file_path(file_path)
+        cache_sheet = sheet_name if sheet_name is None or isinstance(sheet_name, str) else '|'.join(sheet_name)
+        
+        if use_cache:
+            cached_data = self.cache.get(file_path, cache_sheet)
+            if cached_data:
+                self.logger.info(f"从缓存加载数据: {file_path}")
+                yield from cached_data
+                return
+            cached_data = self._load_persistent(file_path, sheet_name)
+            if cached_data is not None:
+                yield from cached_data
+                return
+        
+        file_ext = Path(file_path).suffix.lower()
+        if file_ext not in self.data_handlers:
+            raise DataSourceNotSupportedError(f"不支持的文件格式: {file_ext}")
+        if file_ext in ('.xlsx', '.xls'):
+            cases = self._iter_excel(file_path, sheet_name)
+        elif file_ext == '.csv':
+            cases = self._iter_csv(file_path)
+        else:
+            cases = self.data_handlers[file_ext](file_path, sheet_name)
+        
+        # 不使用缓存时不保留已产出的用例
+        validated_cases = [] if use_cache else None
+        count = 0
+        for case in cases:
+            try:
+                self.validator.validate_case_structure(case)
+            except DataValidationError as e:
+                self.logger.warning(f"跳过无效用例 {case.get('case_id', 'unknown')}: {e}")
+                continue
+            self._check_compile(case)
+            if use_cache:
+                validated_cases.append(case)
+            count += 1
+            yield case
+        
+        if use_cache:
+            self.cache.set(file_path, validated_cases, cache_sheet)
+            self.case_cache.set(file_path, self.cache_version, validated_cases, cache_sheet)
+        self.logger.info(f"成功加载 {count} 个测试用例")
+    
+    def _check_compile(self, case: Dict[str, Any]) -> None:
+        """
+        断言、数据表写法在加载阶段检查，错误不等到发送请求后才暴露（注释掉的用例不检查）
+        编译失败只影响该用例：错误信息记录在用例的 compile_error 字段，执行时该用例直接判定失败，其余用例照常加载
+        """
+        if str(case['case_id']).startswith(self.note):
+            return
+        try:
+            self.validator.validate_assertions(case)
+            self.validator.validate_params(case)
+        except DataValidationError as e:
+            case['compile_error'] = f"断言或数据表编译失败: {e}"
+            self.logger.warning(f"[{case.get('sheet')}] 用例{case['case_id']} {case['compile_error']}")
+    
+    def _load_persistent(self, file_path: str,
+                         sheet_name: Union[str, Sequence[str], None]) -> Optional[List[Dict[str, Any]]]:
+        """
+        从持久化缓存加载（工作簿内容未变化时跳过解析和校验），命中后同时放入内存缓存
+        指定工作表但没有对应的缓存时，从整个工作簿的缓存中选取（如 load_catalog 加载过整个工作簿）
+        """
+        start_time = time.time()
+        cache_sheet = sheet_name if sheet_name is None or isinstance(sheet_name, str) else '|'.join(sheet_name)
+        cached_data = self.case_cache.get(file_path, self.cache_version, cache_sheet)
+        if cached_data is None and sheet_name:
+            workbook_cases = self.case_cache.get(file_path, self.cache_version, None)
+            if workbook_cases is not None:
+                sheet_names = [sheet_name] if isinstance(sheet_name, str) else list(sheet_name)
+                by_sheet = {}
+                for case in workbook_cases:
+                    by_sheet.setdefault(case.get('sheet'), []).append(case)
+                if all(name in by_sheet for name in sheet_names):
+                    cached_data = [case for name in sheet_names for case in by_sheet[name]]
+        if cached_data is not None:
+            self.logger.info(f"从持久化缓存加载 {len(cached_data)} 个测试用例: {file_path} "
+                             f"({(time.time() - start_time) * 1000:.1f} ms)")
+            self.cache.set(file_path, cached_data, cache_sheet)
+        return cached_data
+    
+    def load_catalog(self, file_paths: Sequence[Union[str, Path]], max_workers: Optional[int] = None,
+                     use_cache: bool = True) -> CaseCatalog:
+        """
+        并行加载多个工作簿，生成用例目录
+        缓存命中的工作簿直接读取；其余工作簿分给进程池并行解析、校验（每个进程各自写入持久化缓存）
+        进程启动有固定开销，待解析的文件较小时减少进程数，只有一个进程时在当前进程内解析
+        
+        Args:
+            file_paths: 工作簿路径列表
+            max_workers: 解析进程数上限，默认为 CPU 核心数
+            use_cache: 是否使用缓存
+            
+        Returns:
+            CaseCatalog: 用例目录，加载失败的工作簿记录在 errors 中
+        """
+        start_time = time.time()
+        file_paths = [str(file_path) for file_path in file_paths]
+        loaded = {}   # 工作簿路径 -> (用例列表, 是否来自缓存, 失败原因)
+        pending = []
+        for file_path in file_paths:
+            try:
+                cached_data = None
+                if use_cache:
+                    cached_data = self.cache.get(file_path) or self._load_persistent(file_path, None)
+                pending_bytes = os.path.getsize(file_path)
+            except OSError as e:
+                loaded[file_path] = (None, False, str(e))
+                continue
+            if cached_data is not None:
+                loaded[file_path] = (cached_data, True, None)
+            else:
+                pending.append((file_path, pending_bytes))
+        
+        config = get_env_value('case_catalog') or {}
+        min_bytes = int(config.get('min_bytes_per_worker') or 512 * 1024)
+        total_bytes = sum(size for _, size in pending)
+        workers = min(max_workers or os.cpu_count() or 1, len(pending), max(1, total_bytes // min_bytes))
+        # 大文件先提交，避免最后只剩一个大文件在解析
+        pending = [(file_path, use_cache) for file_path, _ in sorted(pending, key=lambda item: -item[1])]
+        if workers <= 1:
+            outcomes = [_load_workbook(item) for item in pending]
+        else:
+            # spawn 启动的进程不继承父进程的日志、连接等状态，各平台行为一致
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                outcomes = list(executor.map(_load_workbook, pending))
+        for file_path, cases, error in outcomes:
+            loaded[file_path] = (cases, False, error)
+            if error is None and use_cache:
+                self.cache.set(file_path, cases)
+        
+        catalog = CaseCatalog()
+        for file_path in file_paths:
+            cases, cached, error = loaded[file_path]
+            if error is None:
+                catalog.add(file_path, cases, cached=cached)
+            else:
+                catalog.add_error(file_path, error)
+        catalog.seconds = time.time() - start_time
+        return catalog
+    
+    def _resolve_file_path(self, file_path: Optional[str]) -> str:
+        """优先级: file_path参数 > 自定义文件路径 > 配置文件路径"""
+        if file_path is not None:
+            return file_path
+        if self._custom_file_path:
+            # 使用自定义文件路径（并发执行模式）
+            return self._custom_file_path
+        # 使用配置文件路径（标准模式）
+        filename = get_env_var_value('case', 'testcase')
+        return os.path.join(DATADIR, get_env_var_value(get_env_now(),'case_file'), filename)
+    
     def _load_excel(self, file_path: str, sheet_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """加载Excel文件"""
+        return list(self._iter_excel(file_path, sheet_name))
+    
+    def _iter_excel(self, file_path: str,
+                    sheet_name: Union[str, Sequence[str], None] = None) -> Iterator[Dict[str, Any]]:
+        """逐行读取Excel文件（只读模式，只解析需要的工作表）"""
         try:
             wb = openpyxl.load_workbook(file_path, read_only=True)
-            cases = []
-            
+        except Exception as e:
+            raise DataValidationError(f"Excel文件加载失败: {e}")
+        try:
             if sheet_name:
                 # 加载指定工作表
-                if sheet_name in wb.sheetnames:
-                    cases = self._process_excel_sheet(wb[sheet_name])
-                else:
-                    raise DataValidationError(f"工作表 '{sheet_name}' 不存在")
+                sheet_names = [sheet_name] if isinstance(sheet_name, str) else list(sheet_name)
+                for name in sheet_names:
+                    if name not in wb.sheetnames:
+                        raise DataValidationError(f"Excel文件加载失败: 工作表 '{name}' 不存在")
+                sheets = [wb[name] for name in sheet_names]
             else:
-                # 加载所有工作表
-                for sheet in wb.worksheets:
-                    if sheet.title[0] != self.note:  # 过滤注释的工作表
-                        sheet_cases = self._process_excel_sheet(sheet)
-                        cases.extend(sheet_cases)
-            
-            wb.close()
-            return cases
-            
+                # 加载所有工作表，过滤注释的工作表
+                sheets = [sheet for sheet in wb.worksheets if sheet.title[0] != self.note]
+            for sheet in sheets:
+                yield from self._iter_excel_sheet(sheet)
+        except DataValidationError:
+            raise
         except Exception as e:
             raise DataValidationError(f"Excel文件加载失败: {e}")
+        finally:
+            wb.close()
     
     def _process_excel_sheet(self, sheet) -> List[Dict[str, Any]]:
         """处理Excel工作表"""
-        cases = []
-        rows = list(sheet.rows)
-        
-        if not rows:
-            return cases
+        return list(self._iter_excel_sheet(sheet))
+    
+    def _iter_excel_sheet(self, sheet) -> Iterator[Dict[str, Any]]:
+        """逐行读取Excel工作表，只取单元格的值，不保留单元格对象"""
+        rows = sheet.iter_rows(values_only=True)
         
         # 获取标题行
-        headers = [cell.value for cell in rows[0]]
+        headers = next(rows, None)
+        if headers is None:
+            return
         
-        # 处理数据行
-        for row in rows[1:]:
-            row_data = [cell.value for cell in row]
-            case = dict(zip(headers, row_data))
-            
+        # 处理数据行：固定列存放在 CaseRecord 的 __slots__ 中，不再每行一份列名字典
+        build = record_builder(headers, sheet=sheet.title)
+        for row_data in rows:
             # 过滤注释的用例
             # if case.get('case_id') and str(case['case_id'])[0] != self.note:
-            case['sheet'] = sheet.title
-            cases.append(case)
-        
-        return cases
+            yield build(row_data)
     
     def _load_json(self, file_path: str, sheet_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """加载JSON文件"""
@@ -341,18 +632,30 @@ class EnhancedDataLoader:
     
     def _load_csv(self, file_path: str, sheet_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """加载CSV文件"""
+        return list(self._iter_csv(file_path))
+    
+    def _iter_csv(self, file_path: str, chunksize: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        分块读取CSV文件（文件大于内存时也可以逐块处理），每块内向量化过滤注释用例
+        编号列（CSV_STRING_COLUMNS）按字符串读取，保持原样；其余列推断类型，空单元格为 None（与 Excel 一致）
+        """
+        chunksize = chunksize or int((get_env_value('data_loader') or {}).get('csv_chunksize') or 10000)
         try:
-            df = pd.read_csv(file_path)
-            cases = []
-            
-            for _, row in df.iterrows():
-                case = row.to_dict()
-                # 过滤注释的用例
-                if case.get('case_id') and str(case['case_id'])[0] != self.note:
-                    cases.append(case)
-            
-            return cases
-            
+            reader = pd.read_csv(file_path, dtype=dict.fromkeys(CSV_STRING_COLUMNS, str), keep_default_na=False,
+                                 na_values=[''], chunksize=chunksize)
+            with reader:
+                for chunk in reader:
+                    if 'case_id' not in chunk.columns:
+                        continue
+                    # 过滤注释的用例和 case_id 为空的行
+                    case_id = chunk['case_id']
+                    chunk = chunk[case_id.notna() & ~case_id.str.startswith(self.note, na=False)]
+                    if chunk.empty:
+                        continue
+                    chunk = chunk.astype(object).where(chunk.notna(), None)
+                    build = record_builder(list(chunk.columns))
+                    for row in chunk.itertuples(index=False, name=None):
+                        yield build(row)
         except Exception as e:
             raise DataValidationError(f"CSV文件加载失败: {e}")
     
@@ -369,5 +672,20 @@ class EnhancedDataLoader:
         return {
             'cache_size': len(self.cache._cache),
             'cache_ttl': self.cache.cache_ttl,
+            **self.cache.get_stats(),
+            'persistent': self.case_cache.get_stats(),
             'supported_formats': self.get_supported_formats()
         }
+
+
+def _load_workbook(item: tuple) -> tuple:
+    """
+    加载单个工作簿（load_catalog 的进程池任务）
+    :param item: (工作簿路径, 是否使用缓存)
+    :return: (工作簿路径, 用例列表, 失败原因)，成功时失败原因为 None
+    """
+    file_path, use_cache = item
+    try:
+        return file_path, EnhancedDataLoader().load_test_cases(file_path, use_cache=use_cache), None
+    except Exception as e:
+        return file_path, None, str(e)
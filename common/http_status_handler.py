@@ -4,12 +4,21 @@ HTTP状态码处理器
 用于统一处理不同HTTP状态码的响应逻辑
 """
 from typing import Dict, Tuple, Any
-import json
 import requests
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+from common.parsed_response import ParsedResponse
+from common.phase_profiler import phase
 
 
 class HTTPStatusHandler:
     """HTTP状态码处理器"""
+
+    # 处理结果为成功的状态码（其余状态码的处理结果均为失败）
+    SUCCESS_CODES = ('200', '201', '204')
     
     def __init__(self):
         self.status_handlers = {
@@ -39,22 +48,22 @@ class HTTPStatusHandler:
         Returns:
             Tuple[bool, str]: (是否成功, 日志信息)
         """
+        # 响应体只解析一次，断言和变量提取共用
+        response = ParsedResponse.wrap(response)
         code = str(response.status_code)
         handler = self.status_handlers.get(code, self._handle_unknown_status)
         return handler(response, case, timer, method_factory)
+
+    def is_success(self, status_code) -> bool:
+        """只按状态码判断成败（不执行断言、变量提取），与 handle_status_code 对该状态码的处理结果一致"""
+        return str(status_code) in self.SUCCESS_CODES
     
     def _handle_200(self, response: requests.Response, case: Dict[str, Any], 
                     timer: float, method_factory) -> Tuple[bool, str]:
         """处理200状态码 - 成功响应"""
         title = case['title']
         
-        # 处理响应内容
-        try:
-            res = json.dumps(response.json(), ensure_ascii=False)
-            method_factory(method='设置变量', result='response', param_1=res)
-        except ValueError:
-            res = response.text
-            method_factory(method='设置变量', result='response', param_1=res)
+        # ${response} 已由 send_api 保存（去掉首尾空白的原始响应体），这里不再设置
         
         # 执行断言
         if not case.get('assertions'):
@@ -62,14 +71,16 @@ class HTTPStatusHandler:
             reason = f'用例[{case["case_id"]}]：[{title}]执行完成,未添加断言.'
         else:
             from common.publicFunction import _execute_assertions
-            is_ok, reason = _execute_assertions(response, **case)
+            with phase('assertions'):
+                is_ok, reason = _execute_assertions(response, **case)
         
         # 变量提取
         if not case.get('other'):
             variable_result = '无变量提取'
         else:
             from common.publicFunction import extract_variable
-            variable_result = extract_variable(response, **case)
+            with phase('extract'):
+                variable_result = extract_variable(response, **case)
         # 生成日志信息
         if is_ok:
             log_msg = (f'接口名称：【{title}】-响应状态码[200]-接口响应时间[{timer:.2f} ms]-执行通过 ✅. '
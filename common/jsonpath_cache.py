@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+JSONPath 表达式编译缓存 - jsonpath_ng.parse 开销较大，同一表达式在大量用例中重复出现
+所有 JSONPath 断言和 $..key 变量提取共用一个有上限的 LRU 缓存
+"""
+from functools import lru_cache
+from typing import Any, List
+import jsonpath
+from jsonpath_ng import parse
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from config.config_loader import get_env_value
+
+_MAX_SIZE = int((get_env_value('jsonpath_cache') or {}).get('max_size') or 512)
+
+
+@lru_cache(maxsize=_MAX_SIZE)
+def compile_jsonpath(json_path: str):
+    """编译 JSONPath 表达式（LRU 缓存，语法错误时抛出异常且不缓存）"""
+    return parse(json_path)
+
+
+def find_values(json_path: str, data: Any) -> List[Any]:
+    """返回 JSONPath 在 data 中匹配到的全部值"""
+    return [match.value for match in compile_jsonpath(json_path).find(data)]
+
+
+def find_key_values(data: Any, key: str) -> List[Any]:
+    """
+    递归查找键（$..key）对应的全部值，顺序与 jsonpath 库一致
+    jsonpath_ng 无法解析的键名退回 jsonpath 库
+    :return: 值列表，找不到时为空列表
+    """
+    expression = '$..' + key
+    try:
+        compiled = compile_jsonpath(expression)
+    except Exception:
+        return jsonpath.jsonpath(data, expression) or []
+    return [match.value for match in compiled.find(data)]
+
+
+def get_jsonpath_cache_stats() -> dict:
+    """
+    编译缓存统计
+    :return: {'hits': 命中次数, 'misses': 未命中次数, 'size': 当前条数, 'max_size': 上限, 'hit_rate': 命中率}
+    """
+    info = compile_jsonpath.cache_info()
+    total = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+        'hit_rate': info.hits / total if total else 0.0,
+    }
+
+
+def clear_jsonpath_cache() -> None:
+    compile_jsonpath.cache_clear()
+
+
+if __name__ == '__main__':
+    data = {'data': {'id': 7, 'list': [{'id': 1}, {'id': 2}]}}
+    for _ in range(3):
+        print(find_values('$.data.list[*].id', data), find_key_values(data, 'id'))
+    print(get_jsonpath_cache_stats())
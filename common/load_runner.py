@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+"""
+压测模式 - 复用用例工作簿中的接口用例，按目标 RPS 或并发数持续发送请求
+
+- 固定 RPS（开放模型）：按固定间隔发出请求，响应时间从计划发送时刻算起（服务端变慢时排队时间也计入），
+  进行中的请求数达到 max_in_flight 时丢弃本次请求并计数
+- 固定并发（封闭模型）：concurrency 个虚拟用户各自循环发送，收到响应后立即发下一个
+- 请求经 CaseRunner.send 发送（变量替换、请求头解析与功能测试相同）；按 assertion_sample_rate 抽样执行
+  HTTPStatusHandler 的完整处理（断言、变量提取），未抽中的请求只按状态码判断成败
+- 压测前先按顺序执行一遍所选用例（warmup），登录等前置用例产生的变量供压测请求使用；
+  预执行有用例失败时（如登录失败，压测请求会全部出错）取消压测，除非调用方确认继续
+
+输出：响应时间分布（直方图、p50/p95/p99）、吞吐量、按状态码统计的错误率、每秒时间序列，
+JSON 报告和时间序列 CSV 写入 load_test.report_dir
+"""
+import csv
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from config.config_loader import get_env_value
+from common.initPath import BASEDIR
+from common.case_runner import CaseRunner
+from common.case_dependency import is_http_case
+from common.phase_profiler import endpoint_name, summarize
+
+# 响应时间直方图的桶上界（毫秒），最后一个桶为 +Inf
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# 请求失败（未收到响应）时记录的状态码
+REQUEST_FAILED = '请求失败'
+
+
+def _source_case_id(case_id) -> Optional[str]:
+    """数据驱动展开的用例编号（编号_行号）对应的原编号，其他编号返回 None"""
+    match = re.fullmatch(r'(.+)_\d+', str(case_id))
+    return match.group(1) if match else None
+
+
+def _load_config() -> Dict[str, Any]:
+    """读取 base.yaml 中的 load_test 配置"""
+    return get_env_value('load_test') or {}
+
+
+class LoadStats(object):
+    """压测统计（多线程记录）：按秒分桶保存响应时间，报告时汇总"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seconds = {}        # 第几秒 -> [响应时间, ...]
+        self.second_errors = {}  # 第几秒 -> 失败数
+        self.status_codes = {}   # 状态码 -> 次数
+        self.endpoints = {}      # 接口 -> ([响应时间, ...], 失败数)
+        self.failures = {'request': 0, 'status': 0, 'assertion': 0}
+        self.sampled = 0
+        self.dropped = 0
+
+    def record(self, second: int, endpoint: str, latency: float, status, failure: Optional[str],
+               sampled: bool) -> None:
+        """
+        记录一次请求
+        :param second: 计划发送时刻距压测开始的秒数
+        :param failure: 失败类型 request / status / assertion，成功为 None
+        """
+        with self._lock:
+            self.seconds.setdefault(second, []).append(latency)
+            self.status_codes[status] = self.status_codes.get(status, 0) + 1
+            latencies, errors = self.endpoints.get(endpoint) or ([], 0)
+            latencies.append(latency)
+            if failure is not None:
+                errors += 1
+                self.failures[failure] += 1
+                self.second_errors[second] = self.second_errors.get(second, 0) + 1
+            self.endpoints[endpoint] = (latencies, errors)
+            if sampled:
+                self.sampled += 1
+
+    def drop(self) -> None:
+        with self._lock:
+            self.dropped += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """进度：已完成请求数、失败数"""
+        with self._lock:
+            return {'requests': sum(len(v) for v in self.seconds.values()),
+                    'errors': sum(self.failures.values()), 'dropped': self.dropped}
+
+    @staticmethod
+    def histogram(latencies: Iterable[float]) -> List[Dict[str, Any]]:
+        """响应时间直方图（非累计）：[{'le_ms': 上界, 'count': 次数}, ...]，最后一个桶上界为 +Inf"""
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for latency in latencies:
+            ms = latency * 1000
+            for index, bound in enumerate(LATENCY_BUCKETS_MS):
+                if ms <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+        bounds = list(LATENCY_BUCKETS_MS) + ['+Inf']
+        return [{'le_ms': bound, 'count': count} for bound, count in zip(bounds, counts)]
+
+    def build_report(self, elapsed: float, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """汇总压测结果"""
+        with self._lock:
+            latencies = [latency for second in sorted(self.seconds) for latency in self.seconds[second]]
+            requests = len(latencies)
+            errors = sum(self.failures.values())
+            report = {
+                'settings': settings,
+                'started_at': settings.get('started_at'),
+                'duration': round(elapsed, 3),
+                'requests': requests,
+                'throughput_rps': round(requests / elapsed, 2) if elapsed else 0.0,
+                'errors': errors,
+                'error_rate': round(errors / requests, 6) if requests else 0.0,
+                'failures': dict(self.failures),
+                'dropped': self.dropped,
+                'assertions_sampled': self.sampled,
+                'status_codes': {str(code): {'count': count, 'rate': round(count / requests, 6)}
+                                 for code, count in sorted(self.status_codes.items(), key=lambda i: -i[1])},
+                'latency': summarize(latencies),
+                'histogram': self.histogram(latencies),
+                'endpoints': {endpoint: dict(summarize(values), errors=errors,
+                                             error_rate=round(errors / len(values), 6))
+                              for endpoint, (values, errors) in self.endpoints.items()},
+                'timeseries': [],
+            }
+            for second in range(int(elapsed) + 1):
+                values = self.seconds.get(second, [])
+                stats = summarize(values)
+                report['timeseries'].append({'second': second, 'requests': len(values),
+                                             'errors': self.second_errors.get(second, 0),
+                                             'mean_ms': stats['mean_ms'], 'p50_ms': stats['p50_ms'],
+                                             'p95_ms': stats['p95_ms'], 'max_ms': stats['max_ms']})
+        return report
+
+
+class LoadRunner(object):
+    """压测执行器"""
+
+    def __init__(self, cases: Sequence[Dict[str, Any]], rps: float = None, concurrency: int = None,
+                 duration: float = None, sample_rate: float = None, warmup: bool = None,
+                 max_in_flight: int = None, case_runner: CaseRunner = None):
+        """
+        :param cases: 所选用例（按顺序；压测时循环发送其中的接口用例）
+        :param rps: 目标每秒请求数（与 concurrency 二选一，都不传时读取 base.yaml 的 load_test.mode）
+        :param concurrency: 并发虚拟用户数
+        :param duration: 持续秒数
+        :param sample_rate: 执行断言的请求比例（0~1）
+        :param warmup: 压测前是否按顺序执行一遍所选用例
+        :param max_in_flight: 固定 RPS 时进行中的请求数上限
+        :param case_runner: 单条用例执行器，默认新建
+        :raises ValueError: 参数不合法或所选用例中没有接口用例
+        """
+        config = _load_config()
+        if rps is None and concurrency is None:
+            if (config.get('mode') or 'concurrency') == 'rps':
+                rps = config.get('rps') or 10
+            else:
+                concurrency = config.get('concurrency') or 10
+        self.rps = float(rps) if rps is not None else None
+        self.concurrency = int(concurrency) if concurrency is not None and rps is None else None
+        self.duration = float(duration if duration is not None else config.get('duration') or 60)
+        self.sample_rate = float(sample_rate if sample_rate is not None else config.get('assertion_sample_rate', 0.1))
+        self.warmup = bool(warmup if warmup is not None else config.get('warmup', True))
+        self.max_in_flight = int(max_in_flight or config.get('max_in_flight') or 256)
+        self.progress_interval = float(config.get('progress_interval') or 5)
+        if self.rps is not None and self.rps <= 0 or self.concurrency is not None and self.concurrency < 1:
+            raise ValueError(f'目标 RPS / 并发数必须大于 0: rps={rps}, concurrency={concurrency}')
+        if self.duration <= 0 or not 0 <= self.sample_rate <= 1:
+            raise ValueError(f'持续时间必须大于 0，断言抽样比例必须在 0~1 之间: {self.duration}, {self.sample_rate}')
+
+        self.case_runner = case_runner or CaseRunner()
+        self.cases = list(cases)
+        self.targets = [(case, endpoint_name(case)) for case in self.cases
+                        if is_http_case(case) and not self.case_runner.should_skip(case)
+                        and not case.get('compile_error')]
+        if not self.targets:
+            raise ValueError('所选用例中没有接口用例')
+        self.stats = LoadStats()
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self._start = 0.0
+
+    @classmethod
+    def from_workbook(cls, file_path: str, sheets: Sequence[str] = None, case_ids: Iterable = None,
+                      **kwargs) -> 'LoadRunner':
+        """
+        从工作簿选择用例
+        :param sheets: 工作表（按顺序），默认全部
+        :param case_ids: 用例编号，数据驱动展开的用例（编号_行号）按原编号匹配；默认全部
+        """
+        from common.enhanced_data_loader import EnhancedDataLoader
+        from common.data_driven import CaseExpander
+        loader = EnhancedDataLoader()
+        cases = CaseExpander(loader._resolve_file_path(file_path)).expand(
+            loader.iter_test_cases(file_path, sheet_name=list(sheets) if sheets else None))
+        if case_ids:
+            ids = {str(case_id) for case_id in case_ids}
+            cases = [case for case in cases
+                     if str(case.get('case_id')) in ids or _source_case_id(case.get('case_id')) in ids]
+        return cls(list(cases), **kwargs)
+
+    def settings(self) -> Dict[str, Any]:
+        return {'mode': 'rps' if self.rps is not None else 'concurrency', 'rps': self.rps,
+                'concurrency': self.concurrency, 'duration': self.duration, 'sample_rate': self.sample_rate,
+                'max_in_flight': self.max_in_flight, 'cases': len(self.targets),
+                'started_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+    def run_warmup(self) -> bool:
+        """按顺序执行一遍所选用例（含关键字用例），产生压测请求依赖的变量"""
+        results = self.case_runner.run_cases(self.cases)
+        failed = [r for r in results if not r['success']]
+        print(f"🔥 预执行 {len(results)} 条用例，失败 {len(failed)} 条")
+        for result in failed[:5]:
+            print(f"     ❌ [{result['sheet']}] 用例{result['case_id']} {result['title']}: {result['message'][:200]}")
+        return not failed
+
+    def _request(self, case: Dict[str, Any], endpoint: str, scheduled: float) -> None:
+        """发送一次请求并记录，scheduled 为计划发送时刻（perf_counter）"""
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        is_ok, response = self.case_runner.send(case)
+        latency = time.perf_counter() - scheduled
+        if not is_ok:
+            status, failure = REQUEST_FAILED, 'request'
+        else:
+            status = response.status_code
+            failure = None if self.case_runner.status_handler.is_success(status) else 'status'
+            if sampled and failure is None:
+                timer = response.elapsed.total_seconds() * 1000
+                result = self.case_runner.status_handler.handle_status_code(
+                    response, case, timer, self.case_runner.factory.method_factory)
+                if not result[0]:
+                    failure = 'assertion'
+        self.stats.record(int(scheduled - self._start), endpoint, latency, status, failure, sampled)
+
+    def _next_target(self):
+        return self.targets[next(self._sequence) % len(self.targets)]
+
+    def _virtual_user(self, deadline: float) -> None:
+        """封闭模型：收到响应后立即发送下一个请求"""
+        while time.perf_counter() < deadline:
+            case, endpoint = self._next_target()
+            self._request(case, endpoint, time.perf_counter())
+
+    def _tracked_request(self, case, endpoint, scheduled) -> None:
+        try:
+            self._request(case, endpoint, scheduled)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+
+    def _dispatch(self, deadline: float, executor: ThreadPoolExecutor) -> None:
+        """开放模型：按固定间隔发出请求，落后时立即补发（不因响应变慢而降低发送速率）"""
+        interval = 1.0 / self.rps
+        scheduled = self._start
+        while scheduled < deadline:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with self._in_flight_lock:
+                full = self._in_flight >= self.max_in_flight
+                if not full:
+                    self._in_flight += 1
+            if full:
+                self.stats.drop()
+            else:
+                case, endpoint = self._next_target()
+                executor.submit(self._tracked_request, case, endpoint, scheduled)
+            scheduled += interval
+
+    def _print_progress(self, elapsed: float) -> None:
+        progress = self.stats.snapshot()
+        rate = progress['errors'] / progress['requests'] if progress['requests'] else 0.0
+        print(f"   ⏳ {elapsed:5.0f}s  请求 {progress['requests']}  ({progress['requests'] / elapsed:.1f}/s)  "
+              f"错误率 {rate:.2%}" + (f"  丢弃 {progress['dropped']}" if progress['dropped'] else ''))
+
+    def run(self, confirm: Callable[[], bool] = None) -> Dict[str, Any]:
+        """
+        执行压测
+        :param confirm: 预执行有用例失败时调用，返回 True 时仍然开始压测；默认直接取消
+        :return: 压测报告（见 LoadStats.build_report）
+        :raises RuntimeError: 预执行失败且未确认继续
+        """
+        if self.warmup and not self.run_warmup() and not (confirm and confirm()):
+            raise RuntimeError('预执行有用例失败，压测已取消（压测请求依赖的前置用例未通过）')
+        settings = self.settings()
+        target = f"{self.rps:g} RPS" if self.rps is not None else f"{self.concurrency} 并发"
+        print(f"🚀 开始压测: {len(self.targets)} 个接口用例, {target}, 持续 {self.duration:g}s, "
+              f"断言抽样 {self.sample_rate:.0%}")
+        self._start = time.perf_counter()
+        deadline = self._start + self.duration
+        workers = self.max_in_flight if self.rps is not None else self.concurrency
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            dispatcher = None
+            if self.rps is not None:
+                dispatcher = threading.Thread(target=self._dispatch, args=(deadline, executor), daemon=True)
+                dispatcher.start()
+            else:
+                for _ in range(self.concurrency):
+                    executor.submit(self._virtual_user, deadline)
+            next_progress = self._start + self.progress_interval
+            while time.perf_counter() < deadline:
+                time.sleep(max(0.0, min(next_progress, deadline) - time.perf_counter()))
+                if time.perf_counter() < deadline:
+                    self._print_progress(time.perf_counter() - self._start)
+                    next_progress += self.progress_interval
+            if dispatcher is not None:
+                dispatcher.join()
+            # 退出时等待进行中的请求完成
+        return self.stats.build_report(time.perf_counter() - self._start, settings)
+
+
+def write_report(report: Dict[str, Any], report_dir: str = None) -> Path:
+    """
+    写入 JSON 报告和每秒时间序列 CSV
+    :param report_dir: 输出目录，默认读取 base.yaml 的 load_test.report_dir
+    :return: JSON 报告路径
+    """
+    report_dir = Path(report_dir or os.path.join(BASEDIR, _load_config().get('report_dir') or 'TestReport/load'))
+    report_dir.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime('%Y-%m-%d_%H-%M-%S')
+    json_path = report_dir / f'load_report_{stamp}.json'
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    with open(report_dir / f'load_timeseries_{stamp}.csv', 'w', encoding='utf-8-sig', newline='') as f:
+        columns = ['second', 'requests', 'errors', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms']
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(report['timeseries'])
+    return json_path
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """打印压测摘要"""
+    latency = report['latency']
+    print("\n" + "=" * 60)
+    print("📊 压测摘要")
+    print("=" * 60)
+    print(f"  📦 请求数: {report['requests']}  (持续 {report['duration']:.1f}s, 吞吐量 {report['throughput_rps']:.1f}/s)")
+    print(f"  ❌ 错误率: {report['error_rate']:.2%}  (请求失败 {report['failures']['request']} / "
+          f"状态码 {report['failures']['status']} / 断言 {report['failures']['assertion']}, "
+          f"抽样断言 {report['assertions_sampled']} 次)")
+    if report['dropped']:
+        print(f"  ⚠️  进行中请求数达到上限，丢弃 {report['dropped']} 次")
+    print(f"  ⏱️  响应时间: p50 {latency['p50_ms']:.1f}ms / p95 {latency['p95_ms']:.1f}ms / "
+          f"p99 {latency['p99_ms']:.1f}ms / 最大 {latency['max_ms']:.1f}ms")
+    print("  🔢 状态码: " + ', '.join(f"{code} {item['count']} ({item['rate']:.1%})"
+                                      for code, item in report['status_codes'].items()))
+    peak = max((bucket['count'] for bucket in report['histogram']), default=0) or 1
+    for bucket in report['histogram']:
+        if bucket['count']:
+            bound = f"≤{bucket['le_ms']}ms" if bucket['le_ms'] != '+Inf' else '>10000ms'
+            print(f"     {bound:>9s} {'█' * max(1, int(bucket['count'] / peak * 30)):<30s} {bucket['count']}")
+    for endpoint, stats in sorted(report['endpoints'].items(), key=lambda item: -item[1]['p95_ms'])[:5]:
+        print(f"  🔗 {endpoint}: {stats['count']} 次, p95 {stats['p95_ms']:.1f}ms, 错误率 {stats['error_rate']:.2%}")
+    print("=" * 60)
+
+
+def main(file_path: Optional[str] = None, sheets: Sequence[str] = None) -> int:
+    """
+    按 base.yaml 的 load_test 配置压测一个工作簿
+    :param file_path: 用例文件，默认读取环境变量 TEST_DATA_FILE
+    :param sheets: 工作表，默认全部
+    :return: 进程退出码（有错误时为 1）
+    """
+    runner = LoadRunner.from_workbook(file_path or os.getenv('TEST_DATA_FILE'), sheets)
+    try:
+        report = runner.run()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    print_report(report)
+    print(f"📁 压测报告: {write_report(report)}")
+    return 0 if not report['errors'] else 1
+
+
+if __name__ == '__main__':
+    # 用法: python common/load_runner.py 用例文件 [工作表1,工作表2]
+    sys.exit(main(sys.argv[1] if len(sys.argv) > 1 else None,
+                  sys.argv[2].split(',') if len(sys.argv) > 2 else None))
@@ -1,10 +1,248 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from setup_paths import init_paths
 init_paths()
 import pymysql
-from config.config_loader import get_env_var_value, get_env_now
+from pymysql.constants import CLIENT
+from config.config_loader import get_env_var_value, get_env_now, get_env_value
+
+
+class DBConnectionPool(object):
+    """
+    数据库连接池（每个 worker 进程一份，进程内的线程共用）
+    - 打开的连接（借出 + 空闲）最多 max_size 个，都被借出时等待归还，超过 acquire_timeout 秒抛出 TimeoutError
+    - 归还的连接保留为空闲连接
+    - 空闲超过 ping_interval 秒的连接借出前先 ping，失效时丢弃并重新连接
+    - 执行出错的连接直接关闭，不放回连接池
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = None, ping_interval: float = None,
+                 acquire_timeout: float = None):
+        """
+        :param connect: 创建连接的函数
+        :param max_size: 最多打开的连接数（借出 + 空闲），默认读取 base.yaml 的 db_pool.max_size
+        :param ping_interval: 空闲多少秒后借出前检查连接，默认读取 base.yaml 的 db_pool.ping_interval
+        :param acquire_timeout: 连接都被借出时最多等待的秒数，默认读取 base.yaml 的 db_pool.acquire_timeout
+        """
+        config = get_env_value('db_pool') or {}
+        self._connect = connect
+        self.max_size = max(1, int(max_size or config.get('max_size') or 4))
+        self.ping_interval = float(ping_interval if ping_interval is not None else config.get('ping_interval', 30))
+        self.acquire_timeout = float(acquire_timeout if acquire_timeout is not None
+                                     else config.get('acquire_timeout', 30))
+        self._idle = []  # (连接, 归还时间)
+        self._open = 0   # 已打开的连接数（借出 + 空闲）
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self.stats = {'connects': 0, 'reuses': 0, 'pings': 0, 'reconnects': 0, 'discarded': 0, 'waits': 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _take(self) -> Optional[Tuple[Any, float]]:
+        """
+        取一个空闲连接，没有空闲连接但未达到 max_size 时占用一个名额并返回 None（由调用方新建连接）
+        :raises TimeoutError: 等待超过 acquire_timeout 秒仍没有可用连接
+        """
+        deadline = None
+        with self._available:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._open < self.max_size:
+                    self._open += 1
+                    return None
+                if deadline is None:
+                    deadline = time.monotonic() + self.acquire_timeout
+                    self.stats['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f'连接池的 {self.max_size} 个连接都已借出，等待 {self.acquire_timeout:g} 秒后仍无可用连接')
+                self._available.wait(remaining)
+
+    def _forget(self, conn) -> None:
+        """关闭连接并释放名额"""
+        self._close(conn)
+        with self._available:
+            self._open -= 1
+            self._available.notify()
+
+    def acquire(self) -> Tuple[Any, int]:
+        """
+        借出连接
+        :return: (连接, 借出过程中与数据库的往返次数)
+        :raises TimeoutError: 连接都已借出且等待超时
+        """
+        while True:
+            item = self._take()
+            if item is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._available:
+                        self._open -= 1
+                        self._available.notify()
+                    raise
+                self._count('connects')
+                return conn, 1
+            conn, released = item
+            if time.time() - released < self.ping_interval:
+                self._count('reuses')
+                return conn, 0
+            try:
+                conn.ping(reconnect=False)
+                self._count('pings')
+                return conn, 1
+            except Exception:
+                # 连接已被服务端断开（wait_timeout 等），丢弃后重新借出
+                self._count('reconnects')
+                self._forget(conn)
+
+    def release(self, conn, broken: bool = False) -> None:
+        """归还连接，broken 为 True 时关闭"""
+        if not broken:
+            with self._available:
+                self._idle.append((conn, time.time()))
+                self._available.notify()
+            return
+        self._count('discarded')
+        self._forget(conn)
+
+    @contextmanager
+    def connection(self):
+        """借出连接的上下文，出错时关闭连接"""
+        conn, _ = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, broken=True)
+            raise
+        self.release(conn)
+
+    @staticmethod
+    def _close(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """关闭全部空闲连接"""
+        with self._available:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._available.notify_all()
+        for conn, _ in idle:
+            self._close(conn)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._open - len(self._idle)
+        stats['max_size'] = self.max_size
+        return stats
+
+
+# 连接池（进程级），按连接参数区分；fork 出的子进程重新创建，避免多个进程共用同一个 socket
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+# 数据库关键字的往返次数统计（进程级），用于确认连接复用是否生效
+_db_stats = {'calls': 0, 'round_trips': 0}
+
+
+def get_db_pool(connect_args: Dict[str, Any]) -> DBConnectionPool:
+    """获取当前 worker 进程中连接参数对应的连接池"""
+    global _pools, _pools_pid
+    key = tuple(sorted(connect_args.items()))
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools = {}
+            _pools_pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = DBConnectionPool(lambda: pymysql.connect(**connect_args))
+    return pool
+
+
+def close_db_pools() -> None:
+    """关闭当前进程的全部连接池"""
+    with _pools_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+    for pool in pools:
+        pool.close()
+
+
+def get_db_stats() -> Dict[str, Any]:
+    """
+    获取数据库关键字的统计
+    :return: {'calls': 执行次数, 'round_trips': 往返次数, 'round_trips_per_call': 平均每次往返次数, 'pools': {连接池: 统计}}
+    """
+    with _pools_lock:
+        stats = dict(_db_stats)
+        pools = dict(_pools) if _pools_pid == os.getpid() else {}
+    stats['round_trips_per_call'] = stats['round_trips'] / stats['calls'] if stats['calls'] else 0.0
+    stats['pools'] = {f"{dict(key).get('host')}/{dict(key).get('database')}": pool.get_stats()
+                      for key, pool in pools.items()}
+    return stats
+
+
+def record_db_call(round_trips: int) -> None:
+    """记录一次数据库关键字调用及其往返次数（同步、异步执行共用）"""
+    with _pools_lock:
+        _db_stats['calls'] += 1
+        _db_stats['round_trips'] += round_trips
+
+
+def _clean_statements(statements) -> List[str]:
+    if isinstance(statements, str):
+        statements = [statements]
+    return [str(sql).strip().rstrip(';') for sql in statements if sql and str(sql).strip()]
+
+
+def build_batch_sql(statements, transaction: bool = True) -> Optional[str]:
+    """
+    拼接批量执行的 SQL（多语句）
+    :param statements: SQL 语句列表，或包含多条语句的 SQL 文本
+    :param transaction: 是否包在 START TRANSACTION / COMMIT 中
+    :return: SQL 文本，没有语句时为 None
+    """
+    statements = _clean_statements(statements)
+    if not statements:
+        return None
+    body = ';\n'.join(statements)
+    return f'START TRANSACTION;\n{body};\nCOMMIT' if transaction else body
+
+
+def build_batch_sqls(statements, transaction: bool = True, multi_statements: bool = True) -> List[str]:
+    """
+    批量执行时依次发送的 SQL
+    :param multi_statements: 为 True 时拼接为一条多语句 SQL（一次往返，见 build_batch_sql），
+                             为 False 时逐条发送（连接不开启多语句，语句中拼入的内容不能再追加一条 SQL）
+    :return: SQL 列表，没有语句时为空列表
+    """
+    if multi_statements:
+        sql = build_batch_sql(statements, transaction)
+        return [sql] if sql is not None else []
+    statements = _clean_statements(statements)
+    if statements and transaction:
+        statements = ['START TRANSACTION'] + statements + ['COMMIT']
+    return statements
+
+
+def reset_db_stats() -> None:
+    """清零数据库关键字统计"""
+    with _pools_lock:
+        _db_stats['calls'] = 0
+        _db_stats['round_trips'] = 0
 
 
 class OpeartorDB(object):
@@ -19,6 +257,19 @@ class OpeartorDB(object):
         self.password = get_env_var_value(get_env_now(), 'password')
         self.conn = None
         self.cursor = None
+        self.last_round_trips = 0  # 最近一次 excetSql 与数据库的往返次数
+
+    def connect_args(self, multi_statements: bool = False) -> Dict[str, Any]:
+        """
+        连接参数
+        自动提交：连接复用时每条查询都能读到最新数据，插入或更新也不需要再单独提交一次
+        :param multi_statements: 是否开启多语句（只用于 excetBatch 的批量执行SQL，开启与否的连接分属不同的连接池）
+        """
+        args = {'host': self.host, 'port': int(self.port), 'user': self.user, 'password': self.password,
+                'database': self.database, 'charset': 'utf8', 'autocommit': True}
+        if multi_statements:
+            args['client_flag'] = CLIENT.MULTI_STATEMENTS
+        return args
 
     def connectDB(self):
         """
@@ -26,11 +277,10 @@ class OpeartorDB(object):
         :return: 返回成功失败，原因
         """
         try:
-            self.db = pymysql.connect(host=self.host, port=int(self.port), user=self.user, password=self.password, database=self.database,
-                                      charset='utf8')
+            self.db = pymysql.connect(**self.connect_args())
             return True, '连接数据成功'
         except Exception as e:
-            return False, '连接数据失败' + str(e) 
+            return False, '连接数据失败' + str(e)
 
     def closeDB(self):
         """
@@ -39,37 +289,103 @@ class OpeartorDB(object):
         """
         self.db.close()
 
-    def excetSql(self, sql, table_name):
+    def _record(self, round_trips: int) -> None:
+        self.last_round_trips = round_trips
+        record_db_call(round_trips)
+
+    def excetSql(self, sql, table_name=None):
         """
-        执行sql方法，
-        :param table_name: 表名
+        执行sql方法，使用当前 worker 的连接池，执行后连接放回连接池
+        :param table_name: 表名（兼容保留，字段名取自 cursor.description，不再查询表结构）
         :param sql: 传入的sql语句
         :return: 返回成功与执行结果 或 失败与失败原因
         """
-        isOK, result = self.connectDB()
-        if isOK is False:
-            return isOK, result
+        pool = get_db_pool(self.connect_args())
         try:
-            cursor = self.db.cursor()
-            cursor.execute(sql)
-            res = cursor.fetchone()  # 为了自动化测试的速度，一般场景所以只取一条数据
-            if res is not None and 'select' in sql.lower():  # 判断是不是查询，
-                cursor.execute("DESCRIBE %s" % table_name)  # 替换table_name为实际表名
-                columns = [column[0] for column in cursor.fetchall()]
-                if len(columns) > 0:
-                    result = dict(zip(columns, res))  # 将返回数据与字段名进行关联，格式化为JSON串
+            conn, round_trips = pool.acquire()
+        except Exception as e:
+            return False, '连接数据失败' + str(e)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql)
+                round_trips += 1
+                if cursor.description is not None:  # 判断是不是查询
+                    res = cursor.fetchone()  # 为了自动化测试的速度，一般场景所以只取一条数据
+                    if res is not None:
+                        columns = [column[0] for column in cursor.description]
+                        result = dict(zip(columns, res))  # 将返回数据与字段名进行关联，格式化为JSON串
+                    else:
+                        result = '查询结果为空'
                 else:
-                    result = '查询结果为空或无法获取字段信息'
-                # des = cursor.description[0]
-                # result = dict(zip(des, res))  # 将返回数据格式化成JSON串
-            elif res is None and ('insert' in sql.lower() or 'update' in sql.lower()):  # 判断是不是插入或者更新数据
-                self.db.commit()  # 提交数据操作，不然插入或者更新，数据只会更新在缓存，没正式落库
-                result = ''  # 操作数据，不需要返回数据
-            cursor.close()  # 关闭游标
-            self.closeDB()  # 关闭数据连接
-            return True, result
+                    result = ''  # 操作数据，不需要返回数据（连接为自动提交）
         except Exception as e:
+            pool.release(conn, broken=True)
+            self._record(round_trips)
             return False, 'SQL执行失败,原因：[' + str(e) + ']'
+        pool.release(conn)
+        self._record(round_trips)
+        return True, result
+
+    def excetBatch(self, statements, transaction=True, fetch_size=None, multi_statements=True):
+        """
+        批量执行sql：多条语句一次发送（一次往返），返回每条语句的完整结果（按列存放）
+        使用服务端游标（SSCursor）分批读取结果，结果集较大时不会在客户端多保留一份逐行数据
+        :param statements: SQL 语句列表，或包含多条语句的 SQL 文本
+        :param transaction: 是否在同一个事务中执行，任一语句失败时整体回滚
+        :param fetch_size: 每次读取的行数，默认读取 base.yaml 的 db_pool.fetch_size
+        :param multi_statements: 为 False 时在不开启多语句的连接上逐条执行（同一个连接，每条一次往返），
+                                 用于 SQL 由用例数据拼接而成、不应执行多语句的场景（如数据库断言）
+        :return: (True, 每条语句的结果列表) 或 (False, 失败原因)
+                 查询: {'columns': [字段名], 'rowcount': 行数, 'data': {字段名: [值, ...]}}
+                 非查询: {'columns': [], 'rowcount': 影响行数, 'data': {}}
+        """
+        sqls = build_batch_sqls(statements, transaction, multi_statements)
+        if not sqls:
+            return False, 'SQL语句为空'
+        fetch_size = int(fetch_size or (get_env_value('db_pool') or {}).get('fetch_size') or 1000)
+        pool = get_db_pool(self.connect_args(multi_statements))
+        try:
+            conn, round_trips = pool.acquire()
+        except Exception as e:
+            return False, '连接数据失败' + str(e)
+        results = []
+        try:
+            with conn.cursor(pymysql.cursors.SSCursor) as cursor:
+                for sql in sqls:
+                    cursor.execute(sql)
+                    round_trips += 1
+                    while True:
+                        results.append(self._read_result(cursor, fetch_size))
+                        if not cursor.nextset():
+                            break
+        except Exception as e:
+            # 关闭连接，未提交的事务由数据库回滚
+            pool.release(conn, broken=True)
+            self._record(round_trips)
+            return False, f'SQL执行失败（第 {max(1, len(results) + (0 if transaction else 1))} 条语句）,原因：[{e}]'
+        pool.release(conn)
+        self._record(round_trips)
+        if transaction:
+            # 去掉 START TRANSACTION / COMMIT 的结果
+            results = results[1:-1]
+        return True, results
+
+    @staticmethod
+    def _read_result(cursor, fetch_size: int) -> Dict[str, Any]:
+        """分批读取当前结果集，转换为按列存放的结果"""
+        if cursor.description is None:
+            return {'columns': [], 'rowcount': max(cursor.rowcount, 0), 'data': {}}
+        columns = [column[0] for column in cursor.description]
+        values = [[] for _ in columns]
+        count = 0
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for column_values, batch in zip(values, zip(*rows)):
+                column_values.extend(batch)
+            count += len(rows)
+        return {'columns': columns, 'rowcount': count, 'data': dict(zip(columns, values))}
 
 
 if __name__ == "__main__":
@@ -78,3 +394,5 @@ if __name__ == "__main__":
     oper = OpeartorDB()
     isOK, result = oper.excetSql(sql, table_name)
     print(result)
+    print(oper.excetBatch([sql, f"select count(*) as total from {table_name}"], transaction=False))
+    print(get_db_stats())
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+解析一次的响应对象 - 包装 requests.Response，响应体只解码 / 解析一次
+断言、变量提取、报告附件共用同一个对象，json() 返回同一份解析结果（调用方不要修改）
+"""
+from typing import Any
+import requests
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from common.phase_profiler import phase
+
+_UNSET = object()
+
+
+class ParsedResponse(object):
+    """
+    响应包装类
+    - json():  首次调用时解析并缓存结果；解析失败时缓存异常，之后每次抛出同一个异常
+    - text:    首次访问时解码并缓存（requests 每次访问 text 都会重新解码，未声明编码时还要探测编码）
+    - content: 原始字节
+    其余属性（status_code、headers、elapsed、request、cookies 等）转发给原始响应
+    """
+
+    def __init__(self, response: requests.Response):
+        self.response = response
+        self._json = _UNSET
+        self._json_error = None
+        self._text = None
+
+    @classmethod
+    def wrap(cls, response) -> 'ParsedResponse':
+        """包装响应，已经包装过的直接返回"""
+        return response if isinstance(response, cls) else cls(response)
+
+    @property
+    def content(self) -> bytes:
+        return self.response.content
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.response.text
+        return self._text
+
+    def json(self, **kwargs) -> Any:
+        """解析后的 JSON，带参数调用时不走缓存"""
+        if kwargs:
+            return self.response.json(**kwargs)
+        if self._json is _UNSET and self._json_error is None:
+            try:
+                with phase('response_json'):
+                    self._json = self.response.json()
+            except ValueError as e:
+                self._json_error = e
+        if self._json_error is not None:
+            raise self._json_error.with_traceback(None)
+        return self._json
+
+    @property
+    def is_json(self) -> bool:
+        """响应体是否为合法 JSON"""
+        try:
+            self.json()
+            return True
+        except ValueError:
+            return False
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+    def __repr__(self):
+        return f'<ParsedResponse [{self.response.status_code}]>'
+
+
+if __name__ == '__main__':
+    raw = requests.Response()
+    raw.status_code = 200
+    raw._content = '{"data": {"id": 1, "name": "张三"}}'.encode('utf-8')
+    raw.encoding = 'utf-8'
+    parsed = ParsedResponse.wrap(raw)
+    print(parsed, parsed.json() is parsed.json(), parsed.text, parsed.status_code)
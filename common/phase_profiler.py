@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+阶段耗时分析 - 记录每条用例在各处理阶段的耗时，按关键字、工作表、接口汇总 p50/p95/p99
+
+阶段（PHASES）：变量替换、请求头解析、HTTP 请求、响应 JSON 解析、断言、变量提取、报告附件；
+用例总耗时中不属于任何阶段的部分记为 other
+
+开关为 base.yaml 的 profiling.enabled：关闭时 phase() / activate() 返回共享的空上下文，不计时也不记录样本
+多进程执行时每个 worker 把样本写入自己的 allure-results 目录（phase_samples_*.json），
+ReportAggregator 合并结果时汇总为一份报告（profiling.report_file，与 allure-results 同级）
+"""
+import json
+import math
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from config.config_loader import get_env_value
+from common.case_dependency import is_http_case
+
+# 阶段名
+PHASES = ('replace_data', 'format_headers', 'http', 'response_json', 'assertions', 'extract', 'allure_attach')
+
+# worker 样本文件名前缀（写在 allure-results 目录中，合并报告时不复制给 allure）
+SAMPLE_PREFIX = 'phase_samples_'
+
+_NULL_SPAN = nullcontext()
+_local = threading.local()
+_samples = []  # 当前进程的样本 (工作表, 关键字, 接口, 总耗时, {阶段: 耗时})
+_samples_lock = threading.Lock()
+_enabled = bool((get_env_value('profiling') or {}).get('enabled', False))
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(flag: bool = True) -> None:
+    """开启 / 关闭阶段耗时记录（只影响当前进程）"""
+    global _enabled
+    _enabled = bool(flag)
+
+
+class CaseProfile(object):
+    """一条用例的阶段耗时（同一阶段多次出现时累加）"""
+    __slots__ = ('phases',)
+
+    def __init__(self):
+        self.phases = {}
+
+
+class _Span(object):
+    __slots__ = ('profile', 'name', 'start')
+
+    def __init__(self, profile: CaseProfile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        phases = self.profile.phases
+        phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+class _Activation(object):
+    """在当前线程上设置正在记录的用例，退出时恢复"""
+    __slots__ = ('profile', 'previous')
+
+    def __init__(self, profile: CaseProfile):
+        self.profile = profile
+
+    def __enter__(self):
+        self.previous = getattr(_local, 'profile', None)
+        _local.profile = self.profile
+        return self.profile
+
+    def __exit__(self, *exc):
+        _local.profile = self.previous
+        return False
+
+
+def new_profile() -> Optional[CaseProfile]:
+    """开始记录一条用例，未开启时返回 None"""
+    return CaseProfile() if _enabled else None
+
+
+def activate(profile: Optional[CaseProfile]):
+    """
+    在当前线程上记录 profile 的阶段耗时（异步执行引擎中一条用例的请求和响应处理在不同线程）
+    profile 为 None 时不改变当前线程正在记录的用例
+    """
+    return _Activation(profile) if profile is not None else _NULL_SPAN
+
+
+def phase(name: str):
+    """记录一个阶段的耗时：with phase('http'): ...；未开启或当前线程没有正在记录的用例时不计时"""
+    if not _enabled:
+        return _NULL_SPAN
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return _NULL_SPAN
+    return _Span(profile, name)
+
+
+def endpoint_name(case: Dict[str, Any]) -> str:
+    """
+    接口名：请求方法 + 路径（取用例中替换前的地址，数据驱动展开的用例归到同一接口）
+    例如 ${host}/api/users/${uid}?page=1 -> POST /api/users/${uid}
+    """
+    url = str(case.get('url') or '').strip().split('?', 1)[0]
+    if '://' in url:
+        url = urlsplit(url).path
+    elif url.startswith('${') and '}' in url:
+        url = url[url.index('}') + 1:]
+    return f"{str(case.get('method') or '').upper()} {url or '/'}"
+
+
+def record_case(case: Dict[str, Any], profile: Optional[CaseProfile], duration: float) -> None:
+    """记录一条用例的总耗时和阶段耗时"""
+    if profile is None:
+        return
+    endpoint = endpoint_name(case) if is_http_case(case) else None
+    sample = (case.get('sheet'), case.get('method'), endpoint, duration, profile.phases)
+    with _samples_lock:
+        _samples.append(sample)
+
+
+def take_samples() -> List[tuple]:
+    """取出并清空当前进程的样本"""
+    global _samples
+    with _samples_lock:
+        samples, _samples = _samples, []
+    return samples
+
+
+def write_samples(result_dir) -> Optional[Path]:
+    """把当前进程的样本写入结果目录（worker 任务结束时调用），没有样本时不写"""
+    samples = take_samples()
+    if not samples:
+        return None
+    path = Path(result_dir) / f'{SAMPLE_PREFIX}{os.getpid()}_{time.time_ns()}.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'columns': ['sheet', 'keyword', 'endpoint', 'total', 'phases'], 'rows': samples},
+                  f, ensure_ascii=False)
+    return path
+
+
+def read_samples(paths: Iterable) -> List[tuple]:
+    """读取 worker 样本文件"""
+    samples = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            samples.extend(tuple(row) for row in json.load(f)['rows'])
+    return samples
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """最近秩百分位数（sorted_values 已升序）"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(p / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    """耗时列表（秒）的统计，单位毫秒"""
+    values = sorted(values)
+    total = sum(values)
+    return {
+        'count': len(values),
+        'total_ms': round(total * 1000, 3),
+        'mean_ms': round(total / len(values) * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+def _group_stats(samples: List[tuple]) -> Dict[str, Any]:
+    """一组用例的总耗时统计及各阶段统计"""
+    phases = {}
+    for _, _, _, total, case_phases in samples:
+        for name, seconds in case_phases.items():
+            phases.setdefault(name, []).append(seconds)
+        phases.setdefault('other', []).append(max(0.0, total - sum(case_phases.values())))
+    stats = summarize([sample[3] for sample in samples])
+    stats['phases'] = {name: summarize(values) for name, values in phases.items()}
+    return stats
+
+
+def build_report(samples: List[tuple]) -> Dict[str, Any]:
+    """
+    汇总样本
+    :return: {'cases', 'overall', 'keywords': {关键字: 统计}, 'sheets': {工作表: 统计}, 'endpoints': {接口: 统计}}
+             统计: count/total_ms/mean_ms/p50_ms/p95_ms/p99_ms/max_ms 及 phases: {阶段: 同样的统计}
+    """
+    groups = {'keywords': {}, 'sheets': {}, 'endpoints': {}}
+    for sample in samples:
+        sheet, keyword, endpoint = sample[0], sample[1], sample[2]
+        groups['sheets'].setdefault(str(sheet), []).append(sample)
+        groups['keywords'].setdefault(str(keyword), []).append(sample)
+        if endpoint is not None:
+            groups['endpoints'].setdefault(endpoint, []).append(sample)
+    report = {'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'cases': len(samples),
+              'overall': _group_stats(samples)}
+    for group, members in groups.items():
+        report[group] = dict(sorted(((key, _group_stats(values)) for key, values in members.items()),
+                                    key=lambda item: item[1]['total_ms'], reverse=True))
+    return report
+
+
+def report_path(results_dir=None) -> Path:
+    """报告文件路径：allure-results 目录同级的 profiling.report_file"""
+    from common.initPath import BASEDIR
+    results_dir = Path(results_dir or os.path.join(BASEDIR, get_env_value('test_result_dir')))
+    return results_dir.parent / ((get_env_value('profiling') or {}).get('report_file') or 'phase_profile.json')
+
+
+def write_report(samples: List[tuple], path) -> Dict[str, Any]:
+    """汇总样本并写入 JSON 报告"""
+    report = build_report(samples)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def print_report(report: Dict[str, Any], top: int = 5) -> None:
+    """打印各阶段耗时和最慢的接口"""
+    if not report['cases']:
+        return
+    print(f"\n⏱️  阶段耗时 ({report['cases']} 条用例，p50 / p95 / p99 ms):")
+    for name, stats in sorted(report['overall']['phases'].items(), key=lambda item: item[1]['total_ms'], reverse=True):
+        print(f"   {name:<16s} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} {stats['p99_ms']:9.2f}  "
+              f"(合计 {stats['total_ms'] / 1000:.2f}s)")
+    for endpoint, stats in list(report['endpoints'].items())[:top]:
+        print(f"   🔗 {endpoint}: {stats['count']} 次, p95 {stats['p95_ms']:.2f}ms")
+
+
+if __name__ == '__main__':
+    enable()
+    demo_case = {'sheet': '用户', 'method': 'post', 'url': '${host}/api/users/${uid}?page=1'}
+    for i in range(100):
+        demo_profile = new_profile()
+        start = time.perf_counter()
+        with activate(demo_profile):
+            with phase('replace_data'):
+                time.sleep(0.0001)
+            with phase('http'):
+                time.sleep(0.001 + i * 0.00001)
+        record_case(demo_case, demo_profile, time.perf_counter() - start)
+    demo_report = build_report(take_samples())
+    print_report(demo_report)
@@ -2,7 +2,6 @@ import json
 from urllib.parse import urlparse, parse_qs
 import re
 import requests
-import jsonpath
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -10,40 +9,143 @@ from setup_paths import init_paths
 init_paths()
 
 # 使用相对导入
-from config.config_loader import get_env_var_value, get_env_now
-from common.api_assertion import APIAssertion
+from config.config_loader import get_env_view, on_config_reload
+from common.jsonpath_cache import find_key_values
+from common.template_engine import CompiledTemplate, compile_template
+from common.variable_store import VariableStoreFacade, get_variable_store
 
 
-class Paramete:
+class Paramete(metaclass=VariableStoreFacade):
     """
-    全局参数存储类
-    注意：所有模块都应该使用同一个 Paramete 实例
+    全局参数存储类（兼容旧写法）
+    setattr(Paramete, k, v) / getattr(Paramete, k) 实际读写 common.variable_store 中的变量池
     导入方式：from common.publicFunction import Paramete
     """
     pass
 
 
+def clear_global_variables():
+    """清空全局变量池，长驻 worker 在两个任务之间调用，避免变量串用"""
+    get_variable_store().clear('global')
+
+
+# 变量值按 re.sub 替换模板的规则展开（\\n 转为换行等），与原先逐个 re.sub 替换的结果一致
+_VALUE_EXPANDER = re.compile('\x00')
+
+# 变量值中又包含 ${变量} 时最多再展开的次数，防止变量互相引用导致死循环
+MAX_RENDER_ROUNDS = 10
+
+
+class VariableResolver(object):
+    """
+    统一的变量查找：场景变量 -> 系统变量（环境配置） -> worker 变量 -> 全局变量
+    环境配置使用构建一次的只读视图，每一层都只是一次字典查找
+    按来源统计命中次数，多线程并发时计数为近似值
+    """
+
+    SOURCES = ('scenario', 'env', 'worker', 'global')
+
+    def __init__(self):
+        self._env = None
+        self._store = get_variable_store()
+        self.hits = dict.fromkeys(self.SOURCES, 0)
+        self.misses = 0
+        self.sources = {}  # 变量名 -> 最近一次命中的来源
+        self.missing = {}  # 变量名 -> 未找到的次数
+
+    @property
+    def env(self):
+        if self._env is None:
+            self._env = get_env_view()
+        return self._env
+
+    def refresh(self) -> None:
+        """重新读取环境配置视图（reload_config 时自动调用）"""
+        self._env = None
+
+    def resolve(self, keys):
+        """
+        查找变量
+        :return: 变量原始值（requests.Response 取 text），找不到时抛出 AttributeError
+        """
+        scope, value = self._store.lookup(keys)
+        if scope != 'scenario':
+            env_value = (self._env if self._env is not None else self.env).get(keys)
+            if env_value is not None:
+                scope, value = 'env', env_value
+        if scope is None:
+            self.misses += 1
+            self.missing[keys] = self.missing.get(keys, 0) + 1
+            raise AttributeError(f"type object 'Paramete' has no attribute '{keys}'")
+        self.hits[scope] += 1
+        self.sources[keys] = scope
+        return value.text if isinstance(value, requests.Response) else value
+
+    def get_stats(self):
+        """
+        查找统计
+        :return: {'hits': {来源: 次数}, 'misses': 未命中次数, 'hit_rate': 命中率, 'sources': {变量名: 来源}, 'missing': {变量名: 次数}}
+        """
+        total = sum(self.hits.values()) + self.misses
+        return {
+            'hits': dict(self.hits),
+            'misses': self.misses,
+            'hit_rate': sum(self.hits.values()) / total if total else 0.0,
+            'sources': dict(self.sources),
+            'missing': dict(self.missing),
+        }
+
+    def reset_stats(self):
+        self.hits = dict.fromkeys(self.SOURCES, 0)
+        self.misses = 0
+        self.sources = {}
+        self.missing = {}
+
+
+_resolver = VariableResolver()
+on_config_reload(_resolver.refresh)
+
+
+def get_variable_resolver():
+    """获取进程内共享的变量查找器"""
+    return _resolver
+
+
+def lookup_variable(keys):
+    """
+    查找变量值：当前上下文私有变量 -> 系统变量 -> 全局变量
+    :return: 变量值字符串，找不到时抛出 AttributeError
+    """
+    value = str(_resolver.resolve(keys))
+    if '\\' in value:
+        value = _VALUE_EXPANDER.sub(value, '\x00')
+    return value
+
+
 def replace_data(data):
     """
     替换变量
+    模板按源字符串编译缓存，渲染时一次拼接；有替换发生时去掉反斜杠并把换行转义为 \\n
     :param data:
     :return:
     """
-    keys = None
-    try:
-        ru = r'\${(.*?)}'
-        while re.search(ru, data):
-            res = re.search(ru, data)
-            keys = res.group(1)
-            value = get_env_var_value(get_env_now(), keys)  # 先找系统变量
-            if value is None:
-                value = getattr(Paramete, keys)  # 再找环境变量
-                value = value.text if isinstance(value, requests.Response) else str(value)
-            data = re.sub(re.escape(res.group(0)), value, data, 1)
-            data = data.replace('\\', '')
-            data = data.replace('\n', '\\n')
-    except Exception as e:
-        print(f'❌ 替换变量失败:未找到系统变量或环境变量【{keys}】')
+    if not isinstance(data, str):
+        print(f'❌ 替换变量失败:未找到系统变量或环境变量【None】')
+        return data
+    template = compile_template(data)
+    for _ in range(MAX_RENDER_ROUNDS):
+        if not template.names:
+            break
+        rendered, missing, count = template.render(lookup_variable)
+        if count:
+            data = rendered.replace('\\', '').replace('\n', '\\n')
+        if missing is not None:
+            print(f'❌ 替换变量失败:未找到系统变量或环境变量【{missing}】')
+            break
+        if '${' not in data:
+            break
+        # 变量值中可能还有 ${变量}，继续展开
+        template = CompiledTemplate(data)
     return data
 
 
@@ -93,19 +195,17 @@ def extract_variable(response, **case):
         except Exception:
             _reason = '变量提取格式错误'
         try:
-            res = json.dumps(response.json(), ensure_ascii=False)
+            result = response.json()  # ParsedResponse 已缓存解析结果，直接使用
         except Exception:
-            res = response.text
-        escaped_str = res.replace("\n", "#$#")  # 处理json字符串中带有“\n“换行符无法转换
-        try:
-            result = json.loads(escaped_str, strict=False)  # 指定在解析 JSON 数据时允许一些非严格的解析模式
-        except json.JSONDecodeError as e:
-            print(f"JSON解析错误：{e}")
-        key = '$..' + key
+            escaped_str = response.text.replace("\n", "#$#")  # 处理json字符串中带有“\n“换行符无法转换
+            try:
+                result = json.loads(escaped_str, strict=False)  # 指定在解析 JSON 数据时允许一些非严格的解析模式
+            except json.JSONDecodeError as e:
+                print(f"JSON解析错误：{e}")
         try:
-            value1 = str(jsonpath.jsonpath(result, key)[0])
+            value1 = str(find_key_values(result, key)[0])
         except Exception:
-            return False, '字典中[' + str(result) + ']没有键[' + key + '], 执行失败'
+            return False, '字典中[' + str(result) + ']没有键[$..' + key + '], 执行失败'
         value = value1.replace("#$#", "\\n")
         value = value.replace("'", '"')
         setattr(Paramete, par, value)
@@ -139,6 +239,7 @@ def postPrint(**case):
 def _execute_assertions(response, **case):
     """
     执行断言列表
+    断言在加载用例时已编译（common.assertion_plan，按 assertions 列内容缓存），这里直接取编译结果执行
     
     Args:
         response: 响应对象
@@ -147,155 +248,12 @@ def _execute_assertions(response, **case):
     Returns:
         tuple: (是否成功, 断言结果信息)
     """
-    
-    # 初始化结果变量
-    all_passed = True
-    reason_list = []
-    assertions = []
+    if case.get('compile_error'):
+        return False, case['compile_error']
+    from common.assertion_plan import compile_assertions
+    from common.enhanced_data_loader import DataValidationError
     try:
-        assertions = json.loads(case['assertions'])  
-    except Exception:
-        _isOk = False
-        _reason = f"断言格式错误：{case['assertions']}"
-        return _isOk, _reason
-    
-    for i, assertion in enumerate(assertions, 1):
-        
-        if assertion.startswith("contains_"):#响应体json包含字段
-            # 格式: contains_id;contains_data.list
-            field = replace_data(assertion.replace("contains_", ""))
-            _isOk, _reason = APIAssertion.assert_json_contains(response, field)
-        elif assertion.startswith("value_"):#响应体json字段值等于
-            # 格式: value_field_name=expected_value
-            parts = replace_data(assertion.replace("value_", "")).split("=", 1)
-            if len(parts) == 2:
-                field, expected_value = parts
-                _isOk, _reason = APIAssertion.assert_json_value(response, field, expected_value)
-            else:
-                _isOk = False
-                _reason = f'断言格式错误：{assertion}'
-        elif assertion.startswith("time_"):#响应时间小于
-            # 格式: time_10
-            max_time = assertion.replace("time_", "")
-            _isOk, _reason = APIAssertion.assert_response_time(response, int(max_time))
-        elif assertion.startswith("jsonpath_"):#响应体json路径值等于
-            # 格式说明：
-            # jsonpath_$.data.id=123        # 精确匹配（相等）
-            # jsonpath_$.data.name&张三     # 包含匹配
-            # jsonpath_$.data.age>18        # 大于
-            # jsonpath_$.data.age<100       # 小于
-            jsonpath_part = assertion.replace("jsonpath_", "")
-            
-            if "=" in jsonpath_part:
-                json_path, expected_value = jsonpath_part.split("=", 1)
-                expected_value = replace_data(expected_value)
-                _isOk, _reason = APIAssertion.assert_json_path(response, json_path, expected_value)
-            elif "&" in jsonpath_part:
-                json_path, expected_value = jsonpath_part.split("&", 1)
-                expected_value = replace_data(expected_value)
-                _isOk, _reason = APIAssertion.assert_json_path_contains(response, json_path, expected_value)
-            elif ">" in jsonpath_part and "<" not in jsonpath_part:
-                json_path, expected_value = jsonpath_part.split(">", 1)
-                expected_value = replace_data(expected_value)
-                _isOk, _reason = APIAssertion.assert_json_path_greater(response, json_path, expected_value)
-            elif "<" in jsonpath_part and ">" not in jsonpath_part:
-                json_path, expected_value = jsonpath_part.split("<", 1)
-                expected_value = replace_data(expected_value)
-                _isOk, _reason = APIAssertion.assert_json_path_less(response, json_path, expected_value)
-            elif "<>" in jsonpath_part:
-                json_path, expected_value = jsonpath_part.split("<>", 1)
-                expected_value = replace_data(expected_value)
-                _isOk, _reason = APIAssertion.assert_json_path_not_equal(response, json_path, expected_value)
-            else:
-                _isOk = False
-                _reason = f'JSONPath断言格式错误，缺少期望值：{expected_value}'
-        elif assertion.startswith("schema_"):#响应体json结构等于
-            # 格式: schema_schema.json
-            schema_file = assertion.replace("schema_", "")
-            with open(schema_file, 'r', encoding='utf-8') as f:
-                schema = json.load(f)
-            _isOk, _reason = APIAssertion.assert_json_schema(response, schema)
-        elif assertion.startswith("header_"):#响应头包含字段
-            # 格式: header_Content-Type
-            header_part = assertion.replace("header_", "")
-            if "=" in header_part:
-                header_name, expected_value = header_part.split("=", 1)
-                expected_value = replace_data(expected_value)
-                _isOk, _reason = APIAssertion.assert_header_contains(response, header_name, expected_value)
-            else:
-                _isOk = False
-                _reason = f'头部断言格式错误，缺少期望值：{assertion}'
-        elif assertion.startswith("headerValue_"):
-            # 格式: header_value_Content-Type=application/json
-            header_part = assertion.replace("headerValue_", "")
-            if "=" in header_part:
-                header_name, expected_value = header_part.split("=", 1)
-                expected_value = replace_data(expected_value)
-                _isOk, _reason = APIAssertion.assert_header_value(response, header_name, expected_value)
-            else:
-                _isOk = False
-                _reason = f'头部值断言格式错误，缺少期望值：{assertion}'
-        elif assertion.startswith("header_text_"):#响应头文本包含
-            # 格式: text_响应内容包含"success"
-            expected_text = assertion.replace("header_text_", "")
-            _isOk, _reason = APIAssertion.assert_text_contains(response, expected_text)
-        elif assertion.startswith("text_matches_"):#响应文本匹配正则表达式
-            # 格式: text_matches_响应内容匹配正则表达式"^[0-9]+$"
-            pattern = assertion.replace("text_matches_", "") 
-            _isOk, _reason = APIAssertion.assert_text_matches(response, pattern)
-        elif assertion.startswith("text_contains_"):#
-            # 格式: text_contains_响应内容包含"success"
-            expected_text = assertion.replace("text_contains_", "")
-            _isOk, _reason = APIAssertion.assert_text_contains(response, expected_text)
-        elif assertion.startswith("cookies_contain_"):#响应头cookies包含字段
-            # 格式: cookies_contain_cookie_name
-            cookie_name = assertion.replace("cookies_contain_", "")
-            _isOk, _reason = APIAssertion.assert_cookies_contain(response, cookie_name)
-        elif assertion.startswith("cookie_value_"):#响应头cookies值等于
-            # 格式: cookie_value_cookie_name=expected_value
-            cookie_part = assertion.replace("cookie_value_", "")
-            if "=" in cookie_part:
-                cookie_name, expected_value = cookie_part.split("=", 1)
-                expected_value = replace_data(expected_value)
-                _isOk, _reason = APIAssertion.assert_cookie_value(response, cookie_name, expected_value)
-            else:
-                _isOk = False
-                _reason = f'Cookie值断言格式错误，缺少期望值：{assertion}'
-        elif assertion.startswith("response_size_"):#响应大小
-            # 格式: response_size_min=100&max=200
-            size_part = assertion.replace("response_size_", "")
-            if "&" in size_part:
-                min_size, max_size = size_part.split("&", 1)
-                min_size = int(min_size.split("=")[1])
-                max_size = int(max_size.split("=")[1])
-                _isOk, _reason = APIAssertion.assert_response_size(response, min_size, max_size)
-            else:
-                _isOk = False
-                _reason = f'响应大小断言格式错误，缺少期望值：{assertion}'
-        elif assertion.startswith("structure_"):#响应体json结构等于 
-            # 格式: structure_schema.json
-            schema_file = assertion.replace("structure_", "")
-            with open(schema_file, 'r', encoding='utf-8') as f:
-                schema = json.load(f)
-            _isOk, _reason = APIAssertion.assert_json_structure(response, schema)
-        else:
-            print(assertion)
-            _isOk = False
-            _reason = '未定义的断言规则：【{}】'.format(assertion)
-        
-        # 收集每个断言的结果
-        status = "✓ 通过" if _isOk else "✗ 失败"
-        reason_list.append(f"---断言{i}: {assertion} -> {status}: {_reason}")
-        
-        # 如果有断言失败，标记整体失败
-        if not _isOk:
-            all_passed = False
-    
-    # 合并所有断言结果
-    total_assertions = len(assertions)
-    passed_count = sum(1 for reason in reason_list if "✓ 通过" in reason)
-    failed_count = total_assertions - passed_count
-    
-    summary = f"断言执行完成: 总计{total_assertions}个, 通过{passed_count}个, 失败{failed_count}个"
-    combined_reason = f"{summary}\n" + "\n".join(reason_list)
-    return all_passed, combined_reason
\ No newline at end of file
+        plan = compile_assertions(case['assertions'])
+    except DataValidationError as e:
+        return False, str(e)
+    return plan.execute(response)
\ No newline at end of file
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+JSON Schema 注册表 - schema_ / structure_ 断言引用的 schema 文件只读取一次
+schema_ 断言使用的校验器（已通过 check_schema 检查）同样只创建一次，之后每次断言只做实例校验
+按文件绝对路径缓存，文件修改时间或大小变化时重新加载
+"""
+import json
+import threading
+from typing import Any, Dict
+from jsonschema.validators import validator_for
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+
+class _SchemaEntry(object):
+    __slots__ = ('signature', 'schema', 'validator')
+
+    def __init__(self, signature: tuple, schema: Dict[str, Any]):
+        self.signature = signature
+        self.schema = schema
+        self.validator = None
+
+
+class SchemaRegistry(object):
+    """schema 文件缓存"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, schema_file: str) -> _SchemaEntry:
+        path = os.path.abspath(schema_file)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and entry.signature == signature:
+            self.hits += 1
+            return entry
+        with open(path, 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+        entry = _SchemaEntry(signature, schema)
+        with self._lock:
+            self._entries[path] = entry
+            self.misses += 1
+        return entry
+
+    def load(self, schema_file: str) -> Dict[str, Any]:
+        """
+        读取 schema 文件（缓存的对象被多个用例共用，调用方不要修改）
+        :raises OSError / json.JSONDecodeError: 文件不存在或不是合法 JSON
+        """
+        return self._entry(schema_file).schema
+
+    def validator(self, schema_file: str):
+        """
+        获取 schema 文件对应的校验器（按 $schema 选择 Draft 版本）
+        :raises jsonschema.SchemaError: schema 本身不合法（不缓存，下次调用再次检查）
+        """
+        entry = self._entry(schema_file)
+        if entry.validator is None:
+            cls = validator_for(entry.schema)
+            cls.check_schema(entry.schema)
+            entry.validator = cls(entry.schema)
+        return entry.validator
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """缓存统计"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+_registry = SchemaRegistry()
+
+
+def get_schema_registry() -> SchemaRegistry:
+    """获取进程内共享的 schema 注册表"""
+    return _registry
+
+
+if __name__ == '__main__':
+    import tempfile
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+        json.dump({'type': 'object', 'required': ['id'], 'properties': {'id': {'type': 'integer'}}}, f)
+    registry = get_schema_registry()
+    for _ in range(3):
+        validator = registry.validator(f.name)
+    print(validator.is_valid({'id': 1}), validator.is_valid({'id': 'x'}), registry.get_stats())
+    os.remove(f.name)
@@ -1,22 +1,132 @@
-from sqlite3 import paramstyle
 import sys
 import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from setup_paths import init_paths
 init_paths()
 import requests
 import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from config.config_loader import get_env_value
 
 # 禁用SSL证书验证警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# 连接统计（进程级），用于确认 keep-alive 是否生效
+_stats_lock = threading.Lock()
+_connection_stats = {'requests': 0, 'new_connections': 0}
+
+
+def _count(key):
+    with _stats_lock:
+        _connection_stats[key] += 1
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    """每新建一个 TCP 连接计数一次"""
+
+    def _new_conn(self):
+        _count('new_connections')
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    """每新建一个 TCP/TLS 连接计数一次"""
+
+    def _new_conn(self):
+        _count('new_connections')
+        return super()._new_conn()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """按主机维护连接池的适配器，连接池使用带计数的实现"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+
+def _get_http_config():
+    """读取 base.yaml 中的 http 连接池配置"""
+    config = get_env_value('http') or {}
+    return {
+        'pool_connections': int(config.get('pool_connections') or 10),
+        'pool_maxsize': int(config.get('pool_maxsize') or 10),
+        'pool_block': bool(config.get('pool_block', False)),
+        'max_retries': int(config.get('max_retries') or 0),
+    }
+
+
+def _build_session():
+    """
+    创建带连接池的 Session
+    Cookie 不在用例之间自动传递，保持与原先 requests.request 一致的无状态行为
+    """
+    config = _get_http_config()
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = PooledHTTPAdapter(pool_connections=config['pool_connections'],
+                                pool_maxsize=config['pool_maxsize'],
+                                pool_block=config['pool_block'],
+                                max_retries=config['max_retries'])
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_shared_session():
+    """
+    获取当前 worker 进程共享的 Session，同一进程内所有 send_api 复用同一组连接池
+    fork 出的子进程会重新创建，避免多个进程共用同一个 socket
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                _session = _build_session()
+                _session_pid = os.getpid()
+                with _stats_lock:
+                    _connection_stats['requests'] = 0
+                    _connection_stats['new_connections'] = 0
+    return _session
+
+
+def get_connection_stats():
+    """
+    获取本次运行的连接复用统计
+    :return: {'requests': 请求数, 'new_connections': 新建连接数, 'reused_connections': 复用连接数, 'reuse_rate': 复用率}
+    """
+    with _stats_lock:
+        stats = dict(_connection_stats)
+    stats['reused_connections'] = max(stats['requests'] - stats['new_connections'], 0)
+    stats['reuse_rate'] = stats['reused_connections'] / stats['requests'] if stats['requests'] else 0.0
+    return stats
+
+
+def reset_connection_stats():
+    """清零连接统计"""
+    with _stats_lock:
+        _connection_stats['requests'] = 0
+        _connection_stats['new_connections'] = 0
+
 
 class SendApirequests(object):
 
     def __init__(self):
-        self.session = requests.session()
+        self.session = get_shared_session()
 
     def request_Obj(self, method, url, params=None, data=None, json=None, files=None, headers=None, verify=True):
-        response = requests.request(method=method, url=url, params=params, data=data, json=json, files=files,
-                                    headers=headers,verify=False)
+        _count('requests')
+        response = self.session.request(method=method, url=url, params=params, data=data, json=json, files=files,
+                                        headers=headers, verify=False)
         return response
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+${变量} 模板编译 - 把 url / headers / data 等字符串解析为字面量片段和占位符片段
+同一个源字符串只解析一次（按源字符串缓存），渲染时按片段顺序拼接一遍即可
+"""
+import re
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+PLACEHOLDER_PATTERN = re.compile(r'\${(.*?)}')
+
+
+class CompiledTemplate(object):
+    """编译后的模板：literals 比 names 多一个，渲染结果为 literals[0] + 值0 + literals[1] + 值1 + ..."""
+
+    __slots__ = ('source', 'literals', 'names', 'placeholders')
+
+    def __init__(self, source: str):
+        self.source = source
+        literals = []
+        names = []
+        placeholders = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            literals.append(source[position:match.start()])
+            names.append(match.group(1))
+            placeholders.append(match.group(0))
+            position = match.end()
+        literals.append(source[position:])
+        self.literals = tuple(literals)
+        self.names = tuple(names)
+        self.placeholders = tuple(placeholders)
+
+    def render(self, lookup: Callable[[str], str]) -> Tuple[str, Optional[str], int]:
+        """
+        渲染模板
+        :param lookup: 变量取值函数，找不到变量时抛出异常
+        :return: (渲染结果, 未找到的变量名, 已替换的占位符数)
+                 遇到未找到的变量时停止，该占位符及之后的内容保持原样
+        """
+        if not self.names:
+            return self.source, None, 0
+        parts = [self.literals[0]]
+        for index, name in enumerate(self.names):
+            try:
+                value = lookup(name)
+            except Exception:
+                parts.append(self._rest(index))
+                return ''.join(parts), name, index
+            parts.append(value)
+            parts.append(self.literals[index + 1])
+        return ''.join(parts), None, len(self.names)
+
+    def render_partial(self, variables: dict) -> str:
+        """只替换 variables 中存在的变量，其余占位符保持原样（不做任何转义处理）"""
+        parts = [self.literals[0]]
+        for index, name in enumerate(self.names):
+            parts.append(str(variables[name]) if name in variables else self.placeholders[index])
+            parts.append(self.literals[index + 1])
+        return ''.join(parts)
+
+    def _rest(self, index: int) -> str:
+        """第 index 个占位符开始的原始内容"""
+        parts = []
+        for position in range(index, len(self.names)):
+            parts.append(self.placeholders[position])
+            parts.append(self.literals[position + 1])
+        return ''.join(parts)
+
+
+@lru_cache(maxsize=4096)
+def compile_template(source: str) -> CompiledTemplate:
+    """编译模板（按源字符串缓存）"""
+    return CompiledTemplate(source)
+
+
+def get_template_cache_stats() -> dict:
+    """模板缓存统计"""
+    info = compile_template.cache_info()
+    total = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+        'hit_rate': info.hits / total if total else 0.0,
+    }
+
+
+if __name__ == '__main__':
+    template = compile_template('{"id": "${id}", "name": "${name}"}')
+    print(template.names)
+    print(template.render({'id': '1', 'name': '张三'}.__getitem__))
+    print(template.render_partial({'id': '1'}))
+    print(get_template_cache_stats())
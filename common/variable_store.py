@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+分作用域的线程安全变量池 - 取代 Paramete 类属性充当全局变量池的做法
+
+作用域（查找时由内到外）：
+- scenario: 场景作用域，绑定在当前执行上下文（contextvars），asyncio 任务之间互不可见
+- worker:   worker 作用域，绑定在当前线程，线程池并发执行时每个线程一份
+- global:   全局作用域，进程内共享
+
+写入规则：变量已在场景中声明时写入场景，否则写入当前 worker 作用域（已启用时），否则写入全局作用域
+全局作用域写时复制：snapshot() 返回的视图不会被之后的写入修改
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Optional, Tuple
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+SCOPES = ('scenario', 'worker', 'global')
+
+# 在场景中声明但尚未赋值的变量，查找时视为不存在（不会回退到外层作用域）
+_UNSET = object()
+
+
+class _WorkerVariables(threading.local):
+    """每个线程一份的 worker 作用域，未启用时为 None"""
+    variables = None
+
+
+class VariableStore(object):
+    """分作用域的变量池"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._global = {}
+        self._global_shared = False
+        self._worker = _WorkerVariables()
+        self._scenario = ContextVar(f'scenario_variables_{id(self)}', default=None)
+
+    # ---------- 查找 ----------
+
+    def lookup(self, name: str) -> Tuple[Optional[str], Any]:
+        """
+        按 scenario -> worker -> global 查找变量
+        :return: (作用域, 值)，找不到时作用域为 None
+        """
+        scenario = self._scenario.get()
+        if scenario is not None and name in scenario:
+            value = scenario[name]
+            return (None, None) if value is _UNSET else ('scenario', value)
+        worker = self._worker.variables
+        if worker is not None and name in worker:
+            return 'worker', worker[name]
+        value = self._global.get(name, _UNSET)
+        if value is _UNSET:
+            return None, None
+        return 'global', value
+
+    def get(self, name: str, default: Any = _UNSET) -> Any:
+        """获取变量，找不到且未提供默认值时抛出 KeyError"""
+        scope, value = self.lookup(name)
+        if scope is None:
+            if default is _UNSET:
+                raise KeyError(name)
+            return default
+        return value
+
+    def __contains__(self, name: str) -> bool:
+        return self.lookup(name)[0] is not None
+
+    # ---------- 写入 ----------
+
+    def set(self, name: str, value: Any, scope: str = None) -> None:
+        """
+        设置变量
+        :param scope: 指定作用域，默认按写入规则选择
+        """
+        scope = scope or self._write_scope(name)
+        with self._lock:
+            if scope == 'scenario':
+                scenario = self._scenario.get()
+                if scenario is None:
+                    raise RuntimeError('当前不在场景作用域内')
+                scenario[name] = value
+            elif scope == 'worker':
+                worker = self._worker.variables
+                if worker is None:
+                    raise RuntimeError('当前线程未启用 worker 作用域')
+                worker[name] = value
+            else:
+                self._writable_global()[name] = value
+
+    def delete(self, name: str) -> None:
+        """删除变量（只删除写入规则对应作用域中的值）"""
+        scope = self._write_scope(name)
+        with self._lock:
+            if scope == 'scenario':
+                self._scenario.get()[name] = _UNSET
+            elif scope == 'worker':
+                self._worker.variables.pop(name, None)
+            elif name in self._global:
+                del self._writable_global()[name]
+            else:
+                raise KeyError(name)
+
+    def update(self, variables: Dict[str, Any], scope: str = None) -> None:
+        for name, value in variables.items():
+            self.set(name, value, scope)
+
+    def clear(self, scope: str = 'global') -> None:
+        """清空指定作用域"""
+        with self._lock:
+            if scope == 'global':
+                self._global = {}
+                self._global_shared = False
+            elif scope == 'worker' and self._worker.variables is not None:
+                self._worker.variables = {}
+            elif scope == 'scenario' and self._scenario.get() is not None:
+                self._scenario.get().clear()
+
+    def _write_scope(self, name: str) -> str:
+        scenario = self._scenario.get()
+        if scenario is not None and name in scenario:
+            return 'scenario'
+        if self._worker.variables is not None:
+            return 'worker'
+        return 'global'
+
+    def _writable_global(self) -> dict:
+        """写时复制：全局作用域被快照引用过，先复制一份再写"""
+        if self._global_shared:
+            self._global = dict(self._global)
+            self._global_shared = False
+        return self._global
+
+    # ---------- 快照 ----------
+
+    def snapshot(self) -> MappingProxyType:
+        """当前可见变量的只读快照（内层覆盖外层），之后的写入不影响快照"""
+        with self._lock:
+            scenario = self._scenario.get()
+            worker = self._worker.variables
+            if scenario is None and worker is None:
+                self._global_shared = True
+                return MappingProxyType(self._global)
+            merged = dict(self._global)
+            if worker:
+                merged.update(worker)
+            if scenario:
+                for name, value in scenario.items():
+                    if value is _UNSET:
+                        merged.pop(name, None)
+                    else:
+                        merged[name] = value
+            return MappingProxyType(merged)
+
+    # ---------- 作用域 ----------
+
+    def enter_scenario(self, variables: Dict[str, Any] = None, names: Iterable[str] = ()):
+        """
+        进入新的场景作用域
+        :param variables: 场景内的初始变量（同时声明为场景变量）
+        :param names: 额外声明为场景变量的变量名，之后对它们的写入只在本场景可见
+        :return: 用于 exit_scenario 的 token
+        """
+        scenario = {name: _UNSET for name in names}
+        scenario.update(variables or {})
+        return self._scenario.set(scenario)
+
+    def exit_scenario(self, token) -> None:
+        """退出 enter_scenario 进入的场景作用域"""
+        self._scenario.reset(token)
+
+    @contextmanager
+    def scenario(self, variables: Dict[str, Any] = None, names: Iterable[str] = ()):
+        """场景作用域上下文，见 enter_scenario"""
+        token = self.enter_scenario(variables, names)
+        try:
+            yield self
+        finally:
+            self.exit_scenario(token)
+
+    @contextmanager
+    def worker_scope(self, variables: Dict[str, Any] = None):
+        """在当前线程启用 worker 作用域，退出时丢弃"""
+        previous = self._worker.variables
+        self._worker.variables = dict(variables or {})
+        try:
+            yield self
+        finally:
+            self._worker.variables = previous
+
+
+_store = VariableStore()
+
+
+def get_variable_store() -> VariableStore:
+    """获取进程内共享的变量池"""
+    return _store
+
+
+class VariableStoreFacade(type):
+    """
+    兼容旧写法的元类：setattr(Paramete, k, v) / getattr(Paramete, k) 转发到变量池
+    双下划线开头的属性仍按普通类属性处理
+    """
+
+    def __getattr__(cls, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        scope, value = _store.lookup(name)
+        if scope is None:
+            raise AttributeError(f"type object '{cls.__name__}' has no attribute '{name}'")
+        return value
+
+    def __setattr__(cls, name, value):
+        if name.startswith('__'):
+            super().__setattr__(name, value)
+        else:
+            _store.set(name, value)
+
+    def __delattr__(cls, name):
+        if name.startswith('__'):
+            super().__delattr__(name)
+            return
+        try:
+            _store.delete(name)
+        except KeyError:
+            raise AttributeError(name)
+
+
+if __name__ == '__main__':
+    store = get_variable_store()
+    store.set('token', 'global-token')
+    snapshot = store.snapshot()
+    with store.scenario({'response': '{"id": 1}'}, names=('token',)):
+        store.set('token', 'scenario-token')
+        store.set('id', 1)
+        print(f"场景内: token={store.get('token')} response={store.get('response')}")
+    print(f"场景外: token={store.get('token')} id={store.get('id')} response={store.get('response', None)}")
+    store.set('token', 'new-token')
+    print(f"快照: {dict(snapshot)}")
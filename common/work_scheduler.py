@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+用例级工作窃取调度器 - 取代按文件启动 pytest 子进程的并发方式
+
+调度规则：
+1. 工作簿按工作表拆分为任务；工作表之间通过 ${变量} 存在依赖时合并为同一个任务（相互独立的用例组）
+2. 按历史耗时从长到短排序，依次分配给预计负载最小的 worker（LPT），没有历史记录时按用例数估算
+3. 每个 worker 有自己的任务队列：从队首取任务，自己的队列空了就从负载最大的 worker 队尾窃取
+4. worker 为预热的常驻进程（见 worker_pool），只在启动时导入一次执行模块，之后通过管道领取任务
+"""
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from config.config_loader import get_env_value
+from common.case_dependency import referenced_variables, produced_variables
+from common.worker_pool import WarmWorkerPool
+
+
+def _scheduler_config() -> Dict[str, Any]:
+    """读取 base.yaml 中的 scheduler 配置"""
+    return get_env_value('scheduler') or {}
+
+
+class SheetTask(object):
+    """调度任务：同一工作簿中一个或多个存在变量依赖的工作表"""
+
+    def __init__(self, index: int, file_path: str, file_index: int, sheets: List[str], case_counts: Dict[str, int]):
+        """
+        :param index: 任务序号
+        :param file_path: 工作簿路径
+        :param file_index: 工作簿序号，同一工作簿的任务写入同一个结果目录
+        :param sheets: 工作表名称（保持工作簿中的原始顺序）
+        :param case_counts: 各工作表的用例数
+        """
+        self.index = index
+        self.file_path = str(file_path)
+        self.file_index = file_index
+        self.sheets = list(sheets)
+        self.case_counts = dict(case_counts)
+        self.estimate = 0.0
+
+    @property
+    def file_name(self) -> str:
+        return Path(self.file_path).name
+
+    @property
+    def task_id(self) -> str:
+        return f"{self.file_name}::{'+'.join(self.sheets)}"
+
+    @property
+    def case_count(self) -> int:
+        return sum(self.case_counts.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """发送给 worker 的任务描述"""
+        return {
+            'index': self.index,
+            'file_path': self.file_path,
+            'file_index': self.file_index,
+            'sheets': self.sheets,
+        }
+
+
+def split_workbook(file_path, file_index: int, start_index: int = 0, loader=None,
+                   cases: List[Dict[str, Any]] = None) -> List[SheetTask]:
+    """
+    将工作簿拆分为任务
+    后面的工作表引用了前面工作表产生的变量时，两者合并为同一个任务并按原始顺序执行
+    :param file_path: 工作簿路径
+    :param file_index: 工作簿序号
+    :param start_index: 第一个任务的序号
+    :param loader: 数据加载器，默认新建 EnhancedDataLoader
+    :param cases: 已加载的用例（如用例目录中的用例），不传时用 loader 加载
+    :return: 任务列表
+    """
+    from common.data_driven import CaseExpander
+    if cases is None:
+        if loader is None:
+            from common.enhanced_data_loader import EnhancedDataLoader
+            loader = EnhancedDataLoader()
+        cases = loader.load_test_cases(str(file_path))
+
+    sheet_cases = {}
+    for case in cases:
+        sheet_cases.setdefault(case.get('sheet'), []).append(case)
+    sheets = list(sheet_cases)
+
+    # 并查集：存在变量依赖的工作表归为一组
+    parent = {sheet: sheet for sheet in sheets}
+
+    def find(sheet):
+        while parent[sheet] != sheet:
+            parent[sheet] = parent[parent[sheet]]
+            sheet = parent[sheet]
+        return sheet
+
+    # 引用数据表的用例按展开后的条数估算耗时；行内变量在展开时替换，不算依赖
+    expander = CaseExpander(file_path)
+    producers = {}  # 变量名 -> 最后产生该变量的工作表
+    for sheet in sheets:
+        consumes = set()
+        produces = set()
+        for case in sheet_cases[sheet]:
+            consumes |= referenced_variables(case) - produces - expander.row_variables(case)
+            produces |= produced_variables(case)
+        consumes.discard('response')
+        produces.discard('response')
+        for name in consumes:
+            if name in producers:
+                parent[find(sheet)] = find(producers[name])
+        for name in produces:
+            producers[name] = sheet
+
+    groups = {}
+    for sheet in sheets:
+        groups.setdefault(find(sheet), []).append(sheet)
+    tasks = []
+    for group in groups.values():
+        counts = {sheet: sum(expander.count(case) for case in sheet_cases[sheet]) for sheet in group}
+        tasks.append(SheetTask(start_index + len(tasks), file_path, file_index, group, counts))
+    return tasks
+
+
+class DurationHistory(object):
+    """工作表历史耗时，用于估算任务耗时（指数滑动平均）"""
+
+    def __init__(self, history_file: str = None, default_case_seconds: float = None, smoothing: float = None,
+                 base_dir: str = None):
+        """
+        :param history_file: 历史耗时文件（JSON），相对路径基于 base_dir
+        :param default_case_seconds: 没有历史记录时每条用例的预估耗时（秒）
+        :param smoothing: 新耗时所占权重，0~1
+        :param base_dir: 项目根目录，默认当前工作目录
+        """
+        config = _scheduler_config()
+        self.history_file = Path(base_dir or os.getcwd()) / (
+            history_file or config.get('history_file') or 'TestReport/sheet_durations.json')
+        self.default_case_seconds = float(default_case_seconds or config.get('default_case_seconds') or 0.5)
+        self.smoothing = float(smoothing or config.get('history_smoothing') or 0.5)
+        self.durations = self._load()
+
+    def _load(self) -> Dict[str, float]:
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def key(file_path: str, sheet: str) -> str:
+        return f"{Path(file_path).name}::{sheet}"
+
+    def estimate(self, task: SheetTask) -> float:
+        """任务预估耗时：有历史记录的工作表取历史值，否则按用例数估算"""
+        total = 0.0
+        for sheet, count in task.case_counts.items():
+            history = self.durations.get(self.key(task.file_path, sheet))
+            total += history if history is not None else count * self.default_case_seconds
+        return total
+
+    def update(self, file_path: str, sheet_durations: Dict[str, float]) -> None:
+        """记录一个任务中各工作表的实际耗时"""
+        for sheet, duration in sheet_durations.items():
+            key = self.key(file_path, sheet)
+            old = self.durations.get(key)
+            self.durations[key] = duration if old is None else old + self.smoothing * (duration - old)
+
+    def save(self) -> None:
+        try:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.history_file, 'w', encoding='utf-8') as f:
+                json.dump(self.durations, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"⚠️  保存历史耗时失败: {e}")
+
+
+class WorkStealingScheduler(object):
+    """预热 worker 进程池 + 工作窃取调度"""
+
+    def __init__(self, max_workers: int, results_base_dir, timeout: float = None, pool: WarmWorkerPool = None):
+        """
+        :param max_workers: worker 进程数
+        :param results_base_dir: allure-results 临时目录
+        :param timeout: 单个任务超时时间（秒）
+        :param pool: 复用已启动的 worker 进程池，默认每次执行新建并在结束后关闭
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.results_base_dir = str(results_base_dir)
+        self.timeout = float(timeout or 600)
+        self.pool = pool
+        self._in_flight = {}
+        self.steals = 0
+
+    @staticmethod
+    def _seed(tasks: List[SheetTask], worker_count: int) -> List[deque]:
+        """LPT：按预估耗时从长到短，依次放入当前负载最小的 worker 队列"""
+        deques = [deque() for _ in range(worker_count)]
+        loads = [0.0] * worker_count
+        for task in sorted(tasks, key=lambda t: t.estimate, reverse=True):
+            target = loads.index(min(loads))
+            deques[target].append(task)
+            loads[target] += task.estimate
+        return deques
+
+    def _next_task(self, worker_id: int, deques: List[deque]) -> Optional[SheetTask]:
+        """先取自己队首（最长）的任务，队列为空时从剩余负载最大的队列队尾窃取"""
+        own = deques[worker_id]
+        if own:
+            return own.popleft()
+        victim = max(deques, key=lambda d: sum(t.estimate for t in d))
+        if victim:
+            self.steals += 1
+            return victim.pop()
+        return None
+
+    def _dispatch(self, pool: WarmWorkerPool, worker_id: int, deques: List[deque]) -> None:
+        task = self._next_task(worker_id, deques)
+        if task is None:
+            return
+        self._in_flight[worker_id] = {'task': task, 'started': time.time(), 'cases': []}
+        pool.send(worker_id, task.to_dict())
+        print(f"🚚 Worker {worker_id} 领取任务: {task.task_id} (预估 {task.estimate:.1f}s)")
+
+    def _fail_task(self, worker_id: int, error: str) -> Dict[str, Any]:
+        """任务未正常结束时，按已回传的用例结果记录失败"""
+        flight = self._in_flight.pop(worker_id)
+        failed = [f"[{r['sheet']}] 用例{r['case_id']}: {r['message'][:200]}" for r in flight['cases'] if not r['success']]
+        return {'index': flight['task'].index, 'worker_id': worker_id, 'success': False, 'error': error,
+                'cases': len(flight['cases']), 'failed': failed, 'sheet_durations': {},
+                'duration': time.time() - flight['started']}
+
+    def _check_timeouts(self, pool: WarmWorkerPool) -> List[Dict[str, Any]]:
+        """终止超时的 worker，记录失败并重启一个新的 worker"""
+        failures = []
+        for worker_id, flight in list(self._in_flight.items()):
+            if time.time() - flight['started'] > self.timeout:
+                failures.append(self._fail_task(worker_id, f"Execution timeout ({self.timeout:.0f}s)"))
+                pool.restart(worker_id)
+        return failures
+
+    def run(self, tasks: List[SheetTask], on_result=None, on_case=None) -> List[Dict[str, Any]]:
+        """
+        执行全部任务
+        :param tasks: 任务列表（需已设置 estimate）
+        :param on_result: 每完成一个任务回调一次 on_result(task, result)
+        :param on_case: 每回传一条用例结果回调一次 on_case(task, case_result)
+        :return: 任务结果列表（按任务序号排序）
+        """
+        if not tasks:
+            return []
+        by_index = {task.index: task for task in tasks}
+        pool = self.pool or WarmWorkerPool(min(self.max_workers, len(tasks)), self.results_base_dir)
+        pool.start()
+        deques = self._seed(tasks, pool.size)
+        self._in_flight = {}
+        self.steals = 0
+        # 复用的进程池中已就绪的 worker 不会再发送 ready，直接分发
+        for worker_id in pool.idle_workers():
+            self._dispatch(pool, worker_id, deques)
+
+        results = {}
+        try:
+            while len(results) < len(tasks):
+                finished = []
+                for kind, worker_id, payload in pool.poll(1):
+                    if kind == 'case':
+                        flight = self._in_flight.get(worker_id)
+                        if flight:
+                            flight['cases'].append(payload)
+                            if on_case:
+                                on_case(flight['task'], payload)
+                        continue
+                    if kind == 'done':
+                        self._in_flight.pop(worker_id, None)
+                        finished.append(payload)
+                    elif kind == 'dead':
+                        if worker_id in self._in_flight:
+                            finished.append(self._fail_task(worker_id, f"Worker 进程异常退出 (exitcode={payload})"))
+                        pool.restart(worker_id)
+                        continue
+                    self._dispatch(pool, worker_id, deques)
+                finished.extend(self._check_timeouts(pool))
+                for outcome in finished:
+                    if outcome['index'] in results:
+                        continue
+                    results[outcome['index']] = outcome
+                    if on_result:
+                        on_result(by_index[outcome['index']], outcome)
+        finally:
+            if self.pool is None:
+                pool.close()
+            else:
+                # 中断时仍在执行的 worker 状态未知，重启后再交还给进程池
+                for worker_id in list(self._in_flight):
+                    pool.restart(worker_id)
+                self._in_flight = {}
+        return [results[index] for index in sorted(results)]
+
+
+def plan_tasks(file_list: List[Path], history: DurationHistory, catalog=None) -> List[SheetTask]:
+    """
+    拆分全部工作簿并估算耗时
+    :param catalog: 用例目录（EnhancedDataLoader.load_catalog 的结果），不传时逐个加载工作簿
+    """
+    from common.enhanced_data_loader import EnhancedDataLoader
+    loader = EnhancedDataLoader()
+    tasks = []
+    for file_index, file_path in enumerate(file_list):
+        try:
+            if catalog is not None and str(file_path) in catalog.errors:
+                raise ValueError(catalog.errors[str(file_path)])
+            cases = catalog.cases_for(file_path) if catalog is not None and file_path in catalog else None
+            tasks.extend(split_workbook(file_path, file_index, len(tasks), loader, cases))
+        except Exception as e:
+            print(f"⚠️  {Path(file_path).name} 拆分失败，按整个文件调度: {e}")
+            tasks.append(SheetTask(len(tasks), file_path, file_index, [], {}))
+    for task in tasks:
+        task.estimate = history.estimate(task)
+    return tasks
+
+
+if __name__ == '__main__':
+    files = [Path(p) for p in sys.argv[1:]]
+    for task in plan_tasks(files, DurationHistory()):
+        print(f"  {task.task_id:<60s} 用例: {task.case_count:<5d} 预估: {task.estimate:.1f}s")
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+预热 worker 进程池 - worker 启动时一次性导入执行模块、读取配置，之后通过管道接收任务并逐条回传用例结果
+
+通信协议（每个 worker 一条双向管道）：
+- 主进程 -> worker: 任务字典（整个工作簿的部分工作表 file_path/sheets，或一批用例 cases），None 表示退出
+- worker -> 主进程: ('ready', id, 启动信息) / ('case', id, 用例结果) / ('done', id, 任务汇总)
+"""
+import importlib
+import multiprocessing
+import time
+import traceback
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from setup_paths import init_paths
+init_paths()
+
+from config.config_loader import get_env_value
+
+# 默认预导入的模块（用例执行时按需导入的第三方库）
+DEFAULT_PRELOAD = ('faker', 'jsonschema', 'jsonpath_ng', 'openpyxl', 'pandas')
+
+
+def _run_task(task: Dict[str, Any], runner, loader, results_base_dir: str, emit: Callable,
+              async_runner=None) -> Dict[str, Any]:
+    """
+    在 worker 进程内执行一个任务，用例结果直接写入 allure-results，并逐条回传
+    :param async_runner: 异步执行引擎（concurrent.case_runner 为 async 时），任务内相互独立的用例并发执行
+    """
+    from common.allure_writer import AllureCaseReporter
+    from common.publicFunction import clear_global_variables
+    from common.data_driven import CaseExpander
+    from common import phase_profiler
+
+    if task.get('cases') is not None:
+        cases = task['cases']
+        suite = task.get('suite') or 'batch'
+        result_dir = Path(results_base_dir) / f"batch_{task['index']}"
+        # 按工作表分组，组内保持原始顺序
+        sheets = task.get('sheets') or list(dict.fromkeys(case.get('sheet') for case in cases))
+        cases = [case for sheet in sheets for case in cases if case.get('sheet') == sheet]
+        expander = CaseExpander(task.get('file_path'))
+    else:
+        # 边读取边执行，只读取任务中的工作表（按任务中的顺序）；未指定工作表时读取全部
+        cases = loader.iter_test_cases(task['file_path'], sheet_name=task.get('sheets'))
+        expander = CaseExpander(task['file_path'])
+        suite = Path(task['file_path']).name
+        result_dir = Path(results_base_dir) / f"file_{task['file_index']}"
+    sheet_durations = {}
+    failed = []
+    executed = 0
+
+    # 与按文件启动子进程时一样，每个任务从空的变量池开始
+    clear_global_variables()
+    if async_runner is not None:
+        cases = list(cases)
+        # 依赖图需要全部用例：展开后的用例数超过 max_cases 时改为下面的逐条执行
+        if async_runner.accepts(expander, cases):
+            return _run_task_async(async_runner, list(expander.expand(cases)), suite, result_dir, emit)
+    # 引用数据表的用例在执行时逐行展开
+    cases = expander.expand(cases)
+    reporter = AllureCaseReporter(result_dir)
+    sheet = None
+    sheet_start = time.time()
+    try:
+        for case in cases:
+            if case.get('sheet') != sheet:
+                if sheet is not None:
+                    sheet_durations[sheet] = time.time() - sheet_start
+                sheet = case.get('sheet')
+                sheet_start = time.time()
+            if runner.should_skip(case):
+                continue
+            with reporter.case(case, suite=suite) as outcome:
+                result = runner.run_case(case)
+                outcome['success'] = result['success']
+                outcome['message'] = result['message']
+            result['success'] = outcome['success']
+            result['message'] = outcome['message']
+            emit(result)
+            executed += 1
+            if not outcome['success']:
+                failed.append(f"[{sheet}] 用例{case.get('case_id')}: {str(outcome['message'])[:200]}")
+        if sheet is not None:
+            sheet_durations[sheet] = time.time() - sheet_start
+    finally:
+        reporter.close()
+        if phase_profiler.is_enabled():
+            phase_profiler.write_samples(result_dir)
+    return {
+        'cases': executed,
+        'failed': failed,
+        'sheet_durations': sheet_durations,
+        'result_dir': str(result_dir),
+    }
+
+
+def _run_task_async(async_runner, cases: List[Dict[str, Any]], suite: str, result_dir: Path,
+                    emit: Callable) -> Dict[str, Any]:
+    """用异步执行引擎执行任务（依赖图需要全部用例），完成后逐条写入 allure-results 并回传"""
+    from common.allure_writer import AllureCaseReporter
+    from common.async_runner import write_allure_results
+    from common import phase_profiler
+
+    sheet_durations = {}
+    failed = []
+    try:
+        results = async_runner.run(cases)
+        # 执行完成后再注册写入器：并发执行期间没有当前用例，allure.attach 不写入
+        reporter = AllureCaseReporter(result_dir)
+        try:
+            results = write_allure_results(reporter, cases, results, suite=suite)
+        finally:
+            reporter.close()
+    finally:
+        if phase_profiler.is_enabled():
+            phase_profiler.write_samples(result_dir)
+    for result in results:
+        emit(result)
+        # 用例并发执行，工作表耗时按用例耗时累加估算
+        sheet_durations[result['sheet']] = sheet_durations.get(result['sheet'], 0.0) + result['duration']
+        if not result['success']:
+            failed.append(f"[{result['sheet']}] 用例{result['case_id']}: {str(result['message'])[:200]}")
+    return {
+        'cases': len(results),
+        'failed': failed,
+        'sheet_durations': sheet_durations,
+        'result_dir': str(result_dir),
+    }
+
+
+def _worker_main(worker_id: int, conn, results_base_dir: str, preload: List[str],
+                 case_runner: str = 'pytest') -> None:
+    """worker 入口：预热 -> 循环接收任务并回传结果，收到 None 或管道关闭时退出"""
+    start_time = time.time()
+    # 在导入日志模块前设置，日志写入 log.worker_N
+    os.environ['WORKER_ID'] = str(worker_id)
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+    from common.case_runner import CaseRunner
+    from common.enhanced_data_loader import EnhancedDataLoader
+    from common.sendApirequest import get_shared_session
+    runner = CaseRunner()
+    loader = EnhancedDataLoader()
+    get_shared_session()
+    async_runner = None
+    if case_runner == 'async':
+        from common.async_runner import AsyncCaseRunner
+        async_runner = AsyncCaseRunner(case_runner=runner)
+
+    conn.send(('ready', worker_id, {'pid': os.getpid(), 'startup': time.time() - start_time}))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        start_time = time.time()
+        try:
+            outcome = _run_task(task, runner, loader, results_base_dir,
+                                lambda result: conn.send(('case', worker_id, result)), async_runner)
+            outcome['error'] = '; '.join(outcome['failed'][:5]) or None
+            outcome['success'] = not outcome['failed']
+        except Exception as e:
+            outcome = {'success': False, 'error': f"{type(e).__name__}: {e}", 'traceback': traceback.format_exc(),
+                       'cases': 0, 'failed': [], 'sheet_durations': {}}
+        outcome['index'] = task['index']
+        outcome['worker_id'] = worker_id
+        outcome['duration'] = time.time() - start_time
+        conn.send(('done', worker_id, outcome))
+    conn.close()
+
+
+class WarmWorkerPool(object):
+    """常驻的预热 worker 进程池，可在多次执行之间复用"""
+
+    def __init__(self, size: int, results_base_dir, preload: List[str] = None, case_runner: str = None):
+        """
+        :param size: worker 数量
+        :param results_base_dir: allure-results 临时目录
+        :param preload: worker 启动时预导入的模块，默认读取 base.yaml 的 worker_pool.preload
+        :param case_runner: 任务内用例的执行方式 pytest(逐条串行) / async(异步执行引擎)，默认读取 base.yaml 的 concurrent.case_runner
+        """
+        config = get_env_value('worker_pool') or {}
+        self.size = max(1, int(size))
+        self.results_base_dir = str(results_base_dir)
+        self.preload = list(preload if preload is not None else (config.get('preload') or DEFAULT_PRELOAD))
+        self.case_runner = case_runner or (get_env_value('concurrent') or {}).get('case_runner') or 'pytest'
+        # spawn 启动的 worker 不继承父进程已创建的日志、连接池等状态，各平台行为一致
+        self._context = multiprocessing.get_context('spawn')
+        self.workers = {}
+        self.startup = {}
+
+    def start(self) -> None:
+        """启动尚未运行的 worker（不等待预热完成，就绪后会收到 ready 消息）"""
+        for worker_id in range(self.size):
+            if worker_id not in self.workers:
+                self._start_worker(worker_id)
+
+    def _start_worker(self, worker_id: int) -> None:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker_main,
+                                        args=(worker_id, child_conn, self.results_base_dir, self.preload,
+                                              self.case_runner),
+                                        daemon=True)
+        process.start()
+        child_conn.close()
+        self.workers[worker_id] = {'process': process, 'conn': parent_conn, 'ready': False, 'busy': False}
+
+    def restart(self, worker_id: int) -> None:
+        """终止并重新启动一个 worker（任务超时或进程崩溃时使用）"""
+        worker = self.workers.pop(worker_id)
+        if worker['process'].is_alive():
+            worker['process'].terminate()
+        worker['process'].join(5)
+        worker['conn'].close()
+        self._start_worker(worker_id)
+
+    def idle_workers(self) -> List[int]:
+        """已就绪且空闲的 worker"""
+        return [wid for wid, w in self.workers.items() if w['ready'] and not w['busy']]
+
+    def send(self, worker_id: int, task: Optional[Dict[str, Any]]) -> None:
+        """向 worker 发送一个任务"""
+        worker = self.workers[worker_id]
+        worker['busy'] = task is not None
+        worker['conn'].send(task)
+
+    def poll(self, timeout: float = 1.0) -> List[tuple]:
+        """
+        读取所有 worker 的消息
+        worker 进程退出时返回 ('dead', worker_id, exitcode)；预热完成前就退出说明 worker 无法启动，
+        重启也会同样失败，直接抛出 RuntimeError（错误信息见 worker 的标准错误输出）
+        :return: 消息列表
+        """
+        conns = {w['conn']: wid for wid, w in self.workers.items()}
+        messages = []
+        for conn in wait(list(conns), timeout):
+            worker_id = conns[conn]
+            worker = self.workers[worker_id]
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                worker['process'].join(5)
+                if not worker['ready']:
+                    raise RuntimeError(f"Worker {worker_id} 启动失败 (exitcode={worker['process'].exitcode})")
+                messages.append(('dead', worker_id, worker['process'].exitcode))
+                continue
+            kind = message[0]
+            if kind == 'ready':
+                worker['ready'] = True
+                self.startup[worker_id] = message[2]['startup']
+            elif kind == 'done':
+                worker['busy'] = False
+            messages.append(message)
+        return messages
+
+    def wait_ready(self, timeout: float = 120) -> None:
+        """等待全部 worker 预热完成"""
+        deadline = time.time() + timeout
+        while not all(w['ready'] for w in self.workers.values()) and time.time() < deadline:
+            self.poll(0.5)
+
+    def run_batches(self, batches: List[List[Dict[str, Any]]], on_case: Callable = None,
+                    timeout: float = None) -> List[Dict[str, Any]]:
+        """
+        按批次分发用例，空闲的 worker 领取下一批
+        worker 进程退出或批次执行超时时，该批次记为失败（已回传的用例结果保留），重启 worker 后继续分发其余批次
+        :param batches: 用例批次列表，每批在同一个 worker 中按顺序执行
+        :param on_case: 每回传一条用例结果回调一次
+        :param timeout: 单个批次的超时时间（秒），默认读取 base.yaml 的 concurrent.timeout
+        :return: 各批次的汇总结果（按批次顺序）
+        """
+        timeout = float(timeout or (get_env_value('concurrent') or {}).get('timeout') or 600)
+        self.start()
+        pending = list(enumerate(batches))
+        in_flight = {}  # worker_id -> {'index', 'started', 'cases'}
+        results = {}
+
+        def fail(worker_id: int, error: str) -> None:
+            flight = in_flight.pop(worker_id)
+            failed = [f"[{r['sheet']}] 用例{r['case_id']}: {str(r['message'])[:200]}"
+                      for r in flight['cases'] if not r['success']]
+            results[flight['index']] = {'index': flight['index'], 'worker_id': worker_id, 'success': False,
+                                        'error': error, 'cases': len(flight['cases']), 'failed': failed,
+                                        'sheet_durations': {}, 'duration': time.time() - flight['started']}
+            self.restart(worker_id)
+
+        try:
+            while len(results) < len(batches):
+                for worker_id in self.idle_workers():
+                    if pending:
+                        index, cases = pending.pop(0)
+                        in_flight[worker_id] = {'index': index, 'started': time.time(), 'cases': []}
+                        self.send(worker_id, {'index': index, 'cases': cases})
+                for kind, worker_id, payload in self.poll(1):
+                    if kind == 'case':
+                        if worker_id in in_flight:
+                            in_flight[worker_id]['cases'].append(payload)
+                        if on_case:
+                            on_case(payload)
+                    elif kind == 'done':
+                        in_flight.pop(worker_id, None)
+                        results[payload['index']] = payload
+                    elif kind == 'dead':
+                        if worker_id in in_flight:
+                            fail(worker_id, f"Worker 进程异常退出 (exitcode={payload})")
+                        else:
+                            self.restart(worker_id)
+                # 卡住的 worker 不会回传消息，按批次开始时间判断超时
+                for worker_id, flight in list(in_flight.items()):
+                    if time.time() - flight['started'] > timeout:
+                        fail(worker_id, f"Execution timeout ({timeout:.0f}s)")
+        finally:
+            # 中断时仍在执行的 worker 状态未知，重启后再交还给进程池
+            for worker_id in list(in_flight):
+                self.restart(worker_id)
+        return [results[index] for index in range(len(batches))]
+
+    def close(self) -> None:
+        """通知所有 worker 退出"""
+        for worker in self.workers.values():
+            try:
+                worker['conn'].send(None)
+            except (OSError, ValueError):
+                pass
+        for worker in self.workers.values():
+            worker['process'].join(5)
+            if worker['process'].is_alive():
+                worker['process'].terminate()
+            worker['conn'].close()
+        self.workers = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+if __name__ == '__main__':
+    with WarmWorkerPool(2, 'TestReport/temp_results') as pool:
+        pool.wait_ready()
+        for worker_id, seconds in sorted(pool.startup.items()):
+            print(f"🔥 Worker {worker_id} 预热耗时: {seconds:.2f}s")
@@ -6,6 +6,7 @@
 import os
 import yaml
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any, Dict, Optional
 
 # 加载 .env 文件中的环境变量
@@ -32,6 +33,7 @@ class ConfigLoader:
         self.config_dir = Path(__file__).parent
         self.environment = os.getenv('ENVIRONMENT')
         self._config_cache = None
+        self._env_view = None
         self._use_new_config = self._check_new_config_available()
     
     def _check_new_config_available(self) -> bool:
@@ -151,6 +153,16 @@ class ConfigLoader:
             if isinstance(first_level, dict):
                 return first_level.get(key2, default)
             return default
+    
+    def get_env_view(self) -> MappingProxyType:
+        """
+        获取当前环境配置的只读视图（首次调用时构建，之后直接返回）
+        值为 None 的配置项不包含在内，与 get(环境, 键) 返回 None 时的处理一致
+        """
+        if self._env_view is None:
+            section = self.get(self.environment) or {}
+            self._env_view = MappingProxyType({k: v for k, v in section.items() if v is not None})
+        return self._env_view
 
 
 # 全局配置加载器实例
@@ -195,15 +207,46 @@ def get_env_value(key):
     return _config_loader.get(key)
 
 
+def get_env_view():
+    """
+    获取当前环境配置的只读视图，变量替换等高频查找直接读这个字典
+    :return: MappingProxyType
+    
+    使用示例：
+        host = get_env_view().get('host')
+    """
+    return _config_loader.get_env_view()
+
+
 # ========================================
 # 新增功能（可选使用）
 # ========================================
 
+# 配置重新加载后调用的回调（缓存了环境配置视图的模块在这里注册刷新函数）
+_reload_callbacks = []
+
+
+def on_config_reload(callback):
+    """
+    注册配置重新加载后的回调
+    :param callback: 无参数的函数
+    
+    使用示例：
+        on_config_reload(resolver.refresh)
+    """
+    _reload_callbacks.append(callback)
+    return callback
+
+
 def reload_config():
-    """重新加载配置（用于配置文件变更后刷新）"""
+    """重新加载配置（用于配置文件变更后刷新），并通知缓存了配置的模块"""
     global _config_loader
     _config_loader._config_cache = None
-    return _config_loader.get_config()
+    _config_loader._env_view = None
+    config = _config_loader.get_config()
+    for callback in _reload_callbacks:
+        callback()
+    return config
 
 
 def get_config_loader():
@@ -3,7 +3,6 @@ import datetime
 import time
 import json
 import random
-import jsonpath
 import requests
 import sys
 import os
@@ -17,6 +16,161 @@ from common.sendApirequest import SendApirequests
 from common.sendEmail import SendMail
 from common.sendMsg import SendMsg
 from common.login import get_default_authorization
+from common.jsonpath_cache import find_key_values
+from common.phase_profiler import phase
+
+
+# 数据库关键字的参数解析与结果处理，同步（CommKeyword）与异步（common.async_db）执行共用
+# 解析函数返回 (True, 参数) 或 (False, 失败原因)
+
+def parse_execut_sql(kwargs):
+    """执行SQL 的参数：(SQL, 表名, 变量名, 字段名)"""
+    try:
+        sql = replace_data(kwargs['param_1'])
+        table_name = kwargs['param_5']
+    except KeyError:
+        return False, '方法缺少参数，执行失败'
+    try:
+        var = kwargs['param_2']
+        par = kwargs['param_3']
+    except Exception:
+        var = None
+        par = None
+    return True, (sql, table_name, var, par)
+
+
+def finish_execut_sql(sql, var, par, isOK, result):
+    """执行SQL 的结果：按需把字段值保存到变量池"""
+    if isOK and var is not None:
+        data = result[par]
+        setattr(Paramete, var, data)
+        return True, '执行SQL:[' + sql + ']成功，取得' + par + '的数据[' + str(data) + ']==>[${' + var + '}]'
+    elif isOK and var is None:
+        return True, '执行SQL:[' + sql + ']成功'
+    elif isOK is False:
+        return isOK, result
+
+
+def parse_sql_batch(kwargs):
+    """批量执行SQL 的参数：(SQL语句列表或文本, 变量名)"""
+    try:
+        sql = replace_data(kwargs['param_1'])
+    except KeyError:
+        return False, '方法缺少参数，执行失败'
+    if not sql:
+        return False, '方法缺少参数，执行失败'
+    statements = sql
+    if sql.strip().startswith('['):
+        try:
+            statements = json.loads(sql)
+        except ValueError as e:
+            return False, f'SQL语句格式错误：{e}'
+    return True, (statements, kwargs.get('param_2'))
+
+
+def finish_sql_batch(var, isOK, result):
+    """批量执行SQL 的结果：按需把全部结果（JSON）保存到变量池"""
+    if isOK is False:
+        return isOK, result
+    counts = ', '.join(str(item['rowcount']) for item in result)
+    if var:
+        setattr(Paramete, var, json.dumps(result, ensure_ascii=False, default=str))
+        return True, f'批量执行SQL成功，共 {len(result)} 条语句，行数 [{counts}]==>[${{{var}}}]'
+    return True, f'批量执行SQL成功，共 {len(result)} 条语句，行数 [{counts}]'
+
+
+def parse_database_assertion(kwargs):
+    """数据库断言的参数：[(SQL, 表名, 字段名, 规则, 校验值), ...]"""
+    try:
+        sql_param = json.loads(kwargs['param_5'])  
+    except Exception:
+        _reason = f"数据库断言格式错误：{kwargs['param_5']}"
+        return False, _reason
+    # 处理多条数据的情况
+    if isinstance(sql_param, list) and len(sql_param) > 0:
+        if isinstance(sql_param[0], list):
+            specs = sql_param
+        else:
+            specs = [sql_param]
+    else:
+        return False, "数据库断言参数格式错误，应为包含参数的列表"
+    checks = []
+    for spec in specs:
+        if not isinstance(spec, list) or len(spec) < 5:
+            return False, f"数据库断言参数不足，需要5个参数，实际获得{len(spec) if isinstance(spec, list) else 1}个"
+        # 校验值保持 JSON 中的类型（结果等于 / 结果包含 与数据库返回的原始值比较）
+        sql, table_name, par, rules, expr = [replace_data(value) for value in spec[:5]]
+        if not all([sql, table_name, par, rules, expr]):
+            return False, '方法缺少参数，执行失败'
+        checks.append((sql, table_name, par, rules, expr))
+    return True, checks
+
+
+def database_assertion_sqls(checks):
+    """数据库断言需要执行的 SQL（相同的 SQL 只执行一次）"""
+    return list(dict.fromkeys(check[0] for check in checks))
+
+
+def finish_database_assertion(checks, sqls, isOK, result):
+    """数据库断言的结果：逐条校验，全部通过时断言通过"""
+    if isOK is False:
+        return False, f'执行SQL: [{"; ".join(sqls)}]失败，{result}'
+    results = dict(zip(sqls, result))
+    passed = True
+    messages = []
+    for sql, table_name, par, rules, expr in checks:
+        isOK, message = check_database_rule(sql, table_name, par, rules, expr, results[sql])
+        passed = passed and isOK
+        messages.append(message)
+    return passed, '\n'.join(messages)
+
+
+def check_database_rule(sql, table_name, par, rules, expr, result):
+    """按规则校验一条查询结果（列式），返回 (是否通过, 说明)"""
+    field_names = par
+    if rules == '行数等于':
+        try:
+            expected = int(expr)
+        except (TypeError, ValueError):
+            return False, f'行数等于的校验值必须是整数: 【{expr}】'
+        if result['rowcount'] == expected:
+            return True, f'表【{table_name}】的查询结果行数【{result["rowcount"]}】等于校验值: 【{expr}】'
+        return False, f'表【{table_name}】的查询结果行数【{result["rowcount"]}】不等于校验值: 【{expr}】'
+    if rules not in ('结果包含', '结果等于', '全部等于', '任一等于'):
+        return True, f'执行SQL: [{sql}]成功'
+    if par not in result['data']:
+        return False, f'表【{table_name}】的查询结果中没有字段【{field_names}】'
+    if not result['data'][par]:
+        return False, f'表【{table_name}】中【{field_names}】字段的查询结果为空'
+    if rules in ('结果包含', '结果等于'):
+        # 第一行的原始值与校验值直接比较（与单条查询时一致，不做类型转换）
+        data = result['data'][par][0]
+        if rules == '结果包含':
+            try:
+                contained = expr in data
+            except TypeError:
+                contained = False
+            if contained:
+                return True, f'表【{table_name}】中【{field_names}】字段的值【{data}】包含校验值: 【{expr}】'
+            else:
+                return False, f'表【{table_name}】中【{field_names}】字段的值【{data}】不包含校验值: 【{expr}】'
+        if expr == data:
+            return True, f'表【{table_name}】中【{field_names}】字段的值【{data}】等于校验值: 【{expr}】'
+        else:
+            return False, f'表【{table_name}】中【{field_names}】字段的值【{data}】不等于校验值: 【{expr}】'
+    # 多行规则按字符串比较（数据库返回的数字、日期与 Excel 中填写的文本一致）
+    values = [str(value) for value in result['data'][par]]
+    expr = str(expr)
+    if rules == '全部等于':
+        mismatched = [value for value in values if value != expr]
+        if not mismatched:
+            return True, f'表【{table_name}】中【{field_names}】字段的 {len(values)} 行值全部等于校验值: 【{expr}】'
+        return False, (f'表【{table_name}】中【{field_names}】字段有 {len(mismatched)}/{len(values)} 行不等于校验值'
+                       f'【{expr}】: {mismatched[:5]}')
+    if expr in values:
+        return True, f'表【{table_name}】中【{field_names}】字段第 {values.index(expr) + 1} 行的值等于校验值: 【{expr}】'
+    return False, f'表【{table_name}】中【{field_names}】字段的 {len(values)} 行值都不等于校验值: 【{expr}】'
+
 
 class CommKeyword(object):
     def __init__(self):
@@ -45,7 +199,8 @@ class CommKeyword(object):
         :return:  bl, cases 一参数返回成功与否，二参数请求结果或失败原因
         """
         try:
-            url = replace_data(kwargs['url'])
+            with phase('replace_data'):
+                url = replace_data(kwargs['url'])
             method = kwargs['method']
             check = contains_http(url)
             if not check:
@@ -56,7 +211,10 @@ class CommKeyword(object):
             if kwargs['headers'] is None:
                 headers = {}
             else:
-                _isOk, result = self.format_headers(headers=replace_data(kwargs['headers']).strip())
+                with phase('replace_data'):
+                    raw_headers = replace_data(kwargs['headers']).strip()
+                with phase('format_headers'):
+                    _isOk, result = self.format_headers(headers=raw_headers)
                 if _isOk:
                     headers = result
                 else:
@@ -73,7 +231,8 @@ class CommKeyword(object):
             jsondata = None
             
             if kwargs.get('data'):
-                replaced_data = replace_data(kwargs['data'])
+                with phase('replace_data'):
+                    replaced_data = replace_data(kwargs['data'])
                 if method.lower() in ('post', 'delete', 'put'):
                     # 非GET请求：尝试解析为JSON
                     try:
@@ -92,12 +251,15 @@ class CommKeyword(object):
                 if type == 'file':
                     # 文件上传逻辑
                     files = {'file': open(file, 'rb')}
-                    response = requests.post(url, files=files, headers=headers)
+                    with phase('http'):
+                        response = self.sendApi.request_Obj(method='post', url=url, files=files, headers=headers)
                 else:
-                    response = self.sendApi.request_Obj(method=method, url=url, json=jsondata, data=data,
-                                                        headers=headers)
+                    with phase('http'):
+                        response = self.sendApi.request_Obj(method=method, url=url, json=jsondata, data=data,
+                                                            headers=headers)
             else:
-                response = self.sendApi.request_Obj(method=method, url=url, json=jsondata, data=data, headers=headers,verify=False)
+                with phase('http'):
+                    response = self.sendApi.request_Obj(method=method, url=url, json=jsondata, data=data, headers=headers,verify=False)
                 # 去掉响应文本前后的空白字符（包括换行符 \n）
                 setattr(Paramete, 'response', response.text.strip())
                
@@ -159,13 +321,12 @@ class CommKeyword(object):
             result = json.loads(escaped_str, strict=False)  #指定在解析 JSON 数据时允许一些非严格的解析模式
         except json.JSONDecodeError as e:
             print(f"JSON解析错误：{e}")
-        key = '$..' + key
         try:
-            value1 = str(jsonpath.jsonpath(result, key)[0])
+            value1 = str(find_key_values(result, key)[0])
             value = value1.replace("#$#", "\\n")
             value = value.replace("'", '"')
         except Exception:
-            return False, '字典中[' + jsonstr + ']没有键[' + key + '], 执行失败'
+            return False, '字典中[' + jsonstr + ']没有键[$..' + key + '], 执行失败'
         setattr(Paramete, param, value)
         return True, ' 已经取得[' + value + ']==>[${' + param + '}]'
 
@@ -197,11 +358,13 @@ class CommKeyword(object):
         try:
             var = kwargs['result']
             func = kwargs['param_2']
-        except KeyError:
-            print(var,func)
-            return False, '方法缺少参数，执行失败'
+        except KeyError as e:
+            return False, f'方法缺少参数{e}，执行失败'
         if func == 1:
-            param = replace_data(kwargs['param_1'])
+            # 不含 ${} 时原样保存（接口响应等大文本不进入模板编译缓存）
+            param = kwargs['param_1']
+            if isinstance(param, str) and '${' in param:
+                param = replace_data(param)
         else:
             param = eval(replace_data(kwargs['param_1']))
         if var is None or param is None:
@@ -229,78 +392,46 @@ class CommKeyword(object):
         :param kwargs:
         :return:
         """
-        try:
-            sql = replace_data(kwargs['param_1'])
-            table_name = kwargs['param_5']
-        except KeyError:
-            return False, '方法缺少参数，执行失败'
-        try:
-            var = kwargs['param_2']
-            par = kwargs['param_3']
-        except Exception:
-            var = None
-            par = None
+        isOK, parsed = parse_execut_sql(kwargs)
+        if isOK is False:
+            return isOK, parsed
+        sql, table_name, var, par = parsed
         isOK, result = self.operatordb.excetSql(sql, table_name)
-        if isOK and var is not None:
-            data = result[par]
-            setattr(Paramete, var, data)
-            return True, '执行SQL:[' + sql + ']成功，取得' + par + '的数据[' + str(data) + ']==>[${' + var + '}]'
-        elif isOK and var is None:
-            return True, '执行SQL:[' + sql + ']成功'
-        elif isOK is False:
-            return isOK, result
+        return finish_execut_sql(sql, var, par, isOK, result)
+
+    def execut_sql_batch(self, **kwargs):
+        """
+        批量执行SQL：多条语句一次往返、在同一个事务中执行，任一语句失败时整体回滚
+        :param kwargs:
+            param_1: SQL语句，JSON 数组或用 ; 分隔的多条语句
+            param_2: 保存结果的变量名（可选），值为 JSON 数组，每条语句一项：
+                     {"columns": [字段名], "rowcount": 行数, "data": {字段名: [值, ...]}}
+        :return:
+        """
+        isOK, parsed = parse_sql_batch(kwargs)
+        if isOK is False:
+            return isOK, parsed
+        statements, var = parsed
+        isOK, result = self.operatordb.excetBatch(statements)
+        return finish_sql_batch(var, isOK, result)
 
     def assert_database(self, **kwargs):
         """
         数据库断言函数
-        :param sql: SQL语句
-        :param table_name: 表名
-        :param expr: 预期值
-        :param par: 返回结果中需要断言的字段名
+        param_5 为一条断言 [SQL, 表名, 字段名, 规则, 校验值]，或多条断言组成的列表
+        多条断言的 SQL 在同一个连接上逐条执行（相同的 SQL 只执行一次，连接不开启多语句），全部通过时断言通过
+        规则：
+            结果等于 / 结果包含: 第一行该字段的原始值等于 / 包含校验值（不做类型转换）
+            全部等于 / 任一等于: 所有行 / 至少一行该字段的值等于校验值（按字符串比较）
+            行数等于: 查询结果的行数等于校验值
         :return: 断言结果
         """
-        try:
-            sql_param = json.loads(kwargs['param_5'])  
-        except Exception:
-            _reason = f"数据库断言格式错误：{kwargs['param_5']}"
-            return False, _reason
-        ["SELECT * FROM users", "users", "name", "结果等于", "张三"]
-        # 处理多条数据的情况
-        if isinstance(sql_param, list) and len(sql_param) > 0:
-            # 如果是多条数据，取第一条进行断言
-            if isinstance(sql_param[0], list) and len(sql_param[0]) >= 5:
-                sql, table_name, par, rules, expr = sql_param[0][:5]
-            elif len(sql_param) >= 5:
-                sql, table_name, par, rules, expr = sql_param[:5]
-            else:
-                return False, f"数据库断言参数不足，需要5个参数，实际获得{len(sql_param)}个"
-        else:
-            return False, "数据库断言参数格式错误，应为包含参数的列表"
-        sql = replace_data(sql)
-        table_name = replace_data(table_name)
-        par = replace_data(par)
-        rules = replace_data(rules)
-        expr = replace_data(expr)
-        if not all([sql, table_name, par, rules, expr]):
-            return False, '方法缺少参数，执行失败'
-        isOK, result = self.operatordb.excetSql(sql, table_name)
-        if isOK:
-            data = result[par]
-            field_names = par
-            if rules == '结果包含':
-                if expr in data:
-                    return True, f'表【{table_name}】中【{field_names}】字段的值【{data}】包含校验值: 【{expr}】'
-                else:
-                    return False, f'表【{table_name}】中【{field_names}】字段的值【{data}】不包含校验值: 【{expr}】'
-            elif rules == '结果等于':
-                if expr == data:
-                    return True, f'表【{table_name}】中【{field_names}】字段的值【{data}】等于校验值: 【{expr}】'
-                else:
-                    return False, f'表【{table_name}】中【{field_names}】字段的值【{data}】不等于校验值: 【{expr}】'
-            else:
-                return True, f'执行SQL: [{sql}]成功'
-        else:
-            return False, f'执行SQL: [{sql}]失败'
+        isOK, checks = parse_database_assertion(kwargs)
+        if isOK is False:
+            return isOK, checks
+        sqls = database_assertion_sqls(checks)
+        isOK, result = self.operatordb.excetBatch(sqls, transaction=False, multi_statements=False)
+        return finish_database_assertion(checks, sqls, isOK, result)
 
     def send_email(self, **kwargs):
         """
@@ -381,30 +512,14 @@ class CommKeyword(object):
             var = kwargs['param_2']
         except Exception:
             var = None
-        value = None
         try:
             from faker import Faker
             f = Faker(locale='zh_CN')
         except ImportError:
             return False, "faker 模块未安装"
-        if type == '姓名':
-            value = f.name()
-        elif type == '手机号':
-            value = f.phone_number()
-        elif type == '邮箱':
-            value = f.email()
-        elif type == '身份证号':
-            value = f.ssn()
-        elif type == '公司':
-            value = f.company()
-        elif type == '随机数':
-            value = f.random_number(var)
-        elif type == '地址':
-            value = f.address()
-        elif type == '用户名':
-            value = f.user_name()
-        elif type =='ip段':
-            value = f.ipv4()
+        # 类型与数据驱动的 伪数据 数据表共用
+        from common.data_driven import fake_value
+        value = fake_value(f, type, var)
         setattr(Paramete, var_name, value)
         return value, f'伪数据[{type}][{value}]已保存到测试用例的变量池[{var_name}]中。'
 
@@ -1,43 +1,213 @@
 # -*- coding: utf-8 -*-
+"""
+关键字工厂 - 按用例的 method 列分发到 CommKeyword 方法或插件关键字
+
+KeywordRegistry 在首次使用时把 commkey 配置解析为绑定方法（每个 worker 进程一份），
+执行时只做一次字典查找，不再每步查配置、getattr；同时统计每个关键字的调用次数和耗时
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from setup_paths import init_paths
 init_paths()
-from config.config_loader import get_env_var_value
+from config.config_loader import get_env_value
 from kemel.commKeyword import CommKeyword
+from common.log import Log
 
+logger = Log.getMylog()
 
 
-class MethodFactory(object):
+class KeywordEntry(object):
+    """已注册的关键字：可调用对象与调用统计"""
+    __slots__ = ('keyword', 'name', 'func', 'plugin', 'calls', 'failures', 'errors', 'seconds', 'max_seconds')
 
-    def __init__(self):
-        self.comKey = CommKeyword()
+    def __init__(self, keyword: str, name: str, func: Callable[..., Tuple[Any, Any]], plugin: bool = False):
+        self.keyword = keyword      # 关键字名（用例 method 列）
+        self.name = name            # 方法名 / 函数名
+        self.func = func
+        self.plugin = plugin
+        self.calls = 0
+        self.failures = 0           # 返回 False
+        self.errors = 0             # 抛出异常
+        self.seconds = 0.0
+        self.max_seconds = 0.0
 
-    def method_factory(self, **kwargs):
 
-        if kwargs.__len__() > 0:
-            try:
-                kwargs['method']
-            except KeyError:
-                return False, 'keyword:用例[method]字段方法没参数为空.'
-            try:
-                method = get_env_var_value('commkey', kwargs['method'].lower())
-            except KeyError:
-                return False, 'keyword:方法[' + kwargs['method'] + '] 不存在,或未配置.'
-        else:
+class KeywordRegistry(object):
+    """
+    关键字注册表
+    - commkey 配置的关键字名不区分大小写（post / POST、执行SQL / 执行sql 相同）
+    - 配置的方法在 CommKeyword 中不存在时启动即告警，执行到该关键字时返回失败原因
+    - 插件关键字通过 register 注册，函数签名与 CommKeyword 方法相同：func(**kwargs) -> (是否成功, 结果)
+    """
+
+    def __init__(self, target: Any = None, mapping: Optional[Dict[str, str]] = None):
+        """
+        :param target: 提供关键字方法的对象，默认新建 CommKeyword
+        :param mapping: 关键字名 -> 方法名，默认读取 base.yaml 的 commkey
+        """
+        self.target = target if target is not None else CommKeyword()
+        self._keywords = {}  # 小写关键字名 -> KeywordEntry
+        self.missing = {}    # 小写关键字名 -> 配置的（不存在的）方法名
+        self._lock = threading.Lock()
+        mapping = mapping if mapping is not None else (get_env_value('commkey') or {})
+        for keyword, name in mapping.items():
+            func = getattr(self.target, str(name), None) if name else None
+            if not callable(func):
+                self.missing[str(keyword).lower()] = name
+                print(f"⚠️  关键字 [{keyword}] 配置的方法 {name} 不存在，执行该关键字的用例将失败")
+                continue
+            self._keywords[str(keyword).lower()] = KeywordEntry(str(keyword), str(name), func)
+
+    def register(self, keyword: str, func: Callable[..., Tuple[Any, Any]], replace: bool = False) -> None:
+        """
+        注册插件关键字
+        :param keyword: 关键字名（用例 method 列）
+        :param func: 关键字函数 func(**kwargs) -> (是否成功, 结果)
+        :param replace: 是否覆盖同名关键字
+        :raises ValueError: 关键字已存在且未指定 replace
+        """
+        key = str(keyword).lower()
+        if not callable(func):
+            raise ValueError(f'关键字 [{keyword}] 不是可调用对象')
+        with self._lock:
+            if key in self._keywords and not replace:
+                raise ValueError(f'关键字 [{keyword}] 已存在（{self._keywords[key].name}），覆盖请指定 replace=True')
+            self._keywords[key] = KeywordEntry(str(keyword), getattr(func, '__name__', str(keyword)), func, plugin=True)
+            self.missing.pop(key, None)
+
+    def resolve(self, keyword: str) -> Optional[KeywordEntry]:
+        """查找关键字，未注册时返回 None"""
+        return self._keywords.get(str(keyword).lower())
+
+    def __contains__(self, keyword: str) -> bool:
+        return str(keyword).lower() in self._keywords
+
+    def dispatch(self, **kwargs) -> Tuple[Any, Any]:
+        """
+        按 kwargs['method'] 执行关键字
+        :return: 关键字的返回值 (是否成功, 结果) 或 (False, 失败原因)
+        """
+        if not kwargs:
             return False, '没有传参'
+        method = kwargs.get('method')
+        if method is None:
+            return False, 'keyword:用例[method]字段方法没参数为空.'
+        key = method.lower() if isinstance(method, str) else str(method).lower()
+        entry = self._keywords.get(key)
+        if entry is None:
+            if key in self.missing:
+                return False, f'keyword:方法[{method}] 配置的 {self.missing[key]} 不存在.'
+            return False, 'keyword:方法[' + str(method) + '] 不存在,或未配置.'
+        start = time.perf_counter()
+        error = False
         try:
-            func = getattr(self.comKey, method, None)
-            _isOk, result = func(**kwargs)
-            return _isOk, result
+            _isOk, result = entry.func(**kwargs)
         except Exception as e:
-            return False, 'keyword:执行失败，估计不存在，异常：' + str(e)
+            logger.exception(f'关键字 [{method}] ({entry.name}) 执行异常')
+            error = True
+            _isOk, result = False, 'keyword:执行失败，异常：' + str(e)
+        elapsed = time.perf_counter() - start
+        # 统计不加锁：多线程同时执行同一关键字时计数可能有极少量偏差，换取分发路径不争用锁
+        entry.calls += 1
+        entry.seconds += elapsed
+        if elapsed > entry.max_seconds:
+            entry.max_seconds = elapsed
+        if error:
+            entry.errors += 1
+        elif _isOk is False:
+            entry.failures += 1
+        return _isOk, result
 
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取已调用关键字的统计，按总耗时降序
+        :return: {关键字名: {'name', 'plugin', 'calls', 'failures', 'errors', 'seconds', 'avg_ms', 'max_ms'}}
+        """
+        with self._lock:
+            entries = [entry for entry in self._keywords.values() if entry.calls]
+            stats = {entry.keyword: {'name': entry.name, 'plugin': entry.plugin, 'calls': entry.calls,
+                                     'failures': entry.failures, 'errors': entry.errors,
+                                     'seconds': round(entry.seconds, 6),
+                                     'avg_ms': round(entry.seconds / entry.calls * 1000, 3),
+                                     'max_ms': round(entry.max_seconds * 1000, 3)}
+                     for entry in sorted(entries, key=lambda e: e.seconds, reverse=True)}
+        return stats
+
+    def reset_stats(self) -> None:
+        """清零调用统计"""
+        with self._lock:
+            for entry in self._keywords.values():
+                entry.calls = entry.failures = entry.errors = 0
+                entry.seconds = entry.max_seconds = 0.0
+
+
+# 关键字注册表（进程级）；fork 出的子进程重新创建，插件关键字重新注册
+_registry = None
+_registry_pid = None
+_registry_lock = threading.Lock()
+_plugins = {}  # 关键字名 -> (函数, 是否覆盖)
 
-if __name__ == '__main__':
-    fac = MethodFactory()
-    print(fac.method_factory(method='获取当前用例文件名称'))
 
+def get_keyword_registry() -> KeywordRegistry:
+    """获取当前 worker 进程的关键字注册表"""
+    global _registry, _registry_pid
+    if _registry is None or _registry_pid != os.getpid():
+        with _registry_lock:
+            if _registry is None or _registry_pid != os.getpid():
+                registry = KeywordRegistry()
+                for keyword, (func, replace) in _plugins.items():
+                    registry.register(keyword, func, replace)
+                _registry = registry
+                _registry_pid = os.getpid()
+    return _registry
 
 
+def register_keyword(keyword: str, func: Callable = None, replace: bool = False):
+    """
+    注册插件关键字（对当前及之后创建的注册表生效），可作为装饰器使用：
+
+        @register_keyword('生成订单号')
+        def new_order_no(**kwargs):
+            return True, ...
+    """
+    def decorator(f):
+        with _registry_lock:
+            registry = _registry if _registry_pid == os.getpid() else None
+        if registry is not None:
+            registry.register(keyword, f, replace)
+        _plugins[keyword] = (f, replace)
+        return f
+    return decorator(func) if func is not None else decorator
+
+
+def get_keyword_stats() -> Dict[str, Dict[str, Any]]:
+    """获取当前进程关键字注册表的调用统计（未创建注册表时为空）"""
+    with _registry_lock:
+        registry = _registry if _registry_pid == os.getpid() else None
+    return registry.get_stats() if registry is not None else {}
+
+
+class MethodFactory(object):
+
+    def __init__(self, registry: KeywordRegistry = None):
+        """
+        :param registry: 关键字注册表，默认使用当前进程共用的注册表
+        """
+        self.registry = registry or get_keyword_registry()
+        self.comKey = self.registry.target
+
+    def method_factory(self, **kwargs):
+        return self.registry.dispatch(**kwargs)
+
+
+if __name__ == '__main__':
+    fac = MethodFactory()
+    print(fac.method_factory(method='获取当前用例文件名称'))
+    register_keyword('问候', lambda **kwargs: (True, f"你好，{kwargs.get('title')}"))
+    print(fac.method_factory(method='问候', title='张三'))
+    print(fac.method_factory(method='不存在的关键字'))
+    print(get_keyword_stats())
@@ -168,7 +168,11 @@ def run_concurrent_tests():
     print("="*60)
     
     executor = ConcurrentExecutor(max_workers=max_workers, current_dir=current_dir)
-    execution_results = executor.execute_concurrent(selected_files)
+    try:
+        execution_results = executor.execute_concurrent(selected_files)
+    finally:
+        # 执行出错或被中断时也关闭预热 worker
+        executor.close()
     
     # 6. 报告聚合
     print("\n" + "="*60)
@@ -232,6 +236,61 @@ def run_concurrent_tests():
     print("="*60 + "\n")
 
 
+def run_load_test():
+    """📈 压测模式：复用用例工作簿中的接口用例，按并发数或每秒请求数持续发送"""
+    from common.load_runner import LoadRunner, print_report, write_report
+    from common.enhanced_data_loader import DataValidationError
+
+    print("\n" + "="*60)
+    print("📈 接口自动化测试 - 压测模式")
+    print("="*60)
+
+    # 1. 选择用例文件（只压测一个文件）
+    selected_files = FileSelector(get_env_now()).interactive_select()
+    if not selected_files:
+        print("\n❌ 未选择任何文件，退出执行")
+        return
+    file_path = selected_files[0]
+    if len(selected_files) > 1:
+        print(f"   ⚠️  压测模式只使用第一个文件: {file_path.name}")
+
+    # 2. 选择工作表、用例（直接回车为全部）
+    sheets = [s.strip() for s in input("\n   工作表 (逗号分隔，直接回车为全部): ").split(',') if s.strip()]
+    case_ids = [c.strip() for c in input("   用例编号 (逗号分隔，直接回车为全部): ").split(',') if c.strip()]
+
+    # 3. 压测参数（直接回车使用 base.yaml 的 load_test 配置）
+    options = {}
+    mode = input("   压测方式 [1] 固定并发 [2] 固定每秒请求数 (直接回车使用配置): ").strip()
+    try:
+        if mode == '1':
+            options['concurrency'] = int(input("   并发数: ").strip())
+        elif mode == '2':
+            options['rps'] = float(input("   每秒请求数: ").strip())
+        duration = input("   持续秒数 (直接回车使用配置): ").strip()
+        if duration:
+            options['duration'] = float(duration)
+        sample_rate = input("   断言抽样比例 0~1 (直接回车使用配置): ").strip()
+        if sample_rate:
+            options['sample_rate'] = float(sample_rate)
+        runner = LoadRunner.from_workbook(str(file_path), sheets or None, case_ids or None, **options)
+    except ValueError as e:
+        print(f"❌ 压测参数错误: {e}")
+        return
+    except DataValidationError as e:
+        print(f"❌ 用例加载失败: {e}")
+        return
+
+    # 4. 执行压测并输出报告（预执行有用例失败时确认是否继续）
+    try:
+        report = runner.run(confirm=lambda: input("   ⚠️  预执行有用例失败，仍然开始压测? (y/n): ")
+                            .lower().strip() in ['y', 'yes', '是'])
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return
+    print_report(report)
+    print(f"📁 压测报告: {write_report(report)}")
+
+
 if __name__ == '__main__':
     print("\n" + "="*60)
     print("🤖 接口自动化测试执行器")
@@ -241,12 +300,15 @@ if __name__ == '__main__':
     print("\n执行模式:")
     print("  [1] 标准模式 (串行执行，使用配置文件中的测试数据)")
     print("  [2] 并发模式 (文件级并发，选择指定文件并发执行)")
+    print("  [3] 压测模式 (复用用例中的接口，按并发数或每秒请求数持续压测)")
     print("="*60)
     
-    mode = input("\n请选择模式 (1/2，直接回车默认标准模式): ").strip()
+    mode = input("\n请选择模式 (1/2/3，直接回车默认标准模式): ").strip()
     
     if mode == '2':
         run_concurrent_tests()
+    elif mode == '3':
+        run_load_test()
     else:
         if mode != '1' and mode != '':
             print("⚠️  输入无效，使用标准模式")